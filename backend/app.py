@@ -1,30 +1,104 @@
+import click
 from flask import Flask, jsonify
+from flask.cli import with_appcontext
 from flask_cors import CORS
-import os
-from logger import logger as log
+from logger import get_logger
+import cola_escritura
+import compresion
 import database
+import metrics
 
 # Importar Blueprints
 from routes.empleados_bp import empleados_bp
 from routes.cargos_bp import cargos_bp
+from routes.pagos_bp import pagos_bp
+from routes.reportes_bp import reportes_bp
+from routes.nomina_bp import nomina_bp
+from services.cargo_service import cargos_cache
+from services.reporte_service import reconstruir_resumen_service
+from services.analitica_service import analitica_cache
+from services.directorio_service import directorio_empleados
+from services.nomina_service import TIPOS_PARTICION, registrar_trabajo_service, ejecutar_trabajo
 
-# Configuración Flask
-app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}}, supports_credentials=True)
+log = get_logger(__name__)
 
-# Inicializar la base de datos
-database.init_app(app)
-
-@app.route('/')
 def index():
     log.info('Acceso a ruta raíz')
     return jsonify({"message": "Bienvenido a la API de Gestión Administrativa"})
 
-# Registrar los blueprints
-app.register_blueprint(empleados_bp)
-app.register_blueprint(cargos_bp)
-log.info("Blueprints registrados")
+# flask --app app migrar-db
+@click.command('migrar-db')
+@with_appcontext
+def migrar_db_command():
+    """Crea o actualiza el esquema de la base de datos (ejecutar antes de iniciar el servidor)."""
+    database.migrar()
+    click.echo(f"Esquema actualizado: {database.DB_PATH}")
+
+# flask --app app reconstruir-resumen
+@click.command('reconstruir-resumen')
+@with_appcontext
+def reconstruir_resumen_command():
+    """Recalcula desde cero el resumen precalculado de empleados (reportes)."""
+    total = reconstruir_resumen_service()
+    click.echo(f"Resumen reconstruido: {total} empleados activos")
+
+# flask --app app calcular-nomina 2024-05 [--particion cargo] [--procesos 8]
+@click.command('calcular-nomina')
+@click.argument('periodo')
+@click.option('--particion', type=click.Choice(TIPOS_PARTICION), default='cedula', show_default=True)
+@click.option('--particiones', type=int, help="Cantidad de particiones (por defecto, según los procesos).")
+@click.option('--procesos', type=int, help="Procesos del pool (por defecto NOMINA_PROCESOS).")
+@with_appcontext
+def calcular_nomina_command(periodo, particion, particiones, procesos):
+    """Calcula los recibos de nómina de un período sin pasar por el servidor (espera a que termine)."""
+    try:
+        trabajo = registrar_trabajo_service({'periodo': periodo, 'particion': particion, 'particiones': particiones})
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    trabajo = ejecutar_trabajo(trabajo['id'], procesos=procesos)
+    click.echo(f"Trabajo {trabajo['id']}: {trabajo['recibos']} recibos en {trabajo['particiones']} particiones "
+               f"({trabajo['duracion_s']} s), neto {trabajo['neto']:.2f}")
+
+def create_app(config=None):
+    """
+    Crea la aplicación Flask. No crea ni modifica el esquema de la base de datos: eso es un
+    paso explícito (migrar-db); el punto de entrada de producción (wsgi.py) sólo lo verifica.
+    """
+    app = Flask(__name__)
+    if config:
+        app.config.from_mapping(config)
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}}, supports_credentials=True)
+
+    # Inicializar la base de datos y, si está activada, la cola de escritura con commits agrupados
+    database.init_app(app)
+    cola_escritura.init_app(app)
+
+    # Instrumentación de rendimiento (latencia, SQL y serialización por ruta) expuesta en /metrics
+    with app.app_context():
+        metrics.init_app(app, database.db.engines.values())
+    metrics.register_stats_source(cargos_cache)
+    metrics.register_stats_source(analitica_cache)
+    metrics.register_stats_source(directorio_empleados)
+    # Compresión gzip/Brotli de las respuestas de /api (tras las métricas: su latencia la incluye)
+    compresion.init_app(app)
+
+    app.add_url_rule('/', view_func=index)
+
+    # Registrar los blueprints
+    app.register_blueprint(empleados_bp)
+    app.register_blueprint(cargos_bp)
+    app.register_blueprint(pagos_bp)
+    app.register_blueprint(reportes_bp)
+    app.register_blueprint(nomina_bp)
+    log.info("Blueprints registrados")
+
+    app.cli.add_command(migrar_db_command)
+    app.cli.add_command(reconstruir_resumen_command)
+    app.cli.add_command(calcular_nomina_command)
+    return app
 
 if __name__ == '__main__':
     log.info("Iniciando servidor Flask en modo DEBUG")
+    app = create_app()
+    database.verificar_esquema(app, migrar_si_falta=True)  # En desarrollo se migra al iniciar
     app.run(debug=True, port=5001) # Ejecuta el servidor de desarrollo Flask en el puerto 5001
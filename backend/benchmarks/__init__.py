@@ -0,0 +1,21 @@
+"""
+Benchmarks y pruebas de carga del backend.
+
+    python -m benchmarks.seed --empleados 100000 --cargos 20
+    python -m benchmarks.run --salida reporte.json --baseline baseline.json
+
+Se ejecutan desde la carpeta backend. Por defecto usan la base de datos
+benchmarks/bench.db (--db permite otra) para no tocar los datos reales; el generador
+sólo llena la base de datos de la aplicación con --force.
+"""
+import os
+
+BENCH_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench.db')
+
+def usar_base_de_datos(ruta):
+    """
+    Apunta la aplicación a la base de datos indicada, con los snapshots de pagos en
+    'snapshots/' junto a ella; debe llamarse antes de importar 'app' o 'database'.
+    """
+    os.environ['DATABASE_PATH'] = os.path.abspath(ruta)
+    os.environ['SNAPSHOTS_DIR'] = os.path.join(os.path.dirname(os.path.abspath(ruta)), 'snapshots')
@@ -0,0 +1,148 @@
+"""
+Benchmark de arranque en frío: tiempo hasta la primera respuesta de cada worker.
+
+    python -m benchmarks.arranque --workers 4 --salida arranque.json
+
+Modos medidos (cada uno con --workers workers):
+  proceso_nuevo        un intérprete nuevo por worker que importa wsgi (sin preload, o un
+                       worker repuesto tras un reinicio) y atiende una petición
+  proceso_con_migrar   igual, pero migrando el esquema al arrancar (lo que hacía cada
+                       worker cuando init_app ejecutaba create_all)
+  fork_con_preload     la aplicación se importa una vez y cada worker se crea con fork
+                       (preload_app de gunicorn); sólo en plataformas con fork
+
+Por worker se mide desde que se lanza hasta que termina su primera petición
+(GET /api/get/cargos). Usa la base de datos de benchmark (python -m benchmarks.seed).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks import BENCH_DB_PATH, usar_base_de_datos
+
+RUTA_PRIMERA_PETICION = '/api/get/cargos'
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código que ejecuta cada worker lanzado como proceso nuevo; imprime sus tiempos en JSON
+CODIGO_PROCESO = """
+import json, sys, time
+inicio = time.perf_counter()
+import wsgi
+if sys.argv[1] == '1':
+    import database
+    with wsgi.app.app_context():
+        database.migrar()
+importado = time.perf_counter()
+estado = wsgi.app.test_client().get(sys.argv[2]).status_code
+print(json.dumps({'importacion': importado - inicio, 'primera_peticion': time.perf_counter() - importado, 'estado': estado}))
+"""
+
+def _resumen(tiempos):
+    """Resume los tiempos (segundos) de los workers en milisegundos."""
+    ms = lambda v: round(v * 1000, 1)
+    total = [t['total'] for t in tiempos]
+    resumen = {
+        'workers': len(tiempos),
+        'media_ms': ms(sum(total) / len(total)),
+        'maximo_ms': ms(max(total)),
+        'errores': sum(1 for t in tiempos if t.get('estado') != 200),
+    }
+    for clave in ('importacion', 'primera_peticion'):
+        valores = [t[clave] for t in tiempos if clave in t]
+        if valores:
+            resumen[f'{clave}_media_ms'] = ms(sum(valores) / len(valores))
+    return resumen
+
+def medir_proceso_nuevo(workers, migrar=False):
+    """Lanza los workers como intérpretes nuevos en paralelo, como un arranque sin preload."""
+    inicio = time.perf_counter()
+    procesos = [
+        subprocess.Popen([sys.executable, '-c', CODIGO_PROCESO, '1' if migrar else '0', RUTA_PRIMERA_PETICION],
+                         cwd=DIRECTORIO_BACKEND, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    tiempos = []
+    for proceso in procesos:
+        salida, _ = proceso.communicate()
+        fin = time.perf_counter()
+        try:
+            datos = json.loads(salida.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            datos = {'estado': None}
+        tiempos.append({**datos, 'total': fin - inicio})
+    return _resumen(tiempos)
+
+def medir_fork_con_preload(workers):
+    """Importa la aplicación una vez y crea los workers con fork, como preload_app de gunicorn."""
+    import database
+    inicio_preload = time.perf_counter()
+    from wsgi import app
+    preload = time.perf_counter() - inicio_preload
+
+    inicio = time.perf_counter()
+    lecturas = []
+    for _ in range(workers):
+        lectura, escritura = os.pipe()
+        if os.fork() == 0:  # Worker
+            os.close(lectura)
+            try:
+                database.reiniciar_conexiones(app)
+                estado = app.test_client().get(RUTA_PRIMERA_PETICION).status_code
+                datos = {'primera_peticion': time.perf_counter() - inicio, 'estado': estado}
+                os.write(escritura, json.dumps(datos).encode('utf-8'))
+            finally:
+                os._exit(0)
+        os.close(escritura)
+        lecturas.append(lectura)
+    tiempos = []
+    for lectura in lecturas:
+        with os.fdopen(lectura, 'rb') as archivo:
+            contenido = archivo.read()
+        tiempos.append({**(json.loads(contenido) if contenido else {'estado': None}),
+                        'total': time.perf_counter() - inicio})
+    for _ in lecturas:
+        os.wait()
+    return {**_resumen(tiempos), 'preload_ms': round(preload * 1000, 1)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mide el tiempo hasta la primera respuesta de cada worker.')
+    parser.add_argument('--db', default=os.environ.get('DATABASE_PATH', BENCH_DB_PATH),
+                        help='Base de datos de benchmark (por defecto benchmarks/bench.db)')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--salida', help='Archivo donde guardar el reporte JSON')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"No existe {args.db}; genere los datos con 'python -m benchmarks.seed'")
+    usar_base_de_datos(args.db)  # Los procesos hijos heredan DATABASE_PATH
+
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {'workers': args.workers, 'ruta': RUTA_PRIMERA_PETICION},
+        'proceso_nuevo': medir_proceso_nuevo(args.workers),
+        'proceso_con_migrar': medir_proceso_nuevo(args.workers, migrar=True),
+    }
+    if hasattr(os, 'fork'):
+        reporte['fork_con_preload'] = medir_fork_con_preload(args.workers)
+    for modo in ('proceso_nuevo', 'proceso_con_migrar', 'fork_con_preload'):
+        if modo in reporte:
+            r = reporte[modo]
+            print(f"{modo}: media {r['media_ms']} ms, máximo {r['maximo_ms']} ms por worker ({r['errores']} errores)")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f'Reporte guardado en {args.salida}')
+    else:
+        print(json.dumps(reporte, ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
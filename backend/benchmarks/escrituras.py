@@ -0,0 +1,87 @@
+"""
+Prueba de concurrencia de escrituras: muchas altas simultáneas, con y sin la cola de escritura.
+
+    python -m benchmarks.escrituras --concurrencia 100 --salida escrituras.json
+
+Lanza --concurrencia altas de empleados a la vez (hilos con el cliente de pruebas de
+Flask), la mitad con cédulas nuevas y la otra mitad repitiendo alguna de ellas, más
+que las conexiones del pool (DB_POOL_SIZE + DB_MAX_OVERFLOW). Se esperan sólo respuestas
+201 y 409: cualquier 5xx (p. ej. el pool agotado mientras las peticiones esperan al hilo
+escritor) cuenta como error y el proceso termina con código 1. Trabaja sobre una copia
+temporal de la base de datos de benchmark (python -m benchmarks.seed).
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from benchmarks import BENCH_DB_PATH, usar_base_de_datos
+from benchmarks.run import CEDULA_INICIAL_ESCRITURAS, copiar_base_de_datos
+
+def medir(app, concurrencia, desplazamiento):
+    """Ejecuta las altas simultáneas y retorna los estados HTTP obtenidos y la duración."""
+    nuevas = (concurrencia + 1) // 2
+    barrera = threading.Barrier(concurrencia)
+    estados = [None] * concurrencia
+
+    def alta(i):
+        n = desplazamiento + i % nuevas  # Desde 'nuevas' en adelante se repiten cédulas
+        cuerpo = {'cedula': CEDULA_INICIAL_ESCRITURAS + n, 'nombre': f'Concurrencia {n}', 'cargo_id': 1,
+                  'correo': f'concurrencia{n}@empresa.com'}
+        cliente = app.test_client()
+        barrera.wait()
+        try:
+            estados[i] = cliente.post('/api/add/empleados', json=cuerpo).status_code
+        except Exception:  # El cliente de pruebas propaga los errores no manejados
+            estados[i] = 599
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=alta, args=(i,)) for i in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+    conteo = Counter(estados)
+    return {
+        'estados': {str(estado): cantidad for estado, cantidad in sorted(conteo.items())},
+        'duracion_s': round(duracion, 3),
+        'errores': sum(cantidad for estado, cantidad in conteo.items() if estado >= 500),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Altas concurrentes con y sin la cola de escritura.')
+    parser.add_argument('--db', default=BENCH_DB_PATH, help='Base de datos de benchmark (se usa una copia)')
+    parser.add_argument('--concurrencia', type=int, default=100)
+    parser.add_argument('--salida', help='Archivo donde guardar el reporte JSON')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"No existe {args.db}; genere los datos con 'python -m benchmarks.seed'")
+    usar_base_de_datos(copiar_base_de_datos(args.db))
+    from app import create_app
+    import database
+
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {'concurrencia': args.concurrencia,
+                       'conexiones_pool': database.DB_POOL_SIZE + database.DB_MAX_OVERFLOW},
+    }
+    for indice, (modo, cola) in enumerate((('sin_cola', False), ('con_cola', True))):
+        app = create_app({'DB_WRITE_QUEUE': cola})
+        reporte[modo] = r = medir(app, args.concurrencia, indice * args.concurrencia)
+        print(f"{modo}: {r['estados']} en {r['duracion_s']} s ({r['errores']} errores)")
+    reporte['errores'] = reporte['sin_cola']['errores'] + reporte['con_cola']['errores']
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f'Reporte guardado en {args.salida}')
+    return 1 if reporte['errores'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark del cálculo de nómina: tiempo de un trabajo según la cantidad de procesos.
+
+    python -m benchmarks.nomina --procesos 1 2 4 8 --salida nomina.json
+
+Calcula el mismo período una vez por cada cantidad de procesos (con un pool propio en
+cada corrida) y reporta la duración, los recibos por segundo y la aceleración respecto
+de la primera corrida; con empleados suficientes (p. ej. 100 000) debería acercarse a
+lineal mientras haya núcleos libres. Si el período no tiene pagos, primero aplica a cada
+cargo un crédito y un débito. Usa la base de datos de benchmark (python -m benchmarks.seed).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date, datetime
+
+from benchmarks import BENCH_DB_PATH, usar_base_de_datos
+
+def _sembrar_pagos(periodo):
+    """Aplica un crédito y un débito a cada cargo activo si el período no tiene pagos."""
+    from database import db
+    from models import Cargo, Pago
+    from services.pago_service import aplicar_pago_por_cargo_service
+
+    if db.session.query(Pago.id).filter(Pago.periodo == periodo).first() is not None:
+        return 0
+    fecha = f'{periodo}-01'
+    lotes = 0
+    for cargo_id, in db.session.query(Cargo.id).filter(Cargo.estatus == 1).all():
+        aplicar_pago_por_cargo_service(cargo_id, {'tipo': 'credito', 'porcentaje': 10, 'fecha': fecha})
+        aplicar_pago_por_cargo_service(cargo_id, {'tipo': 'debito', 'porcentaje': 4, 'fecha': fecha})
+        lotes += 2
+    return lotes
+
+def medir(periodo, particion, procesos):
+    """Registra y ejecuta un trabajo con 'procesos' procesos; retorna su resumen."""
+    from services.nomina_service import registrar_trabajo_service, ejecutar_trabajo
+
+    trabajo = registrar_trabajo_service({'periodo': periodo, 'particion': particion})
+    inicio = time.perf_counter()  # Incluye el arranque del pool
+    trabajo = ejecutar_trabajo(trabajo['id'], procesos=procesos)
+    duracion = time.perf_counter() - inicio
+    return {
+        'procesos': procesos,
+        'particiones': trabajo['particiones'],
+        'recibos': trabajo['recibos'],
+        'duracion_s': round(duracion, 3),
+        'neto': trabajo['neto'],
+        'errores': 0 if trabajo['estado'] == 'completado' else 1,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mide el cálculo de nómina según la cantidad de procesos.')
+    # Sin DATABASE_PATH como valor por defecto: registra pagos y trabajos en la base indicada
+    parser.add_argument('--db', default=BENCH_DB_PATH,
+                        help='Base de datos de benchmark (por defecto benchmarks/bench.db)')
+    parser.add_argument('--periodo', default=date.today().strftime('%Y-%m'), help='Período AAAA-MM (por defecto el actual)')
+    parser.add_argument('--particion', choices=('cedula', 'cargo'), default='cedula')
+    parser.add_argument('--procesos', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--salida', help='Archivo donde guardar el reporte JSON')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"No existe {args.db}; genere los datos con 'python -m benchmarks.seed'")
+    usar_base_de_datos(args.db)
+    from wsgi import app
+
+    with app.app_context():
+        lotes = _sembrar_pagos(args.periodo)
+        corridas = [medir(args.periodo, args.particion, procesos) for procesos in args.procesos]
+    base = corridas[0]['duracion_s']
+    for corrida in corridas:
+        corrida['recibos_por_s'] = round(corrida['recibos'] / corrida['duracion_s']) if corrida['duracion_s'] else None
+        corrida['aceleracion'] = round(base / corrida['duracion_s'], 2) if corrida['duracion_s'] else None
+        print(f"{corrida['procesos']} procesos: {corrida['duracion_s']} s, {corrida['recibos_por_s']} recibos/s, "
+              f"aceleración {corrida['aceleracion']}x ({corrida['errores']} errores)")
+
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'nucleos': os.cpu_count(),
+        'parametros': {'periodo': args.periodo, 'particion': args.particion, 'lotes_sembrados': lotes},
+        'corridas': corridas,
+        # Todas las corridas deben dar el mismo total (salvo el redondeo de sumar en otro orden)
+        'errores': sum(c['errores'] for c in corridas)
+                   + (max(c['neto'] for c in corridas) - min(c['neto'] for c in corridas) > 0.01),
+    }
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f'Reporte guardado en {args.salida}')
+    else:
+        print(json.dumps(reporte, ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Ejecuta los escenarios de benchmark y genera un reporte JSON.
+
+Modo 'cliente': recorre todos los endpoints de los blueprints con el cliente de pruebas
+de Flask, en el mismo proceso, sobre la base de datos de benchmark.
+Modo 'http': generador de carga concurrente (hilos) contra un servidor ya levantado
+(--url), sólo con los escenarios de lectura.
+
+Por escenario se reportan p50/p95/p99, media, peticiones por segundo y errores, además
+del RSS máximo del proceso. Con --baseline se compara el p95 de cada escenario contra
+un reporte guardado y el proceso termina con código 1 si hay regresiones.
+
+Los escenarios de escritura modifican la base de datos, por lo que el modo 'cliente'
+trabaja sobre una copia temporal de la base generada: cada corrida parte de los mismos datos.
+"""
+import argparse
+import atexit
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from datetime import datetime
+
+from benchmarks import BENCH_DB_PATH, usar_base_de_datos
+
+CEDULA_INICIAL_ESCRITURAS = 900000000  # Fuera del rango que genera seed.py
+
+@dataclass
+class Escenario:
+    nombre: str
+    metodo: str
+    ruta: str  # Puede contener {n} (número de iteración) y {cedula}
+    cuerpo: object = None  # dict (JSON) o callable(n) -> dict
+    archivo: object = None  # callable(n) -> (nombre, bytes) para multipart
+    lectura: bool = True
+
+def _cedula(n):
+    return CEDULA_INICIAL_ESCRITURAS + n
+
+def _empleado_nuevo(n):
+    return {
+        'cedula': _cedula(n), 'nombre': f'Benchmark {n}', 'cargo_id': 1,
+        'fecha_nacimiento': '1990-01-01', 'sexo': 'F', 'fecha_ingreso': '2020-01-01',
+        'telefono': 4140000000, 'correo': f'benchmark{n}@empresa.com',
+    }
+
+def _csv_importacion(n, filas=500):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(['cedula', 'nombre', 'cargo_id', 'fecha_nacimiento', 'sexo', 'fecha_ingreso', 'correo'])
+    base = CEDULA_INICIAL_ESCRITURAS + 10000000 + n * filas
+    for i in range(base, base + filas):
+        escritor.writerow([i, f'Importado {i}', 1, '1985-06-15', 'M', '2019-03-01', f'importado{i}@empresa.com'])
+    return f'importacion_{n}.csv', buffer.getvalue().encode('utf-8')
+
+ESCENARIOS = [
+    # Empleados
+    Escenario('empleados_listado_completo', 'GET', '/api/get/empleados'),
+    Escenario('empleados_pagina', 'GET', '/api/get/empleados?limit=50'),
+    Escenario('empleados_pagina_orden_filtro', 'GET', '/api/get/empleados?limit=50&sort=fecha_ingreso:desc&filter_column=nombre&filter_value=mar'),
+    Escenario('empleados_cambios', 'GET', '/api/get/empleados/changes?since=0&limit=500'),
+    Escenario('empleados_export_ndjson', 'GET', '/api/export/empleados?formato=ndjson'),
+    Escenario('empleados_export_csv', 'GET', '/api/export/empleados?formato=csv'),
+    Escenario('empleados_alta', 'POST', '/api/add/empleados', cuerpo=_empleado_nuevo, lectura=False),
+    Escenario('empleados_modificacion', 'PUT', '/api/put/empleados/{cedula}', cuerpo={'nombre': 'Benchmark Modificado'}, lectura=False),
+    Escenario('empleados_baja', 'DELETE', '/api/delete/empleados/{cedula}', lectura=False),
+    Escenario('empleados_importacion_csv', 'POST', '/api/import/empleados', archivo=_csv_importacion, lectura=False),
+    # Cargos
+    Escenario('cargos_listado', 'GET', '/api/get/cargos'),
+    Escenario('cargos_cambios', 'GET', '/api/get/cargos/changes?since=0'),
+    Escenario('cargos_export', 'GET', '/api/export/cargos'),
+    Escenario('cargos_alta', 'POST', '/api/add/cargos', cuerpo=lambda n: {'nombre': f'Cargo benchmark {n}', 'nivel': 1, 'sueldo_base': 1000}, lectura=False),
+    Escenario('cargos_modificacion', 'PUT', '/api/put/cargos/1', cuerpo={'sueldo_base': 1234.5}, lectura=False),
+    # Pagos
+    Escenario('pagos_por_cargo', 'POST', '/api/add/pagos/cargo/1', cuerpo={'tipo': 'credito', 'porcentaje': 10, 'concepto': 'Benchmark'}, lectura=False),
+    Escenario('pagos_listado', 'GET', '/api/get/pagos?limit=500'),
+    # Métricas
+    Escenario('metricas', 'GET', '/metrics'),
+]
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores_ordenados:
+        return None
+    indice = max(0, min(len(valores_ordenados) - 1, int(round(p / 100 * len(valores_ordenados) + 0.5)) - 1))
+    return valores_ordenados[indice]
+
+def resumir(latencias, errores, duracion):
+    """Resume una lista de latencias (segundos) en milisegundos."""
+    ordenadas = sorted(latencias)
+    ms = lambda v: None if v is None else round(v * 1000, 3)
+    return {
+        'peticiones': len(ordenadas),
+        'errores': errores,
+        'p50_ms': ms(percentil(ordenadas, 50)),
+        'p95_ms': ms(percentil(ordenadas, 95)),
+        'p99_ms': ms(percentil(ordenadas, 99)),
+        'media_ms': ms(sum(ordenadas) / len(ordenadas)) if ordenadas else None,
+        'rps': round(len(ordenadas) / duracion, 2) if duracion > 0 else None,
+    }
+
+def rss_maximo_mb():
+    """RSS máximo del proceso en MB; None en plataformas sin el módulo resource (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(maximo / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)  # macOS: bytes; Linux: KB
+
+def copiar_base_de_datos(origen):
+    """Copia la base de datos (incluido su WAL) a un archivo temporal con la API de respaldo de SQLite."""
+    descriptor, destino = tempfile.mkstemp(prefix='bench_', suffix='.db')
+    os.close(descriptor)
+    with sqlite3.connect(origen) as fuente, sqlite3.connect(destino) as copia:
+        fuente.backup(copia)
+    atexit.register(_eliminar_copia, destino)
+    return destino
+
+def _eliminar_copia(ruta):
+    for archivo in (ruta, ruta + '-wal', ruta + '-shm'):
+        with contextlib.suppress(OSError):
+            os.remove(archivo)
+
+def _peticion_cliente(cliente, escenario, n):
+    ruta = escenario.ruta.format(n=n, cedula=_cedula(n))
+    kwargs = {}
+    if escenario.cuerpo is not None:
+        kwargs['json'] = escenario.cuerpo(n) if callable(escenario.cuerpo) else escenario.cuerpo
+    if escenario.archivo is not None:
+        nombre, contenido = escenario.archivo(n)
+        kwargs['data'] = {'archivo': (io.BytesIO(contenido), nombre)}
+        kwargs['content_type'] = 'multipart/form-data'
+    respuesta = cliente.open(ruta, method=escenario.metodo, **kwargs)
+    respuesta.get_data()  # Consumir respuestas en streaming
+    return respuesta.status_code
+
+def ejecutar_cliente(escenarios, iteraciones, calentamiento):
+    """Ejecuta cada escenario 'iteraciones' veces con el cliente de pruebas de Flask."""
+    from wsgi import app
+    cliente = app.test_client()
+    resultados = {}
+    # Las bajas y modificaciones operan sobre los empleados dados de alta por 'empleados_alta'
+    altas = next((e for e in ESCENARIOS if e.nombre == 'empleados_alta'), None)
+    numeros = itertools.count()
+    for escenario in escenarios:
+        latencias, errores = [], 0
+        inicio_escenario = time.perf_counter()
+        for i in range(calentamiento + iteraciones):
+            n = next(numeros)
+            if escenario.nombre in ('empleados_modificacion', 'empleados_baja'):
+                _peticion_cliente(cliente, altas, n)
+            inicio = time.perf_counter()
+            estatus = _peticion_cliente(cliente, escenario, n)
+            duracion = time.perf_counter() - inicio
+            if i < calentamiento:
+                inicio_escenario = time.perf_counter()
+                continue
+            if estatus >= 400:
+                errores += 1
+            latencias.append(duracion)
+        resultados[escenario.nombre] = resumir(latencias, errores, time.perf_counter() - inicio_escenario)
+        print(f"  {escenario.nombre:<34} p50 {resultados[escenario.nombre]['p50_ms']} ms  p95 {resultados[escenario.nombre]['p95_ms']} ms", flush=True)
+    return resultados
+
+def ejecutar_http(url, escenarios, concurrencia, duracion, timeout=30):
+    """Generador de carga: 'concurrencia' hilos repiten los escenarios de lectura durante 'duracion' segundos."""
+    lecturas = [e for e in escenarios if e.lectura]
+    datos = {e.nombre: ([], [0]) for e in lecturas}
+    lock = threading.Lock()
+    fin = time.perf_counter() + duracion
+
+    def trabajador(desplazamiento):
+        for i in itertools.count(desplazamiento):
+            if time.perf_counter() >= fin:
+                return
+            escenario = lecturas[i % len(lecturas)]
+            inicio = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url.rstrip('/') + escenario.ruta, timeout=timeout) as respuesta:
+                    respuesta.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            transcurrido = time.perf_counter() - inicio
+            with lock:
+                latencias, errores = datos[escenario.nombre]
+                if ok:
+                    latencias.append(transcurrido)
+                else:
+                    errores[0] += 1
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=trabajador, args=(i,), daemon=True) for i in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    total = time.perf_counter() - inicio
+
+    resultados = {nombre: resumir(latencias, errores[0], total) for nombre, (latencias, errores) in datos.items()}
+    todas = [v for latencias, _ in datos.values() for v in latencias]
+    resultados['_total'] = resumir(todas, sum(e[0] for _, e in datos.values()), total)
+    return resultados
+
+def comparar(reporte, baseline, tolerancia, minimo_ms):
+    """
+    Compara el p95 de cada escenario contra el baseline. Una regresión es un p95 mayor
+    que el del baseline en más de 'tolerancia' (proporción) y en más de 'minimo_ms'.
+    """
+    regresiones = []
+    for modo in ('cliente', 'http'):
+        actuales = reporte.get(modo) or {}
+        anteriores = baseline.get(modo) or {}
+        for nombre, actual in actuales.items():
+            anterior = anteriores.get(nombre)
+            if not anterior or actual['p95_ms'] is None or anterior['p95_ms'] is None:
+                continue
+            diferencia = actual['p95_ms'] - anterior['p95_ms']
+            if actual['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia) and diferencia > minimo_ms:
+                regresiones.append({'modo': modo, 'escenario': nombre,
+                                    'p95_baseline_ms': anterior['p95_ms'], 'p95_actual_ms': actual['p95_ms']})
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks de los endpoints del backend.')
+    parser.add_argument('--db', default=os.environ.get('DATABASE_PATH', BENCH_DB_PATH),
+                        help='Base de datos ya generada con benchmarks.seed (por defecto benchmarks/bench.db)')
+    parser.add_argument('--conservar-cambios', action='store_true',
+                        help='Ejecutar sobre la base indicada y no sobre una copia temporal')
+    parser.add_argument('--modo', choices=('cliente', 'http', 'ambos'), default='cliente')
+    parser.add_argument('--escenarios', help='Nombres separados por coma (por defecto todos)')
+    parser.add_argument('--iteraciones', type=int, default=20)
+    parser.add_argument('--calentamiento', type=int, default=2)
+    parser.add_argument('--url', default='http://127.0.0.1:5001', help='Servidor para el modo http')
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--duracion', type=float, default=10.0, help='Segundos de carga en el modo http')
+    parser.add_argument('--salida', help='Archivo donde guardar el reporte JSON')
+    parser.add_argument('--baseline', help='Reporte JSON anterior contra el cual comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='Aumento de p95 permitido (0.2 = 20%%)')
+    parser.add_argument('--minimo-ms', type=float, default=1.0, help='Diferencia mínima de p95 para considerar regresión')
+    args = parser.parse_args(argv)
+
+    escenarios = ESCENARIOS
+    if args.escenarios:
+        nombres = [n.strip() for n in args.escenarios.split(',')]
+        desconocidos = set(nombres) - {e.nombre for e in ESCENARIOS}
+        if desconocidos:
+            parser.error(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+        escenarios = [e for e in ESCENARIOS if e.nombre in nombres]
+
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('salida', 'baseline')},
+    }
+    if args.modo in ('cliente', 'ambos'):
+        if not os.path.exists(args.db):
+            parser.error(f"No existe {args.db}; genere los datos con 'python -m benchmarks.seed'")
+        usar_base_de_datos(args.db if args.conservar_cambios else copiar_base_de_datos(args.db))
+        from wsgi import app
+        from models import Empleado, Cargo
+        with app.app_context():
+            reporte['datos'] = {'empleados': Empleado.query.count(), 'cargos': Cargo.query.count()}
+        print(f"Cliente de pruebas ({reporte['datos']['empleados']} empleados, {args.iteraciones} iteraciones):")
+        reporte['cliente'] = ejecutar_cliente(escenarios, args.iteraciones, args.calentamiento)
+    if args.modo in ('http', 'ambos'):
+        print(f"Carga HTTP contra {args.url} ({args.concurrencia} hilos, {args.duracion} s)...")
+        reporte['http'] = ejecutar_http(args.url, escenarios, args.concurrencia, args.duracion)
+        total = reporte['http']['_total']
+        print(f"  {total['peticiones']} peticiones, {total['rps']} req/s, p95 {total['p95_ms']} ms, {total['errores']} errores")
+    reporte['rss_maximo_mb'] = rss_maximo_mb()
+
+    codigo = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        reporte['regresiones'] = comparar(reporte, baseline, args.tolerancia, args.minimo_ms)
+        for r in reporte['regresiones']:
+            print(f"REGRESIÓN [{r['modo']}] {r['escenario']}: p95 {r['p95_baseline_ms']} ms -> {r['p95_actual_ms']} ms")
+        if reporte['regresiones']:
+            codigo = 1
+        else:
+            print('Sin regresiones respecto al baseline')
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f'Reporte guardado en {args.salida}')
+    else:
+        print(json.dumps(reporte, ensure_ascii=False, indent=2))
+    return codigo
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Generador de datos sintéticos para benchmarks.
+
+Crea N cargos y M empleados (activos e inactivos) con nombres, fechas y correos
+realistas usando las tablas de los modelos existentes, insertando por lotes. Al final
+reconstruye el resumen de reportes como 'flask --app app reconstruir-resumen'.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks import BENCH_DB_PATH, usar_base_de_datos
+
+NOMBRES = ['José', 'María', 'Luis', 'Ana', 'Carlos', 'Carmen', 'Jesús', 'Rosa', 'Pedro', 'Luisa',
+           'Andrés', 'Gabriela', 'Miguel', 'Daniela', 'Ángel', 'Valentina', 'Rafael', 'Sofía', 'Víctor', 'Mónica']
+APELLIDOS = ['González', 'Rodríguez', 'Pérez', 'Hernández', 'García', 'Martínez', 'López', 'Díaz', 'Sánchez',
+             'Ramírez', 'Torres', 'Rojas', 'Flores', 'Moreno', 'Álvarez', 'Mendoza', 'Castillo', 'Núñez']
+CARGOS = ['Analista', 'Asistente', 'Coordinador', 'Gerente', 'Director', 'Técnico', 'Supervisor',
+          'Contador', 'Desarrollador', 'Vendedor', 'Auditor', 'Especialista']
+TAMANO_LOTE = 10000
+
+def _fecha_aleatoria(rng, desde, hasta):
+    return desde + timedelta(days=rng.randrange((hasta - desde).days))
+
+def generar_cargos(cantidad, rng):
+    cargos = []
+    for i in range(1, cantidad + 1):
+        nivel = (i - 1) // len(CARGOS) + 1
+        cargos.append({
+            'id': i,
+            'nombre': CARGOS[(i - 1) % len(CARGOS)] + (f' {nivel}' if nivel > 1 else ''),
+            'nivel': nivel,
+            'sueldo_base': round(rng.uniform(400, 5000), 2),
+            'estatus': 1,
+            'revision': i,
+        })
+    return cargos
+
+def generar_empleados(cantidad, cargos, rng, proporcion_inactivos=0.05, cedula_inicial=1000000):
+    """Genera los empleados de forma perezosa para no tenerlos todos en memoria."""
+    hoy = date.today()
+    for i in range(cantidad):
+        cargo = rng.choice(cargos)
+        cedula = cedula_inicial + i
+        nacimiento = _fecha_aleatoria(rng, date(1960, 1, 1), date(2004, 12, 31))
+        yield {
+            'cedula': cedula,
+            'nombre': f'{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}',
+            'cargo': cargo['nombre'],
+            'cargo_id': cargo['id'],
+            'fecha_nacimiento': nacimiento,
+            'sexo': rng.choice('MF'),
+            'fecha_ingreso': _fecha_aleatoria(rng, max(nacimiento + timedelta(days=18 * 365), date(1990, 1, 1)), hoy),
+            'telefono': 4140000000 + rng.randrange(10000000),
+            'correo': f'empleado{cedula}@empresa.com',
+            'estatus': 0 if rng.random() < proporcion_inactivos else 1,
+            'revision': i + 1,
+        }
+
+def _borrar_base_de_datos(ruta, snapshots):
+    """Elimina el archivo SQLite (con su WAL) y los snapshots de pagos de los períodos cerrados."""
+    for sufijo in ('', '-wal', '-shm'):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+    shutil.rmtree(snapshots, ignore_errors=True)
+
+def seed(empleados, cargos, semilla=42, limpiar=True):
+    """
+    Llena la base de datos configurada con datos sintéticos. Con 'limpiar' la base de
+    datos se crea de nuevo (los triggers del libro de pagos impiden vaciar sus tablas).
+    Retorna el tiempo empleado.
+    """
+    from itertools import islice
+    from app import create_app
+    from database import db, migrar, DB_PATH
+    from models import Empleado, Cargo, VersionTabla
+    from services.pago_service import SNAPSHOTS_DIR
+    from services.reporte_service import reconstruir_resumen_service
+    from sqlalchemy import insert
+
+    rng = random.Random(semilla)
+    inicio = time.perf_counter()
+    if limpiar:
+        _borrar_base_de_datos(DB_PATH, SNAPSHOTS_DIR)
+    app = create_app()
+    with app.app_context():
+        migrar()
+        lista_cargos = generar_cargos(cargos, rng)
+        db.session.execute(insert(Cargo.__table__), lista_cargos)
+
+        filas = generar_empleados(empleados, lista_cargos, rng)
+        while True:
+            lote = list(islice(filas, TAMANO_LOTE))
+            if not lote:
+                break
+            db.session.execute(insert(Empleado.__table__), lote)
+
+        db.session.execute(insert(VersionTabla.__table__), [
+            {'tabla': 'cargos', 'version': cargos},
+            {'tabla': 'empleados', 'version': empleados},
+        ])
+        db.session.commit()
+        # La inserción masiva no pasa por los servicios que mantienen el resumen
+        reconstruir_resumen_service()
+        db.session.execute(db.text('ANALYZE'))
+    return time.perf_counter() - inicio
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Genera datos sintéticos para los benchmarks.')
+    parser.add_argument('--empleados', type=int, default=1000)
+    parser.add_argument('--cargos', type=int, default=20)
+    parser.add_argument('--semilla', type=int, default=42)
+    # Sin DATABASE_PATH como valor por defecto: en una consola preparada para la aplicación
+    # se borraría su base de datos real
+    parser.add_argument('--db', default=BENCH_DB_PATH,
+                        help='Archivo SQLite a llenar (por defecto benchmarks/bench.db); se crea de nuevo')
+    parser.add_argument('--force', action='store_true',
+                        help='Permite llenar la base de datos de la aplicación (DATABASE_PATH o la predeterminada)')
+    args = parser.parse_args(argv)
+
+    ruta = os.path.abspath(args.db)
+    protegidas = {os.path.abspath(os.environ['DATABASE_PATH'])} if os.environ.get('DATABASE_PATH') else set()
+    protegidas.add(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gestionAdministrativa.db'))
+    if ruta != os.path.abspath(BENCH_DB_PATH) and ruta in protegidas and not args.force:
+        parser.error(f"{args.db} es la base de datos de la aplicación y se borraría; use --force para llenarla igualmente")
+
+    usar_base_de_datos(args.db)
+    duracion = seed(args.empleados, args.cargos, args.semilla)
+    print(f'{args.empleados} empleados y {args.cargos} cargos generados en {duracion:.1f} s ({args.db})')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Cola de escritura con commits agrupados (opcional, DB_WRITE_QUEUE=1).
+
+SQLite admite un solo escritor: con muchas altas o modificaciones simultáneas cada petición
+espera el bloqueo de escritura y paga su propio commit. Con la cola activada, los servicios
+envían sus escrituras a un hilo escritor dedicado que las agrupa durante unos milisegundos
+y las confirma con un único commit. Cada escritura corre en su propio SAVEPOINT: si falla
+(p. ej. IntegrityError por cédula o correo duplicados) sólo se revierte ella y su petición
+recibe la excepción; las demás del lote se confirman igual.
+
+Mientras espera al hilo escritor, la petición no retiene conexiones del pool (se cierra su
+sesión; los objetos ORM que haya leído antes quedan desvinculados de ella).
+
+Sin la cola (por defecto) cada escritura se ejecuta y confirma en el hilo de la petición,
+con el mismo resultado. Variables de entorno:
+  DB_WRITE_QUEUE             '1' activa la cola
+  DB_WRITE_QUEUE_WINDOW_MS   espera máxima para completar un lote (por defecto 2)
+  DB_WRITE_QUEUE_MAX_BATCH   escrituras máximas por commit (por defecto 64)
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from flask import current_app, has_request_context, request
+from sqlalchemy import text
+from logger import get_logger
+from database import db
+import metrics
+
+log = get_logger(__name__)
+
+DB_WRITE_QUEUE = os.environ.get('DB_WRITE_QUEUE', '0') == '1'
+DB_WRITE_QUEUE_WINDOW_MS = float(os.environ.get('DB_WRITE_QUEUE_WINDOW_MS', 2))
+DB_WRITE_QUEUE_MAX_BATCH = int(os.environ.get('DB_WRITE_QUEUE_MAX_BATCH', 64))
+# Tiempo máximo que una petición espera el resultado de su escritura
+ESPERA_MAXIMA_S = float(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 30000)) / 1000 + 30
+
+EXTENSION = 'cola_escritura'
+
+lote_tamano = metrics.Histogram('db_write_batch_size', 'Escrituras confirmadas por commit de la cola de escritura.',
+                                (), (1, 2, 4, 8, 16, 32, 64, 128, 256))
+espera_cola = metrics.Histogram('db_write_queue_wait_seconds', 'Espera en la cola hasta que el escritor toma la escritura.',
+                                ('operation',), metrics.BUCKETS_SEGUNDOS)
+metrics.register_histogram(lote_tamano)
+metrics.register_histogram(espera_cola)
+
+class SinCambios(Exception):
+    """
+    La escritura no aplicó cambios (registro inexistente, conflicto de versión, ...): lo que
+    haya escrito se revierte y ejecutar_escritura retorna 'resultado' en lugar de fallar.
+    """
+
+    def __init__(self, resultado=None):
+        super().__init__('Escritura sin cambios')
+        self.resultado = resultado
+
+class ColaEscritura:
+    """Hilo escritor único que agrupa las escrituras enviadas en commits de varias a la vez."""
+
+    def __init__(self, app, ventana_ms=DB_WRITE_QUEUE_WINDOW_MS, max_lote=DB_WRITE_QUEUE_MAX_BATCH):
+        self.app = app
+        self.ventana = ventana_ms / 1000
+        self.max_lote = max_lote
+        self._cola = queue.SimpleQueue()
+        self._hilo = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def enviar(self, funcion, *args, **kwargs):
+        """Encola funcion(*args, **kwargs) y retorna un Future con su resultado."""
+        self._iniciar()
+        futuro = Future()
+        origen = f"{request.method} {request.path}" if has_request_context() else None
+        self._cola.put((funcion, args, kwargs, futuro, origen, time.perf_counter()))
+        return futuro
+
+    def _iniciar(self):
+        # El hilo se crea al primer uso en cada proceso (un worker creado con fork no lo hereda)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._cola = queue.SimpleQueue()
+                self._hilo = threading.Thread(target=self._ejecutar, name='cola-escritura', daemon=True)
+                self._hilo.start()
+                self._pid = os.getpid()
+
+    def _ejecutar(self):
+        with self.app.app_context():
+            while True:
+                lote = [self._cola.get()]
+                limite = time.perf_counter() + self.ventana
+                while len(lote) < self.max_lote:
+                    restante = limite - time.perf_counter()
+                    try:
+                        lote.append(self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    self._confirmar(lote)
+                except Exception as e:  # El hilo escritor no debe terminar
+                    log.error("Error inesperado en la cola de escritura: %s", e, exc_info=True)
+                finally:
+                    db.session.remove()
+
+    def _confirmar(self, lote):
+        """Ejecuta cada escritura en su SAVEPOINT y confirma las exitosas con un único commit."""
+        exitosas = []
+        try:
+            # Sin un BEGIN explícito, pysqlite dejaría que el primer SAVEPOINT abra la transacción
+            # y su RELEASE la confirmaría: cada escritura tendría su propio commit
+            db.session.execute(text('BEGIN IMMEDIATE'))
+            for funcion, args, kwargs, futuro, origen, encolado in lote:
+                espera_cola.observe((funcion.__name__,), time.perf_counter() - encolado)
+                if not futuro.set_running_or_notify_cancel():
+                    continue
+                db.session.info['origen'] = origen  # Petición que envió la escritura (auditoría)
+                try:
+                    with db.session.begin_nested():
+                        resultado = funcion(*args, **kwargs)
+                except SinCambios as e:
+                    futuro.set_result(e.resultado)
+                except Exception as e:
+                    futuro.set_exception(e)
+                else:
+                    exitosas.append((futuro, resultado))
+                finally:
+                    db.session.info.pop('origen', None)
+            db.session.commit()
+        except Exception as e:
+            # BEGIN (p. ej. 'database is locked' por otro worker) o el commit fallaron: todas las
+            # escrituras pendientes del lote reciben el error en lugar de esperar ESPERA_MAXIMA_S
+            db.session.rollback()
+            log.error("Falló un lote de %s escrituras: %s", len(lote), e)
+            for _, _, _, futuro, _, _ in lote:
+                if not futuro.done():  # Incluye las exitosas, cuyo resultado aún no se entregó
+                    futuro.set_exception(e)
+            return
+        lote_tamano.observe((), len(exitosas))
+        for futuro, resultado in exitosas:
+            futuro.set_result(resultado)
+
+def init_app(app):
+    """Registra la cola de escritura de la aplicación si está activada (DB_WRITE_QUEUE=1)."""
+    if app.config.get('DB_WRITE_QUEUE', DB_WRITE_QUEUE):
+        app.extensions[EXTENSION] = ColaEscritura(app)
+        log.info("Cola de escritura activada (ventana %s ms, lotes de hasta %s)",
+                 DB_WRITE_QUEUE_WINDOW_MS, DB_WRITE_QUEUE_MAX_BATCH)
+
+def ejecutar_escritura(funcion, *args, **kwargs):
+    """
+    Ejecuta una escritura y la confirma. 'funcion' hace los cambios en db.session sin
+    confirmarlos y retorna el resultado (o lanza SinCambios). Con la cola activada se
+    ejecuta en el hilo escritor, agrupada con otras; si no, en el hilo actual. En ambos
+    casos una excepción de la escritura revierte sus cambios y se propaga al llamador.
+    """
+    cola = current_app.extensions.get(EXTENSION)
+    if cola is not None:
+        # La petición devuelve al pool la conexión de sus lecturas previas antes de esperar:
+        # con más peticiones en espera que conexiones, el hilo escritor no obtendría ninguna
+        db.session.close()
+        return cola.enviar(funcion, *args, **kwargs).result(timeout=ESPERA_MAXIMA_S)
+    try:
+        resultado = funcion(*args, **kwargs)
+        db.session.commit()
+        return resultado
+    except SinCambios as e:
+        db.session.rollback()
+        return e.resultado
+    except Exception:
+        db.session.rollback()
+        raise
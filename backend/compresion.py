@@ -0,0 +1,91 @@
+"""
+Compresión de las respuestas de la API según Accept-Encoding (Brotli o gzip).
+
+Un listado JSON de empleados se comprime a una fracción de su tamaño (los nombres de los
+campos y muchos valores se repiten en cada fila). Se comprimen las respuestas 200 de la
+API con un tipo de texto y al menos COMPRESION_MIN_BYTES; Brotli se ofrece sólo si está
+instalado el paquete 'brotli' (dependencia opcional) y, si no, gzip. Los cuerpos
+comprimidos se guardan en una caché por contenido: una respuesta sin cambios (p. ej. el
+mismo listado pedido por varios clientes) se comprime una sola vez.
+
+Variables de entorno:
+  COMPRESION_MIN_BYTES        tamaño mínimo del cuerpo a comprimir (por defecto 1024)
+  COMPRESION_NIVEL_GZIP       nivel de gzip, 1-9 (por defecto 6)
+  COMPRESION_NIVEL_BR         calidad de Brotli, 0-11 (por defecto 5)
+  COMPRESION_CACHE_ENTRADAS   cuerpos comprimidos guardados (por defecto 32; 0 la desactiva)
+"""
+import gzip
+import hashlib
+import os
+from flask import request
+from logger import get_logger
+from utils.cache_utils import VersionedCache
+import metrics
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional
+    brotli = None
+
+log = get_logger(__name__)
+
+COMPRESION_MIN_BYTES = int(os.environ.get('COMPRESION_MIN_BYTES', 1024))
+COMPRESION_NIVEL_GZIP = int(os.environ.get('COMPRESION_NIVEL_GZIP', 6))
+COMPRESION_NIVEL_BR = int(os.environ.get('COMPRESION_NIVEL_BR', 5))
+COMPRESION_CACHE_ENTRADAS = int(os.environ.get('COMPRESION_CACHE_ENTRADAS', 32))
+
+PREFIJO_API = '/api/'
+TIPOS_COMPRIMIBLES = ('application/json', 'text/csv', 'text/plain')
+# Preferencia del servidor cuando el cliente acepta varias con la misma calidad
+CODIFICACIONES = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+respuestas_comprimidas = VersionedCache('respuestas_comprimidas', ttl=300, max_entradas=COMPRESION_CACHE_ENTRADAS)
+
+def comprimir(datos, codificacion):
+    """Comprime 'datos' (bytes) con 'br' o 'gzip'."""
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=COMPRESION_NIVEL_BR)
+    return gzip.compress(datos, compresslevel=COMPRESION_NIVEL_GZIP, mtime=0)
+
+def _comprimido(datos, codificacion):
+    """Cuerpo comprimido, desde la caché si el mismo contenido ya se comprimió."""
+    if not COMPRESION_CACHE_ENTRADAS:
+        return comprimir(datos, codificacion)
+    clave = (codificacion, hashlib.blake2b(datos, digest_size=16).digest())
+    resultado = respuestas_comprimidas.get(clave, 0)
+    if resultado is None:
+        resultado = comprimir(datos, codificacion)
+        respuestas_comprimidas.set(clave, 0, resultado)
+    return resultado
+
+def _comprimir_respuesta(response):
+    if (not request.path.startswith(PREFIJO_API) or response.status_code != 200
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in TIPOS_COMPRIMIBLES):
+        return response
+    response.vary.add('Accept-Encoding')
+    codificacion = request.accept_encodings.best_match(CODIFICACIONES)
+    if codificacion is None:
+        return response
+    datos = response.get_data()
+    if len(datos) < COMPRESION_MIN_BYTES:
+        return response
+    comprimido = _comprimido(datos, codificacion)
+    if len(comprimido) >= len(datos):
+        return response
+    response.set_data(comprimido)
+    response.headers['Content-Encoding'] = codificacion
+    # El cuerpo ya no es idéntico byte a byte al de otras codificaciones: el ETag pasa a ser débil
+    etag, debil = response.get_etag()
+    if etag and not debil:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(app):
+    """
+    Registra la compresión de las respuestas de la API. Debe llamarse después de
+    metrics.init_app para que la latencia medida incluya la compresión.
+    """
+    app.after_request(_comprimir_respuesta)
+    metrics.register_stats_source(respuestas_comprimidas)
+    log.info("Compresión de respuestas activada (%s, desde %s bytes)", '/'.join(CODIFICACIONES), COMPRESION_MIN_BYTES)
@@ -1,33 +1,330 @@
+from flask import has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect, text
+from sqlalchemy.sql.dml import UpdateBase
 import os
-from logger import logger as log
+import zlib
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Ruta del archivo SQLite (DATABASE_PATH permite usar otro archivo, p. ej. en benchmarks)
+DB_PATH = os.environ.get(
+    'DATABASE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gestionAdministrativa.db')
+)
+
+# Ajustes de SQLite aplicados a cada conexión del pool (configurables por variables de entorno)
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 30000))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+# Pool adicional de solo lectura para las rutas GET
+DB_READ_POOL = os.environ.get('DB_READ_POOL', '0') == '1'
+READ_BIND = 'lectura'
+
+class RoutingSession(Session):
+    """
+    Sesión que envía las consultas de lectura de las peticiones GET/HEAD al pool de
+    solo lectura (si está habilitado). Las escrituras y los flush usan siempre el pool principal.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and READ_BIND in self._db.engines and not self._flushing
+                and not isinstance(clause, UpdateBase)
+                and has_request_context() and request.method in ('GET', 'HEAD')):
+            return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
 
 # Crear la instancia de SQLAlchemy
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def _aplicar_pragmas(dbapi_connection, connection_record, solo_lectura=False):
+    """Configura cada conexión nueva del pool: WAL, espera ante bloqueos y caché."""
+    cursor = dbapi_connection.cursor()
+    try:
+        if not solo_lectura:
+            cursor.execute("PRAGMA journal_mode=WAL")  # Lectores concurrentes con un escritor
+        cursor.execute("PRAGMA synchronous=NORMAL")  # Seguro con WAL y evita un fsync por commit
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+def engine_options(solo_lectura=False):
+    """Opciones del engine de SQLAlchemy: tamaño del pool y parámetros de conexión de sqlite3."""
+    return {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'connect_args': {
+            'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+            'check_same_thread': False,  # las conexiones del pool pasan entre hilos
+            **({'uri': True} if solo_lectura else {}),
+        },
+    }
+
+def _agregar_columnas_faltantes():
+    """
+    Añade a las tablas existentes las columnas nuevas de los modelos (create_all sólo
+    crea tablas que no existen). Las columnas nuevas deben ser anulables o tener server_default.
+    """
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existentes = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existentes:
+                    continue
+                tipo = column.type.compile(dialect=db.engine.dialect)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {tipo}'
+                for fk in column.foreign_keys:
+                    ddl += f' REFERENCES {fk.column.table.name}({fk.column.name})'
+                if column.server_default is not None:
+                    if not column.nullable:
+                        ddl += ' NOT NULL'
+                    ddl += f' DEFAULT {column.server_default.arg}'
+                conn.execute(text(ddl))
+                log.info("Columna %s.%s añadida a la base de datos", table.name, column.name)
+                if column.name == 'revision':
+                    _numerar_revisiones(conn, table.name)
+                elif (table.name, column.name) == ('empleados', 'cargo_id'):
+                    vincular_cargos_empleados(conn)
+                elif (table.name, column.name) == ('pagos', 'periodo'):
+                    conn.execute(text("UPDATE pagos SET periodo = substr(fecha, 1, 7)"))
+
+def _activar_autoincremento():
+    """
+    Recrea con AUTOINCREMENT las tablas cuyo modelo lo pide y que se crearon sin él (SQLite no
+    permite cambiarlo con ALTER TABLE). Sin AUTOINCREMENT, al borrar las filas de mayor id esos
+    id se reutilizan; en 'pagos' chocarían con los de los pagos archivados en snapshots.
+    """
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not table.kwargs.get('sqlite_autoincrement'):
+                continue
+            ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :tabla"),
+                               {'tabla': table.name}).scalar()
+            if ddl is None or 'AUTOINCREMENT' in ddl.upper():
+                continue
+            anterior = f'{table.name}_anterior'
+            conn.execute(text(f'ALTER TABLE {table.name} RENAME TO {anterior}'))
+            for index in table.indexes:
+                conn.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+            table.create(conn)
+            columnas = ', '.join(column.name for column in table.columns)
+            conn.execute(text(f'INSERT INTO {table.name} ({columnas}) SELECT {columnas} FROM {anterior}'))
+            conn.execute(text(f'DROP TABLE {anterior}'))
+            log.info("Tabla %s recreada con AUTOINCREMENT", table.name)
+
+def _numerar_revisiones(conn, tabla):
+    """
+    Asigna una revisión distinta a cada fila previa a la columna 'revision' y ajusta el
+    contador de la tabla, para que el feed de cambios pueda paginarlas sin omitir ninguna.
+    """
+    conn.execute(text(f'UPDATE {tabla} SET revision = rowid'))
+    conn.execute(text(
+        f"INSERT INTO versiones_tabla (tabla, version) SELECT :tabla, COALESCE(MAX(revision), 0) FROM {tabla} WHERE true "
+        "ON CONFLICT(tabla) DO UPDATE SET version = MAX(version, excluded.version)"
+    ), {'tabla': tabla})
+
+def vincular_cargos_empleados(conn):
+    """
+    Completa empleados.cargo_id a partir del nombre de cargo guardado como texto
+    (sin distinguir mayúsculas; si hay varios cargos con el mismo nombre se prefiere
+    el activo de menor id). Retorna la cantidad de empleados vinculados.
+    """
+    resultado = conn.execute(text("""
+        UPDATE empleados SET cargo_id = (
+            SELECT c.id FROM cargos c
+            WHERE c.nombre = empleados.cargo COLLATE NOCASE
+            ORDER BY c.estatus DESC, c.id LIMIT 1
+        )
+        WHERE cargo_id IS NULL AND cargo IS NOT NULL
+    """))
+    log.info("%s empleados vinculados a su cargo por nombre", resultado.rowcount)
+    return resultado.rowcount
+
+# Índice de búsqueda de texto completo sobre empleados (FTS5 con contenido externo: el
+# índice no duplica los textos, los lee de 'empleados' por rowid = cédula).
+# remove_diacritics 2 hace la búsqueda insensible a acentos y mayúsculas ("jose" encuentra
+# "José") y los índices de prefijo aceleran las búsquedas de 2 y 3 caracteres del typeahead.
+# Los triggers lo mantienen sincronizado con cualquier escritura, incluidas las masivas.
+DDL_BUSQUEDA_EMPLEADOS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS empleados_fts USING fts5(
+        nombre, correo, cargo, cedula,
+        content='empleados', content_rowid='cedula',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS empleados_fts_ai AFTER INSERT ON empleados BEGIN
+        INSERT INTO empleados_fts (rowid, nombre, correo, cargo, cedula)
+        VALUES (new.cedula, new.nombre, new.correo, new.cargo, new.cedula);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS empleados_fts_ad AFTER DELETE ON empleados BEGIN
+        INSERT INTO empleados_fts (empleados_fts, rowid, nombre, correo, cargo, cedula)
+        VALUES ('delete', old.cedula, old.nombre, old.correo, old.cargo, old.cedula);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS empleados_fts_au AFTER UPDATE OF cedula, nombre, correo, cargo ON empleados BEGIN
+        INSERT INTO empleados_fts (empleados_fts, rowid, nombre, correo, cargo, cedula)
+        VALUES ('delete', old.cedula, old.nombre, old.correo, old.cargo, old.cedula);
+        INSERT INTO empleados_fts (rowid, nombre, correo, cargo, cedula)
+        VALUES (new.cedula, new.nombre, new.correo, new.cargo, new.cedula);
+    END""",
+]
+# Pesos de bm25 por columna (nombre, correo, cargo, cedula) para la columna 'rank'
+PESOS_BUSQUEDA_EMPLEADOS = 'bm25(10.0, 2.0, 1.0, 5.0)'
+
+def crear_indice_busqueda(conn):
+    """
+    Crea el índice FTS5 de empleados y sus triggers si no existen. Si el índice es
+    nuevo y ya hay empleados, lo construye a partir de la tabla.
+    """
+    existia = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'empleados_fts'"
+    )).first() is not None
+    for ddl in DDL_BUSQUEDA_EMPLEADOS:
+        conn.execute(text(ddl))
+    if not existia:
+        conn.execute(text("INSERT INTO empleados_fts (empleados_fts, rank) VALUES ('rank', :rank)"),
+                     {'rank': PESOS_BUSQUEDA_EMPLEADOS})
+        conn.execute(text("INSERT INTO empleados_fts (empleados_fts) VALUES ('rebuild')"))
+        log.info("Índice de búsqueda de empleados creado")
+
+# Libro de pagos de sólo inserción: no se modifican pagos, no se registran pagos en un
+# período cerrado y sólo se eliminan los de períodos cerrados (archivados en su snapshot).
+DDL_LIBRO_PAGOS = [
+    """CREATE TRIGGER IF NOT EXISTS pagos_sin_modificaciones BEFORE UPDATE ON pagos BEGIN
+        SELECT RAISE(ABORT, 'Los pagos registrados no se pueden modificar');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pagos_periodo_abierto BEFORE INSERT ON pagos
+    WHEN EXISTS (SELECT 1 FROM cierres_nomina WHERE periodo = new.periodo) BEGIN
+        SELECT RAISE(ABORT, 'El período del pago está cerrado');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pagos_solo_archivados BEFORE DELETE ON pagos
+    WHEN NOT EXISTS (SELECT 1 FROM cierres_nomina WHERE periodo = old.periodo) BEGIN
+        SELECT RAISE(ABORT, 'Sólo se eliminan los pagos de períodos cerrados');
+    END""",
+]
 
 def init_app(app):
     """
-    Inicializa la instancia de SQLAlchemy con la aplicación Flask.
-    Configura la base de datos y registra los eventos.
+    Inicializa la instancia de SQLAlchemy con la aplicación Flask y registra los eventos
+    de conexión. No toca el esquema (ver migrar() y verificar_esquema()).
     """
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gestionAdministrativa.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{DB_PATH}'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
+    if DB_READ_POOL:
+        app.config['SQLALCHEMY_BINDS'] = {
+            READ_BIND: {
+                'url': f'sqlite:///file:{DB_PATH}?mode=ro&uri=true',
+                **engine_options(solo_lectura=True),
+            }
+        }
     
     # Inicializar la aplicación con SQLAlchemy
     db.init_app(app)
     
-    # Registrar evento para crear tablas
+    # Aplicar los PRAGMA en cada conexión nueva de cada pool
     with app.app_context():
-        try:
-            # Importar los modelos para que SQLAlchemy los conozca
-            import models
-            
-            # Crear todas las tablas
-            db.create_all()
-            log.info("Base de datos inicializada correctamente con SQLAlchemy")
-        except Exception as e:
-            log.error(f"Error al inicializar la base de datos: {e}", exc_info=True)
-            raise
+        for key, engine in db.engines.items():
+            solo_lectura = key == READ_BIND
+            event.listen(engine, 'connect',
+                         lambda conn, record, ro=solo_lectura: _aplicar_pragmas(conn, record, ro))
     
-    log.info("Configuración de SQLAlchemy completada") 
\ No newline at end of file
+    log.info("Configuración de SQLAlchemy completada")
+
+def huella_esquema():
+    """
+    Huella del esquema que definen los modelos (tablas, columnas e índices), guardada en
+    PRAGMA user_version al migrar. Cambia sola al modificar un modelo, sin numerar versiones.
+    """
+    import models  # Registra todas las tablas en db.metadata
+    partes = []
+    for table in db.metadata.sorted_tables:
+        partes.append(table.name)
+        partes.extend(f'{column.name}:{column.type}' for column in table.columns)
+        partes.extend(sorted(index.name for index in table.indexes))
+    partes.extend(DDL_BUSQUEDA_EMPLEADOS + DDL_LIBRO_PAGOS)
+    return zlib.crc32('|'.join(partes).encode('utf-8')) & 0x7FFFFFFF  # user_version es un entero con signo
+
+def _verificar_correos_unicos():
+    """
+    El índice único sobre lower(correo) no puede crearse si hay correos que sólo difieren en
+    mayúsculas (posibles antes en las importaciones). No se elige cuál conservar: se informan
+    para corregirlos a mano antes de migrar.
+    """
+    with db.engine.connect() as conn:
+        duplicados = conn.execute(text(
+            "SELECT lower(correo), group_concat(cedula, ', ') FROM empleados WHERE correo IS NOT NULL "
+            "GROUP BY lower(correo) HAVING count(*) > 1 LIMIT 20"
+        )).all()
+    if duplicados:
+        detalle = '; '.join(f"{correo} (cédulas {cedulas})" for correo, cedulas in duplicados)
+        raise RuntimeError(f"Hay correos repetidos sin distinguir mayúsculas; corríjalos antes de migrar: {detalle}")
+
+def migrar():
+    """
+    Crea o actualiza el esquema de la base de datos (tablas, columnas e índices nuevos, índice
+    de búsqueda y triggers) y registra su huella. Es idempotente. Se ejecuta como un paso
+    explícito ('flask --app app migrar-db' o 'python init_db.py') antes de iniciar los
+    workers, no al arrancar cada proceso. Requiere un contexto de aplicación.
+    """
+    try:
+        import models  # Importar los modelos para que SQLAlchemy los conozca
+        
+        # Crear todas las tablas
+        db.create_all()
+        _agregar_columnas_faltantes()
+        _activar_autoincremento()
+        with db.engine.begin() as conn:
+            crear_indice_busqueda(conn)
+            for ddl in DDL_LIBRO_PAGOS:
+                conn.execute(text(ddl))
+        
+        _verificar_correos_unicos()
+        # create_all no añade índices nuevos a tablas ya existentes. Los existentes se leen de
+        # sqlite_master: el inspector de SQLAlchemy omite los índices sobre expresiones
+        with db.engine.connect() as conn:
+            existentes = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existentes:
+                    index.create(bind=db.engine)
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(f'PRAGMA user_version = {huella_esquema()}')
+        log.info("Esquema de la base de datos actualizado")
+    except Exception as e:
+        log.error("Error al migrar la base de datos: %s", e, exc_info=True)
+        raise
+
+def verificar_esquema(app, migrar_si_falta=False):
+    """
+    Comprueba con una sola lectura de PRAGMA user_version que la base de datos tenga el
+    esquema de los modelos. Si no lo tiene, migra (con 'migrar_si_falta') o lanza RuntimeError.
+    """
+    with app.app_context():
+        with db.engine.connect() as conn:
+            actual = conn.exec_driver_sql('PRAGMA user_version').scalar()
+        if actual == huella_esquema():
+            return
+        if not migrar_si_falta:
+            raise RuntimeError(
+                f"El esquema de la base de datos {DB_PATH} no está actualizado; "
+                "ejecute 'flask --app app migrar-db' antes de iniciar el servidor"
+            )
+        migrar()
+
+def reiniciar_conexiones(app):
+    """
+    Descarta (sin cerrarlas) las conexiones heredadas del proceso padre tras un fork, para
+    que cada worker abra las suyas: una conexión de SQLite no se comparte entre procesos.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,29 @@
+"""
+Configuración de gunicorn para producción: gunicorn -c gunicorn.conf.py
+
+Variables de entorno:
+  GUNICORN_BIND       dirección de escucha (por defecto 0.0.0.0:5001)
+  WEB_CONCURRENCY     cantidad de workers (por defecto, la cantidad de CPU)
+  GUNICORN_THREADS    hilos por worker (por defecto 4)
+  GUNICORN_TIMEOUT    segundos antes de reiniciar un worker bloqueado (por defecto 60)
+"""
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+# SQLite admite un solo escritor: más workers que CPU no aumentan el rendimiento
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = 5
+
+# La aplicación (modelos, blueprints, NumPy) se importa una vez en el maestro y los workers
+# la heredan con fork: arrancar o reponer un worker no repite las importaciones
+preload_app = True
+
+def post_fork(server, worker):
+    """Cada worker abre sus propias conexiones en lugar de usar las heredadas del maestro."""
+    import database
+    from wsgi import app
+    database.reiniciar_conexiones(app)
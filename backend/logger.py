@@ -1,36 +1,122 @@
 """
 Módulo centralizado de logging para el backend.
-Todos los módulos deben importar el logger desde aquí.
+Todos los módulos deben obtener su logger desde aquí con get_logger(__name__).
+
+Los registros se encolan en memoria (QueueHandler), con el mensaje ya resuelto, y un
+hilo en segundo plano (QueueListener) les da formato y los escribe en disco, de modo
+que las peticiones no esperan por la E/S del archivo. Variables de entorno:
+  LOG_LEVEL   nivel global (por defecto INFO)
+  LOG_LEVELS  niveles por módulo, p. ej. "routes=DEBUG,sqlalchemy.engine=INFO"
+  LOG_FORMAT  'text' (por defecto) o 'json' (una línea JSON por registro)
+  LOG_DIR     carpeta de los archivos de log (por defecto backend/logs)
 """
+import atexit
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una sola línea."""
+
+    def format(self, record):
+        datos = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'file': record.filename,
+            'line': record.lineno,
+        }
+        excepcion = self.formatException(record.exc_info) if record.exc_info else record.exc_text
+        if excepcion:  # Los registros de la cola traen la traza ya formateada (exc_text)
+            datos['exception'] = excepcion
+        return json.dumps(datos, ensure_ascii=False)
+
+_formateador_trazas = logging.Formatter()
+
+class _LazyQueueHandler(QueueHandler):
+    """
+    Encola una copia del registro con el mensaje ya resuelto y la traza de la excepción
+    como texto: los argumentos (p. ej. un dict o un objeto ORM que cambie después, o que
+    no pueda leerse fuera de su sesión) y los frames de la traza no se retienen hasta que
+    el hilo escritor lo procese. A diferencia de QueueHandler.prepare no aplica el formato
+    de la línea (fecha, nivel, JSON), que sigue ocurriendo en el hilo escritor.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _formateador_trazas.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _parse_levels(valor):
+    """Convierte "modulo=NIVEL,otro=NIVEL" en un diccionario {modulo: NIVEL}."""
+    niveles = {}
+    for parte in (valor or '').split(','):
+        nombre, _, nivel = parte.strip().partition('=')
+        if nombre and nivel:
+            niveles[nombre.strip()] = nivel.strip().upper()
+    return niveles
 
 # Configuración básica
 def setup_logging():
     # Crear carpeta logs si no existe
-    log_dir = os.path.join(os.path.dirname(__file__), 'logs')
+    log_dir = os.environ.get('LOG_DIR', os.path.join(os.path.dirname(__file__), 'logs'))
     os.makedirs(log_dir, exist_ok=True)
-    
+
     # Formato común
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s [%(filename)s:%(lineno)d]'
-    )
-    
-    # Handler para archivo (todos los niveles)
+    if os.environ.get('LOG_FORMAT', 'text').lower() == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s [%(filename)s:%(lineno)d]'
+        )
+
+    # Handler para archivo; sólo lo usa el hilo escritor
     log_file = os.path.join(log_dir, 'backend.log')
     file_handler = RotatingFileHandler(
         log_file, maxBytes=10*1024*1024, backupCount=5, encoding='utf-8'
     )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(logging.DEBUG)
-    
+
+    # Cola en memoria + hilo escritor en segundo plano
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Vaciar la cola al terminar el proceso
+    queue_handler = _LazyQueueHandler(log_queue)
+
+    # Un proceso hijo (p. ej. un worker de gunicorn con preload) no hereda el hilo escritor:
+    # se le crea una cola y un hilo propios
+    def _reiniciar_en_hijo():
+        listener.queue = queue_handler.queue = queue.SimpleQueue()
+        listener._thread = None
+        listener.start()
+
+    if hasattr(os, 'register_at_fork'):  # No disponible en Windows (allí no hay fork)
+        os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
     # Configurar logger raíz
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(file_handler)
-    
+    root_logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    root_logger.addHandler(queue_handler)
+
+    # Niveles por módulo (los hijos heredan el nivel del prefijo)
+    for nombre, nivel in _parse_levels(os.environ.get('LOG_LEVELS')).items():
+        logging.getLogger(nombre).setLevel(nivel)
+
     return root_logger
 
+def get_logger(name):
+    """Obtiene el logger de un módulo; su nivel se puede ajustar con LOG_LEVELS."""
+    return logging.getLogger(name)
+
 # Inicializar logging al importar este módulo
 logger = setup_logging()
@@ -0,0 +1,167 @@
+"""
+Instrumentación de rendimiento por petición.
+
+Registra, por ruta, método y código de estado: latencia total, cantidad de sentencias
+SQL y tiempo en SQL (eventos del engine de SQLAlchemy) y tiempo de serialización JSON.
+Los datos se exponen en formato de texto de Prometheus en /metrics y las peticiones
+más lentas que SLOW_REQUEST_MS se registran en el log con su desglose.
+
+Las métricas son del proceso: con varios workers cada uno expone las suyas.
+"""
+import os
+import threading
+import time
+from flask import Blueprint, Response, g, has_request_context, request
+from sqlalchemy import event
+from logger import get_logger
+from utils.json_utils import FastJSONProvider
+
+log = get_logger(__name__)
+
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+
+BUCKETS_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SENTENCIAS = (1, 2, 5, 10, 20, 50, 100, 500)
+
+class Histogram:
+    """Histograma acumulativo con etiquetas, compatible con el formato de Prometheus."""
+
+    def __init__(self, nombre, descripcion, etiquetas, buckets):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = etiquetas
+        self.buckets = buckets
+        self._series = {}  # valores de etiquetas -> [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, valores, valor):
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += valor
+            serie[2] += 1
+
+    def render(self):
+        lineas = [f'# HELP {self.nombre} {self.descripcion}', f'# TYPE {self.nombre} histogram']
+        with self._lock:
+            series = [(k, list(v[0]), v[1], v[2]) for k, v in sorted(self._series.items())]
+        for valores, conteos, suma, total in series:
+            base = ''.join(f'{e}="{_escapar(v)}",' for e, v in zip(self.etiquetas, valores))
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, conteos):
+                acumulado += conteo
+                lineas.append(f'{self.nombre}_bucket{{{base}le="{limite}"}} {acumulado}')
+            lineas.append(f'{self.nombre}_bucket{{{base}le="+Inf"}} {total}')
+            lineas.append(f'{self.nombre}_sum{{{base[:-1]}}} {suma}')
+            lineas.append(f'{self.nombre}_count{{{base[:-1]}}} {total}')
+        return lineas
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+ETIQUETAS = ('method', 'route', 'status')
+latencia = Histogram('http_request_duration_seconds', 'Latencia total de la petición.', ETIQUETAS, BUCKETS_SEGUNDOS)
+sql_sentencias = Histogram('http_request_sql_statements', 'Sentencias SQL ejecutadas por petición.', ETIQUETAS, BUCKETS_SENTENCIAS)
+sql_tiempo = Histogram('http_request_sql_duration_seconds', 'Tiempo en SQL por petición.', ETIQUETAS, BUCKETS_SEGUNDOS)
+serializacion = Histogram('http_request_serialization_seconds', 'Tiempo de serialización JSON por petición.', ETIQUETAS, BUCKETS_SEGUNDOS)
+HISTOGRAMAS = [latencia, sql_sentencias, sql_tiempo, serializacion]
+
+# Fuentes adicionales (p. ej. cachés) que exponen un método stats(); se muestran como contadores
+_fuentes_stats = []
+
+def register_histogram(histograma):
+    """Registra un histograma de otro módulo (p. ej. la cola de escritura) para exponerlo en /metrics."""
+    if histograma not in HISTOGRAMAS:
+        HISTOGRAMAS.append(histograma)
+
+def register_stats_source(fuente):
+    """Registra un objeto con stats() -> {'nombre', 'hits', 'misses', ...} para exponerlo en /metrics."""
+    if fuente not in _fuentes_stats:
+        _fuentes_stats.append(fuente)
+
+class TimedJSONProvider(FastJSONProvider):
+    """Proveedor JSON de Flask que acumula en la petición el tiempo dedicado a serializar."""
+
+    def encode(self, obj, indent=False):
+        inicio = time.perf_counter()
+        try:
+            return super().encode(obj, indent)
+        finally:
+            if has_request_context():
+                g.metricas_serializacion = g.get('metricas_serializacion', 0.0) + time.perf_counter() - inicio
+
+def _antes_de_sql(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metricas_inicio', []).append(time.perf_counter())
+
+def _despues_de_sql(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('metricas_inicio')
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    if has_request_context():
+        g.metricas_sql_sentencias = g.get('metricas_sql_sentencias', 0) + 1
+        g.metricas_sql_tiempo = g.get('metricas_sql_tiempo', 0.0) + duracion
+
+def _error_sql(contexto):
+    conexion = contexto.connection
+    if conexion is not None and conexion.info.get('metricas_inicio'):
+        conexion.info['metricas_inicio'].pop()
+
+def _inicio_peticion():
+    g.metricas_inicio = time.perf_counter()
+
+def _fin_peticion(response):
+    inicio = g.get('metricas_inicio')
+    if inicio is None:
+        return response
+    duracion = time.perf_counter() - inicio
+    ruta = request.url_rule.rule if request.url_rule else 'sin_ruta'
+    etiquetas = (request.method, ruta, str(response.status_code))
+    sentencias = g.get('metricas_sql_sentencias', 0)
+    tiempo_sql = g.get('metricas_sql_tiempo', 0.0)
+    tiempo_json = g.get('metricas_serializacion', 0.0)
+
+    latencia.observe(etiquetas, duracion)
+    sql_sentencias.observe(etiquetas, sentencias)
+    sql_tiempo.observe(etiquetas, tiempo_sql)
+    serializacion.observe(etiquetas, tiempo_json)
+
+    if duracion * 1000 >= SLOW_REQUEST_MS:
+        log.warning("Petición lenta %s %s -> %s: %.1f ms (SQL: %s sentencias, %.1f ms; JSON: %.1f ms)",
+                    request.method, request.full_path, response.status_code, duracion * 1000,
+                    sentencias, tiempo_sql * 1000, tiempo_json * 1000)
+    return response
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+# GET /metrics - Métricas del proceso en formato de texto de Prometheus
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Expone las métricas recolectadas en formato de texto de Prometheus."""
+    lineas = []
+    for histograma in HISTOGRAMAS:
+        lineas.extend(histograma.render())
+    if _fuentes_stats:
+        for metrica in ('hits', 'misses'):
+            lineas.append(f'# TYPE cache_{metrica}_total counter')
+            for fuente in _fuentes_stats:
+                stats = fuente.stats()
+                lineas.append(f'cache_{metrica}_total{{cache="{_escapar(stats["nombre"])}"}} {stats[metrica]}')
+    return Response('\n'.join(lineas) + '\n', mimetype='text/plain; version=0.0.4')
+
+def init_app(app, engines):
+    """Registra los hooks de petición, los eventos de SQL de cada engine y la ruta /metrics."""
+    app.json = TimedJSONProvider(app)
+    app.before_request(_inicio_peticion)
+    app.after_request(_fin_peticion)
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _antes_de_sql)
+        event.listen(engine, 'after_cursor_execute', _despues_de_sql)
+        event.listen(engine, 'handle_error', _error_sql)
+    app.register_blueprint(metrics_bp)
+    log.info("Instrumentación de métricas registrada")
@@ -1,6 +1,14 @@
 # Importar todos los modelos
 from models.empleado import Empleado
 from models.cargo import Cargo
+from models.pago import Pago
+from models.cierre_nomina import CierreNomina
+from models.version_tabla import VersionTabla
+from models.resumen_empleados import ResumenEmpleados
+from models.auditoria import Auditoria
+from models.trabajo_nomina import TrabajoNomina
+from models.recibo_nomina import ReciboNomina, ResumenCargoNomina
 
 # Exportar todos los modelos para que puedan ser importados desde 'models'
-__all__ = ['Empleado', 'Cargo'] 
\ No newline at end of file
+__all__ = ['Empleado', 'Cargo', 'Pago', 'CierreNomina', 'VersionTabla', 'ResumenEmpleados', 'Auditoria',
+           'TrabajoNomina', 'ReciboNomina', 'ResumenCargoNomina']
@@ -0,0 +1,37 @@
+import json
+from database import db
+
+class Auditoria(db.Model):
+    """
+    Modelo para la tabla 'auditoria' (historial de cambios de empleados y cargos).
+    Cada fila guarda una alta, modificación o baja con los valores anteriores y nuevos de
+    los campos que cambiaron. Se escribe en lotes al confirmar la transacción del cambio
+    (ver services/auditoria_service.py).
+    """
+    __tablename__ = 'auditoria'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tabla = db.Column(db.String(20), nullable=False)  # 'empleados' o 'cargos'
+    registro_id = db.Column(db.Integer, nullable=False)  # Cédula del empleado o id del cargo
+    operacion = db.Column(db.String(12), nullable=False)  # 'alta', 'modificacion' o 'baja'
+    antes = db.Column(db.Text)  # JSON con los valores anteriores de los campos modificados
+    despues = db.Column(db.Text)  # JSON con los valores nuevos
+    fecha = db.Column(db.DateTime, nullable=False)  # UTC
+    origen = db.Column(db.String(120))  # Petición que hizo el cambio (método y ruta)
+    
+    __table_args__ = (
+        db.Index('ix_auditoria_tabla_registro_fecha', 'tabla', 'registro_id', 'fecha', 'id'),
+    )
+    
+    def to_dict(self):
+        """Convierte el modelo a un diccionario para serialización JSON."""
+        return {
+            'id': self.id,
+            'tabla': self.tabla,
+            'registro_id': self.registro_id,
+            'operacion': self.operacion,
+            'antes': json.loads(self.antes) if self.antes else None,
+            'despues': json.loads(self.despues) if self.despues else None,
+            'fecha': self.fecha.strftime('%Y-%m-%dT%H:%M:%SZ') if self.fecha else None,
+            'origen': self.origen,
+        }
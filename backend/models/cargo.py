@@ -9,6 +9,12 @@ class Cargo(db.Model):
     nivel = db.Column(db.Integer, nullable=False)
     sueldo_base = db.Column(db.Float, nullable=False)
     estatus = db.Column(db.Integer, default=1)
+    revision = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Versión de 'cargos' en su último cambio
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Versión de la fila (control de concurrencia optimista)
+    
+    __table_args__ = (
+        db.Index('ix_cargos_revision', 'revision'),
+    )
     
     def __init__(self, nombre, nivel, sueldo_base):
         self.nombre = nombre
@@ -23,5 +29,7 @@ class Cargo(db.Model):
             'nombre': self.nombre,
             'nivel': self.nivel,
             'sueldo_base': self.sueldo_base,
-            'estatus': self.estatus
+            'estatus': self.estatus,
+            'revision': self.revision,
+            'version': self.version
         } 
\ No newline at end of file
@@ -0,0 +1,28 @@
+from database import db
+
+class CierreNomina(db.Model):
+    """
+    Modelo para la tabla 'cierres_nomina' (un registro por período de pagos cerrado).
+    Al cerrar un período sus pagos se archivan en un snapshot columnar inmutable (ver
+    services/pago_service.py) y se retiran de la tabla 'pagos'; los totales quedan aquí.
+    """
+    __tablename__ = 'cierres_nomina'
+    
+    periodo = db.Column(db.String(7), primary_key=True)  # 'AAAA-MM'
+    cerrado_en = db.Column(db.DateTime, nullable=False)  # UTC
+    pagos = db.Column(db.Integer, nullable=False, default=0)
+    creditos = db.Column(db.Float, nullable=False, default=0)
+    debitos = db.Column(db.Float, nullable=False, default=0)
+    archivo = db.Column(db.String(255))  # Directorio del snapshot, relativo a SNAPSHOTS_DIR
+    
+    def to_dict(self):
+        """Convierte el modelo a un diccionario para serialización JSON."""
+        return {
+            'periodo': self.periodo,
+            'cerrado_en': self.cerrado_en.strftime('%Y-%m-%dT%H:%M:%SZ') if self.cerrado_en else None,
+            'pagos': self.pagos,
+            'creditos': round(self.creditos, 2),
+            'debitos': round(self.debitos, 2),
+            'neto': round(self.creditos - self.debitos, 2),
+            'archivo': self.archivo,
+        }
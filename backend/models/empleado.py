@@ -7,19 +7,39 @@ class Empleado(db.Model):
     
     cedula = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(100), nullable=False)
-    cargo = db.Column(db.String(100))
+    cargo = db.Column(db.String(100))  # Nombre del cargo, copia de cargos.nombre para ordenar y filtrar
+    cargo_id = db.Column(db.Integer, db.ForeignKey('cargos.id'))
     fecha_nacimiento = db.Column(db.Date)
     sexo = db.Column(db.String(1))
     fecha_ingreso = db.Column(db.Date)
     telefono = db.Column(db.Integer)
     correo = db.Column(db.String(100), unique=True)
     estatus = db.Column(db.Integer, default=1)
+    revision = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Versión de 'empleados' en su último cambio
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Versión de la fila (control de concurrencia optimista)
+    
+    # Índices compuestos para la paginación por cursor del listado de activos.
+    # Cada uno termina en la cédula para que el orden sea total y estable.
+    __table_args__ = (
+        db.Index('ix_empleados_estatus_nombre_cedula', 'estatus', db.text('nombre COLLATE NOCASE'), 'cedula'),
+        db.Index('ix_empleados_estatus_cargo_cedula', 'estatus', db.text('cargo COLLATE NOCASE'), 'cedula'),
+        db.Index('ix_empleados_estatus_fecha_ingreso_cedula', 'estatus', 'fecha_ingreso', 'cedula'),
+        db.Index('ix_empleados_estatus_fecha_nacimiento_cedula', 'estatus', 'fecha_nacimiento', 'cedula'),
+        db.Index('ix_empleados_revision', 'revision'),
+        db.Index('ix_empleados_cargo_id_estatus', 'cargo_id', 'estatus'),
+        # El correo es único sin distinguir mayúsculas, en las altas individuales y en la importación
+        db.Index('ux_empleados_correo_lower', db.text('lower(correo)'), unique=True),
+    )
+    
+    # Cargo asignado; se carga en la misma consulta (LEFT JOIN) para evitar una consulta por empleado
+    cargo_ref = db.relationship('Cargo', lazy='joined', innerjoin=False)
     
     def __init__(self, cedula, nombre, cargo=None, fecha_nacimiento=None, 
-                 sexo=None, fecha_ingreso=None, telefono=None, correo=None):
+                 sexo=None, fecha_ingreso=None, telefono=None, correo=None, cargo_id=None):
         self.cedula = cedula
         self.nombre = nombre
         self.cargo = cargo
+        self.cargo_id = cargo_id
         self.fecha_nacimiento = fecha_nacimiento
         self.sexo = sexo
         self.fecha_ingreso = fecha_ingreso
@@ -32,11 +52,16 @@ class Empleado(db.Model):
         return {
             'cedula': self.cedula,
             'nombre': self.nombre,
-            'cargo': self.cargo,
+            'cargo': self.cargo_ref.nombre if self.cargo_ref else self.cargo,
+            'cargo_id': self.cargo_id,
+            'cargo_nivel': self.cargo_ref.nivel if self.cargo_ref else None,
+            'cargo_sueldo_base': self.cargo_ref.sueldo_base if self.cargo_ref else None,
             'fecha_nacimiento': self.fecha_nacimiento.strftime('%Y-%m-%d') if self.fecha_nacimiento else None,
             'sexo': self.sexo,
             'fecha_ingreso': self.fecha_ingreso.strftime('%Y-%m-%d') if self.fecha_ingreso else None,
             'telefono': self.telefono,
             'correo': self.correo,
-            'estatus': self.estatus
+            'estatus': self.estatus,
+            'revision': self.revision,
+            'version': self.version
         } 
\ No newline at end of file
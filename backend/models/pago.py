@@ -0,0 +1,54 @@
+from database import db
+
+class Pago(db.Model):
+    """
+    Modelo para la tabla 'pagos' (créditos y débitos aplicados a empleados).
+    Es un libro de sólo inserción: los triggers de database.DDL_LIBRO_PAGOS rechazan las
+    modificaciones y los pagos en períodos cerrados, que se consultan desde su snapshot.
+    """
+    __tablename__ = 'pagos'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    cedula = db.Column(db.Integer, db.ForeignKey('empleados.cedula'), nullable=False)
+    cargo_id = db.Column(db.Integer, db.ForeignKey('cargos.id'))
+    tipo = db.Column(db.String(10), nullable=False)  # 'credito' o 'debito'
+    monto = db.Column(db.Float, nullable=False)
+    concepto = db.Column(db.String(200))
+    fecha = db.Column(db.Date, nullable=False)
+    periodo = db.Column(db.String(7))  # 'AAAA-MM' de la fecha
+    lote = db.Column(db.String(32))  # Identificador de la operación masiva que generó el pago
+    estatus = db.Column(db.Integer, default=1)
+    
+    __table_args__ = (
+        db.Index('ix_pagos_cedula_fecha', 'cedula', 'fecha'),
+        db.Index('ix_pagos_cargo_fecha', 'cargo_id', 'fecha'),
+        db.Index('ix_pagos_lote', 'lote'),
+        db.Index('ix_pagos_periodo_cedula', 'periodo', 'cedula'),
+        {'sqlite_autoincrement': True},  # Los id de los pagos archivados no se reutilizan
+    )
+    
+    def __init__(self, cedula, tipo, monto, fecha, cargo_id=None, concepto=None, lote=None):
+        self.cedula = cedula
+        self.cargo_id = cargo_id
+        self.tipo = tipo
+        self.monto = monto
+        self.concepto = concepto
+        self.fecha = fecha
+        self.periodo = fecha.strftime('%Y-%m') if fecha else None
+        self.lote = lote
+        self.estatus = 1
+    
+    def to_dict(self):
+        """Convierte el modelo a un diccionario para serialización JSON."""
+        return {
+            'id': self.id,
+            'cedula': self.cedula,
+            'cargo_id': self.cargo_id,
+            'tipo': self.tipo,
+            'monto': self.monto,
+            'concepto': self.concepto,
+            'fecha': self.fecha.strftime('%Y-%m-%d') if self.fecha else None,
+            'periodo': self.periodo,
+            'lote': self.lote,
+            'estatus': self.estatus
+        }
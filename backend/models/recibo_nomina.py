@@ -0,0 +1,56 @@
+from database import db
+
+class ReciboNomina(db.Model):
+    """
+    Modelo para la tabla 'recibos_nomina' (recibo de pago de un empleado en un trabajo de
+    nómina): sueldo base de su cargo más los créditos y menos los débitos del período.
+    """
+    __tablename__ = 'recibos_nomina'
+    
+    trabajo_id = db.Column(db.String(32), db.ForeignKey('trabajos_nomina.id'), primary_key=True)
+    cedula = db.Column(db.Integer, primary_key=True)
+    cargo_id = db.Column(db.Integer)
+    sueldo_base = db.Column(db.Float, nullable=False, default=0)
+    creditos = db.Column(db.Float, nullable=False, default=0)
+    debitos = db.Column(db.Float, nullable=False, default=0)
+    neto = db.Column(db.Float, nullable=False, default=0)
+    pagos = db.Column(db.Integer, nullable=False, default=0)  # Créditos y débitos del período
+    
+    __table_args__ = (
+        db.Index('ix_recibos_nomina_trabajo_cargo', 'trabajo_id', 'cargo_id'),
+    )
+    
+    def to_dict(self):
+        """Convierte el modelo a un diccionario para serialización JSON."""
+        return {
+            'cedula': self.cedula,
+            'cargo_id': self.cargo_id,
+            'sueldo_base': round(self.sueldo_base, 2),
+            'creditos': round(self.creditos, 2),
+            'debitos': round(self.debitos, 2),
+            'neto': round(self.neto, 2),
+            'pagos': self.pagos,
+        }
+
+class ResumenCargoNomina(db.Model):
+    """Modelo para la tabla 'resumen_cargos_nomina' (totales por cargo de un trabajo de nómina)."""
+    __tablename__ = 'resumen_cargos_nomina'
+    
+    trabajo_id = db.Column(db.String(32), db.ForeignKey('trabajos_nomina.id'), primary_key=True)
+    cargo_id = db.Column(db.Integer, primary_key=True)  # 0 = empleados sin cargo
+    empleados = db.Column(db.Integer, nullable=False, default=0)
+    sueldos = db.Column(db.Float, nullable=False, default=0)
+    creditos = db.Column(db.Float, nullable=False, default=0)
+    debitos = db.Column(db.Float, nullable=False, default=0)
+    neto = db.Column(db.Float, nullable=False, default=0)
+    
+    def to_dict(self):
+        """Convierte el modelo a un diccionario para serialización JSON."""
+        return {
+            'cargo_id': self.cargo_id or None,
+            'empleados': self.empleados,
+            'sueldos': round(self.sueldos, 2),
+            'creditos': round(self.creditos, 2),
+            'debitos': round(self.debitos, 2),
+            'neto': round(self.neto, 2),
+        }
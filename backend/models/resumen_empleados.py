@@ -0,0 +1,24 @@
+from database import db
+
+class ResumenEmpleados(db.Model):
+    """
+    Modelo para la tabla 'resumen_empleados'.
+    Agregados precalculados de los empleados activos por dimensión (cargo, nivel, sexo,
+    rango de edad, rango de antigüedad y total). Los servicios de empleados y cargos los
+    ajustan en la misma transacción de cada escritura.
+    """
+    __tablename__ = 'resumen_empleados'
+    
+    dimension = db.Column(db.String(20), primary_key=True)
+    clave = db.Column(db.String(50), primary_key=True)  # '' = sin dato
+    empleados = db.Column(db.Integer, nullable=False, default=0)
+    costo = db.Column(db.Float, nullable=False, default=0)  # Suma de sueldo_base de los cargos
+    
+    def to_dict(self):
+        """Convierte el modelo a un diccionario para serialización JSON."""
+        return {
+            'dimension': self.dimension,
+            'clave': self.clave or None,
+            'empleados': self.empleados,
+            'costo': round(self.costo, 2),
+        }
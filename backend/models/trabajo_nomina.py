@@ -0,0 +1,57 @@
+from database import db
+
+class TrabajoNomina(db.Model):
+    """
+    Modelo para la tabla 'trabajos_nomina' (cálculos de nómina en segundo plano).
+    Un trabajo calcula los recibos de un período repartiendo los empleados en particiones
+    que procesa un pool de procesos (ver services/nomina_service.py); aquí quedan su
+    estado, su avance y los totales.
+    """
+    __tablename__ = 'trabajos_nomina'
+    
+    id = db.Column(db.String(32), primary_key=True)
+    periodo = db.Column(db.String(7), nullable=False)  # 'AAAA-MM'
+    estado = db.Column(db.String(12), nullable=False)  # 'pendiente', 'en_proceso', 'completado' o 'fallido'
+    particion = db.Column(db.String(10), nullable=False)  # 'cedula' o 'cargo'
+    particiones = db.Column(db.Integer, nullable=False, default=0)
+    particiones_completadas = db.Column(db.Integer, nullable=False, default=0)
+    empleados = db.Column(db.Integer, nullable=False, default=0)  # Empleados activos al iniciar
+    recibos = db.Column(db.Integer, nullable=False, default=0)  # Recibos escritos hasta ahora
+    sueldos = db.Column(db.Float, nullable=False, default=0)
+    creditos = db.Column(db.Float, nullable=False, default=0)
+    debitos = db.Column(db.Float, nullable=False, default=0)
+    creado_en = db.Column(db.DateTime, nullable=False)  # UTC
+    iniciado_en = db.Column(db.DateTime)
+    actualizado_en = db.Column(db.DateTime)  # Último avance; un trabajo sin avances se da por abandonado
+    terminado_en = db.Column(db.DateTime)
+    error = db.Column(db.Text)
+    
+    __table_args__ = (
+        db.Index('ix_trabajos_nomina_periodo_creado', 'periodo', 'creado_en'),
+    )
+    
+    def to_dict(self):
+        """Convierte el modelo a un diccionario para serialización JSON."""
+        formato = '%Y-%m-%dT%H:%M:%SZ'
+        fecha = lambda valor: valor.strftime(formato) if valor else None
+        return {
+            'id': self.id,
+            'periodo': self.periodo,
+            'estado': self.estado,
+            'particion': self.particion,
+            'particiones': self.particiones,
+            'particiones_completadas': self.particiones_completadas,
+            'progreso': round(100 * self.particiones_completadas / self.particiones, 1) if self.particiones else 0.0,
+            'empleados': self.empleados,
+            'recibos': self.recibos,
+            'sueldos': round(self.sueldos, 2),
+            'creditos': round(self.creditos, 2),
+            'debitos': round(self.debitos, 2),
+            'neto': round(self.sueldos + self.creditos - self.debitos, 2),
+            'creado_en': fecha(self.creado_en),
+            'iniciado_en': fecha(self.iniciado_en),
+            'terminado_en': fecha(self.terminado_en),
+            'duracion_s': (round((self.terminado_en - self.iniciado_en).total_seconds(), 1)
+                           if self.iniciado_en and self.terminado_en else None),
+            'error': self.error,
+        }
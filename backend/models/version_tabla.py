@@ -0,0 +1,21 @@
+from database import db
+
+class VersionTabla(db.Model):
+    """
+    Modelo para la tabla 'versiones_tabla'.
+    Guarda un contador de cambios por tabla que los servicios incrementan en cada
+    escritura; permite invalidar cachés de forma consistente entre procesos.
+    """
+    __tablename__ = 'versiones_tabla'
+    
+    tabla = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    actualizado = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        """Convierte el modelo a un diccionario para serialización JSON."""
+        return {
+            'tabla': self.tabla,
+            'version': self.version,
+            'actualizado': self.actualizado.strftime('%Y-%m-%d %H:%M:%S') if self.actualizado else None
+        }
@@ -1,11 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from services.cargo_service import (
     get_all_active_cargos_service, 
+    get_cargos_changes_service,
     add_cargo_service, 
     update_cargo_service, 
-    delete_cargo_logico_service
+    delete_cargo_logico_service,
+    update_cargos_lote_service,
+    delete_cargos_lote_service
 )
-from logger import logger as log
+from services.exportacion_service import export_cargos_service, parse_estatus_param, MIMETYPES_EXPORTACION
+from services.auditoria_service import get_historial_service
+from services.version_service import ConflictoVersion, get_version
+from utils.http_utils import conditional_get, etag_fila, formato_columnar, versiones_if_match
+from logger import get_logger
+
+log = get_logger(__name__)
 
 # Crear Blueprint
 cargos_bp = Blueprint('cargos_bp', __name__, url_prefix='/api')
@@ -13,25 +22,76 @@ cargos_bp = Blueprint('cargos_bp', __name__, url_prefix='/api')
 # --- Rutas API para Cargos --- 
 
 # GET /api/get/cargos - Obtener todos los cargos activos
+# Con ?formato=columnas las filas se envían como listas: {"columns": [...], "rows": [[...], ...]}
 @cargos_bp.route('/get/cargos', methods=['GET'])
 def get_all_cargos():
     """Obtiene todos los cargos activos."""
     log.debug("GET /get/cargos")
     try:
-        cargos_list = get_all_active_cargos_service()
-        log.debug(f"Cargos obtenidos del servicio: {len(cargos_list)} registros")
-        return jsonify(cargos_list), 200
+        # Un cliente con la versión vigente recibe 304 sin que se lean las filas
+        version, actualizado = get_version('cargos')
+        return conditional_get('cargos', version, actualizado, _listar_cargos)
     except Exception as e:
-        log.error(f"Error inesperado al obtener cargos: {e}", exc_info=True)
+        log.error("Error inesperado al obtener cargos: %s", e, exc_info=True)
         return jsonify({"error": "Error interno del servidor al obtener cargos", "details": str(e)}), 500
 
+def _listar_cargos():
+    try:
+        columnar = formato_columnar()
+    except ValueError as e:
+        log.warning("Formato de listado inválido: %s", e)
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    cargos_list = get_all_active_cargos_service(columnar=columnar)
+    log.debug("Cargos obtenidos del servicio: %s registros", len(cargos_list['rows'] if columnar else cargos_list))
+    return jsonify(cargos_list), 200
+
+# GET /api/get/cargos/changes?since=<revision>&limit= - Cambios posteriores a una revisión (sincronización incremental)
+@cargos_bp.route('/get/cargos/changes', methods=['GET'])
+def get_cargos_changes():
+    """Obtiene los cargos modificados después de la revisión indicada, incluidos los eliminados lógicamente."""
+    log.debug("GET /get/cargos/changes")
+    # Sin 'since' se retorna todo desde el inicio (incluye filas anteriores a la columna revision, que tienen 0)
+    since = request.args.get('since', -1, type=int)
+    if since < -1:
+        return jsonify({"error": "Parámetros inválidos", "message": "La revisión 'since' debe ser un entero mayor o igual a -1."}), 400
+    try:
+        cambios = get_cargos_changes_service(since, request.args.get('limit', type=int))
+        log.debug("Cambios de cargos desde la revisión %s: %s registros", since, len(cambios['items']))
+        return jsonify(cambios), 200
+    except Exception as e:
+        log.error("Error inesperado al obtener cambios de cargos: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener cambios de cargos", "details": str(e)}), 500
+
+# GET /api/get/cargos/<id>/historial?desde=&hasta=&limit=&cursor= - Historial de cambios (auditoría)
+# desde/hasta: AAAA-MM-DD o AAAA-MM-DDTHH:MM:SS en UTC (ambos inclusive); del cambio más reciente al más antiguo
+@cargos_bp.route('/get/cargos/<int:id>/historial', methods=['GET'])
+def get_historial_cargo(id):
+    """Obtiene el historial de altas, modificaciones y bajas de un cargo, incluso si está inactivo."""
+    log.debug("GET /get/cargos/%s/historial", id)
+    try:
+        historial = get_historial_service(
+            'cargos', id,
+            desde=request.args.get('desde'),
+            hasta=request.args.get('hasta'),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+        )
+        log.debug("Historial del cargo %s: %s cambios", id, len(historial['items']))
+        return jsonify(historial), 200
+    except ValueError as e:
+        log.warning("Parámetros de historial inválidos: %s", e)
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error inesperado al obtener el historial del cargo %s: %s", id, e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener el historial", "details": str(e)}), 500
+
 # POST /api/add/cargos - Crear un nuevo cargo
 @cargos_bp.route('/add/cargos', methods=['POST'])
 def add_cargo():
     """Añade un nuevo cargo."""
     log.debug("POST /api/add/cargos")
     data = request.get_json()
-    log.debug(f"Datos recibidos para añadir cargo: {data}")
+    log.debug("Datos recibidos para añadir cargo: %s", data)
 
     # Validación básica de datos requeridos
     if not data or not data.get('nombre') or not isinstance(data.get('nivel'), (int, float)) or not data.get('sueldo_base'):
@@ -45,31 +105,37 @@ def add_cargo():
         
         nuevo_cargo = add_cargo_service(data)
         if nuevo_cargo:
-            log.info(f"Cargo añadido: {nuevo_cargo.get('nombre')} (nivel {nuevo_cargo.get('nivel')})")
+            log.info("Cargo añadido: %s (nivel %s)", nuevo_cargo.get('nombre'), nuevo_cargo.get('nivel'))
             return jsonify(nuevo_cargo), 201 # Código 201 para creación exitosa
         else:
             log.error("add_cargo_service retornó None")
             # Esto podría indicar un error lógico no capturado como excepción
             return jsonify({"error": "Error al crear cargo", "message": "El servicio no pudo completar la creación."}), 500
     except ValueError as e:
-        log.warning(f"Error de validación al añadir cargo: {e}")
+        log.warning("Error de validación al añadir cargo: %s", e)
         return jsonify({"error": "Conflicto de datos", "message": str(e)}), 409 # Código 409 para conflicto (ej. duplicado)
     except Exception as e:
-        log.error(f"Error al añadir cargo: {e}", exc_info=True)
+        log.error("Error al añadir cargo: %s", e, exc_info=True)
         return jsonify({"error": "Error interno del servidor al añadir cargo", "details": str(e)}), 500
 
 # PUT /api/put/cargos/<id> - Actualizar un cargo existente
 @cargos_bp.route('/put/cargos/<int:id>', methods=['PUT'])
 def update_cargo(id):
     """Actualiza un cargo existente por su ID."""
-    log.debug(f"PUT /put/cargos/{id}")
+    log.debug("PUT /put/cargos/%s", id)
     data = request.get_json()
-    log.debug(f"Datos recibidos para actualizar cargo {id}: {data}")
+    log.debug("Datos recibidos para actualizar cargo %s: %s", id, data)
 
     if not data:
-        log.warning(f"Actualización de cargo {id} sin datos")
+        log.warning("Actualización de cargo %s sin datos", id)
         return jsonify({"error": "Datos incompletos", "message": "No se proporcionaron datos para la actualización."}), 400
 
+    # Con If-Match la actualización sólo se aplica si la fila sigue en la versión que tiene el cliente
+    try:
+        versiones = versiones_if_match()
+    except ValueError as e:
+        return jsonify({"error": "Encabezado inválido", "message": str(e)}), 400
+
     try:
         # Convertir datos numéricos si están presentes
         if 'nivel' in data:
@@ -77,33 +143,97 @@ def update_cargo(id):
         if 'sueldo_base' in data:
             data['sueldo_base'] = float(data['sueldo_base'])
             
-        cargo_actualizado = update_cargo_service(id, data)
+        cargo_actualizado = update_cargo_service(id, data, versiones)
         if cargo_actualizado:
-            log.info(f"Cargo {id} actualizado: {cargo_actualizado.get('nombre')}")
-            return jsonify(cargo_actualizado), 200
+            log.info("Cargo %s actualizado: %s", id, cargo_actualizado.get('nombre'))
+            respuesta = jsonify(cargo_actualizado)
+            respuesta.set_etag(etag_fila(cargo_actualizado['version']))
+            return respuesta, 200
         else:
-            log.warning(f"Cargo {id} no encontrado/inactivo")
+            log.warning("Cargo %s no encontrado/inactivo", id)
             return jsonify({"error": "No encontrado", "message": f"Cargo con ID {id} no encontrado o está inactivo."}), 404
+    except ConflictoVersion as e:
+        log.warning("Conflicto de versión al actualizar cargo %s: %s", id, e)
+        respuesta = jsonify({"error": "Conflicto de versión", "message": str(e), "actual": e.actual})
+        respuesta.set_etag(etag_fila(e.actual['version']))
+        return respuesta, 409
     except ValueError as e:
-        log.warning(f"Error de validación al actualizar cargo {id}: {e}")
+        log.warning("Error de validación al actualizar cargo %s: %s", id, e)
         return jsonify({"error": "Conflicto de datos", "message": str(e)}), 409 # Conflicto
     except Exception as e:
-        log.error(f"Error al actualizar cargo {id}: {e}", exc_info=True)
+        log.error("Error al actualizar cargo %s: %s", id, e, exc_info=True)
         return jsonify({"error": "Error interno del servidor al actualizar cargo", "details": str(e)}), 500
 
 # DELETE /api/delete/cargos/<id> - Eliminar lógicamente un cargo (establecer estatus = 0)
 @cargos_bp.route('/delete/cargos/<int:id>', methods=['DELETE'])
 def delete_cargo_logico(id):
     """Elimina lógicamente un cargo por su ID."""
-    log.debug(f"DELETE /delete/cargos/{id}")
+    log.debug("DELETE /delete/cargos/%s", id)
     try:
         success = delete_cargo_logico_service(id)
         if success:
-            log.info(f"Cargo {id} eliminado")
+            log.info("Cargo %s eliminado", id)
             return jsonify({"message": f"Cargo con ID {id} eliminado lógicamente."}), 200
         else:
-            log.warning(f"Cargo {id} no encontrado/ya inactivo")
+            log.warning("Cargo %s no encontrado/ya inactivo", id)
             return jsonify({"error": "No encontrado", "message": f"Cargo con ID {id} no encontrado o ya estaba inactivo."}), 404
     except Exception as e:
-        log.error(f"Error al eliminar cargo {id}: {e}", exc_info=True)
-        return jsonify({"error": "Error interno del servidor al eliminar cargo", "details": str(e)}), 500 
\ No newline at end of file
+        log.error("Error al eliminar cargo %s: %s", id, e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al eliminar cargo", "details": str(e)}), 500 
+
+# PUT /api/put/cargos/lote - Actualizar en lote el sueldo base con un único UPDATE
+# {"ids": [1, 2]} o {"filtro": {"nivel_desde": 1, "nivel_hasta": 3}}, más {"cambios": {"porcentaje_sueldo": 10}} o {"cambios": {"sueldo_base": 1500}}
+@cargos_bp.route('/put/cargos/lote', methods=['PUT'])
+def update_cargos_lote():
+    """Actualiza el sueldo base de varios cargos activos en una sola transacción; retorna el resultado por ID."""
+    log.debug("PUT /put/cargos/lote")
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "Datos incompletos", "message": "Debe indicar la selección y los cambios."}), 400
+    try:
+        resultado = update_cargos_lote_service(data)
+        log.info("Actualización en lote de cargos: %s afectados, %s no encontrados", resultado['afectados'], resultado['no_encontrados'])
+        return jsonify(resultado), 200
+    except (ValueError, TypeError) as e:
+        log.warning("Actualización en lote de cargos inválida: %s", e)
+        return jsonify({"error": "Datos inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error en la actualización en lote de cargos: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al actualizar cargos", "details": str(e)}), 500
+
+# DELETE /api/delete/cargos/lote - Eliminar lógicamente en lote ({"ids": [...]} o {"filtro": {...}})
+@cargos_bp.route('/delete/cargos/lote', methods=['DELETE'])
+def delete_cargos_lote():
+    """Elimina lógicamente varios cargos en una sola transacción; retorna el resultado por ID."""
+    log.debug("DELETE /delete/cargos/lote")
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "Datos incompletos", "message": "Debe indicar 'ids' o 'filtro'."}), 400
+    try:
+        resultado = delete_cargos_lote_service(data)
+        log.info("Eliminación en lote de cargos: %s afectados, %s no encontrados", resultado['afectados'], resultado['no_encontrados'])
+        return jsonify(resultado), 200
+    except (ValueError, TypeError) as e:
+        log.warning("Eliminación en lote de cargos inválida: %s", e)
+        return jsonify({"error": "Datos inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error en la eliminación en lote de cargos: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al eliminar cargos", "details": str(e)}), 500
+
+# GET /api/export/cargos?formato=ndjson|csv&estatus=1|0|todos - Exportación en streaming
+@cargos_bp.route('/export/cargos', methods=['GET'])
+def export_cargos():
+    """Exporta los cargos fila por fila sin construir la lista completa en memoria."""
+    log.debug("GET /api/export/cargos")
+    formato = request.args.get('formato', 'ndjson')
+    try:
+        estatus = parse_estatus_param(request.args.get('estatus'))
+        contenido = export_cargos_service(formato, estatus)
+    except ValueError as e:
+        log.warning("Parámetros de exportación inválidos: %s", e)
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    return Response(
+        stream_with_context(contenido),
+        mimetype=MIMETYPES_EXPORTACION[formato],
+        headers={"Content-Disposition": f"attachment; filename=cargos.{formato}"},
+    )
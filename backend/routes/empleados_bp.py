@@ -1,99 +1,305 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from services.empleado_service import (
     get_all_active_empleados_service, 
+    get_empleados_changes_service,
+    get_empleados_page_service,
+    search_empleados_service,
     add_empleado_service, 
     update_empleado_service, 
-    delete_empleado_logico_service
+    delete_empleado_logico_service,
+    update_empleados_lote_service,
+    delete_empleados_lote_service
 )
-from logger import logger as log
+from services.importacion_service import import_empleados_service
+from services.auditoria_service import get_historial_service
+from services.exportacion_service import export_empleados_service, parse_estatus_param, MIMETYPES_EXPORTACION
+from services.version_service import ConflictoVersion, get_version
+from utils.http_utils import conditional_get, etag_fila, formato_columnar, versiones_if_match
+from logger import get_logger
+
+log = get_logger(__name__)
 
 # Crear Blueprint
 empleados_bp = Blueprint('empleados_bp', __name__, url_prefix='/api')
 
 # --- Rutas API para Empleados --- 
 
+# Parámetros que activan la respuesta paginada de /get/empleados
+PARAMETROS_PAGINACION = ('limit', 'cursor', 'sort', 'filter_column', 'filter_value')
+
 # GET /api/get/empleados - Obtener todos los empleados activos
+# Con ?limit=&cursor=&sort=nombre:asc,cedula:desc&filter_column=&filter_value= retorna una página:
+# {"items": [...], "next_cursor": "...", "limit": 50}
+# Con ?formato=columnas las filas se envían como listas: {"columns": [...], "rows": [[...], ...]}
 @empleados_bp.route('/get/empleados', methods=['GET'])
 def get_all_empleados():
-    """Obtiene todos los empleados activos."""
+    """Obtiene todos los empleados activos, o una página de ellos si se envían parámetros de paginación."""
     log.debug("GET /get/empleados")
     try:
-        empleados_list = get_all_active_empleados_service()
-        log.debug(f"Empleados obtenidos del servicio: {len(empleados_list)} registros")
-        return jsonify(empleados_list), 200
+        # Un cliente con la versión vigente recibe 304 sin que se lean las filas
+        version, actualizado = get_version('empleados')
+        return conditional_get('empleados', version, actualizado, _listar_empleados)
     except Exception as e:
-        log.error(f"Error inesperado al obtener empleados: {e}", exc_info=True)
+        log.error("Error inesperado al obtener empleados: %s", e, exc_info=True)
         return jsonify({"error": "Error interno del servidor al obtener empleados", "details": str(e)}), 500
 
+def _listar_empleados():
+    try:
+        columnar = formato_columnar()
+    except ValueError as e:
+        log.warning("Formato de listado inválido: %s", e)
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+
+    if any(param in request.args for param in PARAMETROS_PAGINACION):
+        try:
+            pagina = get_empleados_page_service(
+                limit=request.args.get('limit', type=int),
+                cursor=request.args.get('cursor'),
+                sort=request.args.get('sort'),
+                filter_column=request.args.get('filter_column'),
+                filter_value=request.args.get('filter_value'),
+                columnar=columnar,
+            )
+        except ValueError as e:
+            log.warning("Parámetros de paginación inválidos: %s", e)
+            return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+        log.debug("Página de empleados obtenida: %s registros", len(pagina['rows' if columnar else 'items']))
+        return jsonify(pagina), 200
+
+    empleados_list = get_all_active_empleados_service(columnar=columnar)
+    log.debug("Empleados obtenidos del servicio: %s registros", len(empleados_list['rows'] if columnar else empleados_list))
+    return jsonify(empleados_list), 200
+
+# GET /api/search/empleados?q=&limit=&cursor= - Búsqueda de texto completo (nombre, correo, cargo, cédula)
+# Cada palabra se busca como prefijo, sin distinguir acentos ni mayúsculas; resultados por relevancia:
+# {"items": [...], "next_cursor": "...", "limit": 20}
+@empleados_bp.route('/search/empleados', methods=['GET'])
+def search_empleados():
+    """Busca empleados activos con el índice de texto completo."""
+    log.debug("GET /search/empleados")
+    try:
+        resultado = search_empleados_service(
+            request.args.get('q', ''),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+        )
+        log.debug("Búsqueda de empleados: %s resultados", len(resultado['items']))
+        return jsonify(resultado), 200
+    except ValueError as e:
+        log.warning("Parámetros de búsqueda inválidos: %s", e)
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error inesperado al buscar empleados: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al buscar empleados", "details": str(e)}), 500
+
+# GET /api/get/empleados/changes?since=<revision>&limit= - Cambios posteriores a una revisión (sincronización incremental)
+@empleados_bp.route('/get/empleados/changes', methods=['GET'])
+def get_empleados_changes():
+    """Obtiene los empleados modificados después de la revisión indicada, incluidos los eliminados lógicamente."""
+    log.debug("GET /get/empleados/changes")
+    # Sin 'since' se retorna todo desde el inicio (incluye filas anteriores a la columna revision, que tienen 0)
+    since = request.args.get('since', -1, type=int)
+    if since < -1:
+        return jsonify({"error": "Parámetros inválidos", "message": "La revisión 'since' debe ser un entero mayor o igual a -1."}), 400
+    try:
+        cambios = get_empleados_changes_service(since, request.args.get('limit', type=int))
+        log.debug("Cambios de empleados desde la revisión %s: %s registros", since, len(cambios['items']))
+        return jsonify(cambios), 200
+    except Exception as e:
+        log.error("Error inesperado al obtener cambios de empleados: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener cambios de empleados", "details": str(e)}), 500
+
+# GET /api/get/empleados/<cedula>/historial?desde=&hasta=&limit=&cursor= - Historial de cambios (auditoría)
+# desde/hasta: AAAA-MM-DD o AAAA-MM-DDTHH:MM:SS en UTC (ambos inclusive); del cambio más reciente al más antiguo
+@empleados_bp.route('/get/empleados/<int:cedula>/historial', methods=['GET'])
+def get_historial_empleado(cedula):
+    """Obtiene el historial de altas, modificaciones y bajas de un empleado, incluso si está inactivo."""
+    log.debug("GET /get/empleados/%s/historial", cedula)
+    try:
+        historial = get_historial_service(
+            'empleados', cedula,
+            desde=request.args.get('desde'),
+            hasta=request.args.get('hasta'),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+        )
+        log.debug("Historial del empleado %s: %s cambios", cedula, len(historial['items']))
+        return jsonify(historial), 200
+    except ValueError as e:
+        log.warning("Parámetros de historial inválidos: %s", e)
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error inesperado al obtener el historial del empleado %s: %s", cedula, e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener el historial", "details": str(e)}), 500
+
 # POST /api/add/empleados - Crear un nuevo empleado
 @empleados_bp.route('/add/empleados', methods=['POST'])
 def add_empleado():
     """Añade un nuevo empleado."""
     log.debug("POST /api/add/empleados")
     data = request.get_json()
-    log.debug(f"Datos recibidos para añadir empleado: {data}")
+    log.debug("Datos recibidos para añadir empleado: %s", data)
 
     # Validación básica de datos requeridos
     if not data or not data.get('cedula') or not data.get('nombre'):
         log.warning("Intento de añadir empleado con datos faltantes")
         return jsonify({"error": "Datos incompletos", "message": "La Cédula y el Nombre son campos obligatorios."}), 400
+    try:
+        cedula_valida = int(data['cedula']) > 0
+    except (TypeError, ValueError):
+        cedula_valida = False
+    if not cedula_valida:
+        log.warning("Intento de añadir empleado con cédula inválida: %s", data.get('cedula'))
+        return jsonify({"error": "Datos inválidos", "message": "La Cédula debe ser un número entero positivo."}), 400
 
     try:
         nuevo_empleado = add_empleado_service(data)
         if nuevo_empleado:
-            log.info(f"Empleado añadido: {nuevo_empleado.get('cedula')}")
+            log.info("Empleado añadido: %s", nuevo_empleado.get('cedula'))
             return jsonify(nuevo_empleado), 201 # Código 201 para creación exitosa
         else:
             log.error("add_empleado_service retornó None")
             # Esto podría indicar un error lógico no capturado como excepción
             return jsonify({"error": "Error al crear empleado", "message": "El servicio no pudo completar la creación."}), 500
     except ValueError as e:
-        log.warning(f"Error de validación al añadir empleado: {e}")
+        log.warning("Error de validación al añadir empleado: %s", e)
         return jsonify({"error": "Conflicto de datos", "message": str(e)}), 409 # Código 409 para conflicto (ej. duplicado)
     except Exception as e:
-        log.error(f"Error al añadir empleado: {e}", exc_info=True)
+        log.error("Error al añadir empleado: %s", e, exc_info=True)
         return jsonify({"error": "Error interno del servidor al añadir empleado", "details": str(e)}), 500
 
 # PUT /api/put/empleados/<cedula> - Actualizar un empleado existente
 @empleados_bp.route('/put/empleados/<int:cedula>', methods=['PUT'])
 def update_empleado(cedula):
     """Actualiza un empleado existente por su cédula."""
-    log.debug(f"PUT /put/empleados/{cedula}")
+    log.debug("PUT /put/empleados/%s", cedula)
     data = request.get_json()
-    log.debug(f"Datos recibidos para actualizar empleado {cedula}: {data}")
+    log.debug("Datos recibidos para actualizar empleado %s: %s", cedula, data)
 
     if not data:
-        log.warning(f"Actualización de {cedula} sin datos")
+        log.warning("Actualización de %s sin datos", cedula)
         return jsonify({"error": "Datos incompletos", "message": "No se proporcionaron datos para la actualización."}), 400
 
+    # Con If-Match la actualización sólo se aplica si la fila sigue en la versión que tiene el cliente
     try:
-        empleado_actualizado = update_empleado_service(cedula, data)
+        versiones = versiones_if_match()
+    except ValueError as e:
+        return jsonify({"error": "Encabezado inválido", "message": str(e)}), 400
+
+    try:
+        empleado_actualizado = update_empleado_service(cedula, data, versiones)
         if empleado_actualizado:
-            log.info(f"Empleado {cedula} actualizado")
-            return jsonify(empleado_actualizado), 200
+            log.info("Empleado %s actualizado", cedula)
+            respuesta = jsonify(empleado_actualizado)
+            respuesta.set_etag(etag_fila(empleado_actualizado['version']))
+            return respuesta, 200
         else:
-            log.warning(f"Empleado {cedula} no encontrado/inactivo")
+            log.warning("Empleado %s no encontrado/inactivo", cedula)
             return jsonify({"error": "No encontrado", "message": f"Empleado con cédula {cedula} no encontrado o está inactivo."}), 404
+    except ConflictoVersion as e:
+        log.warning("Conflicto de versión al actualizar %s: %s", cedula, e)
+        respuesta = jsonify({"error": "Conflicto de versión", "message": str(e), "actual": e.actual})
+        respuesta.set_etag(etag_fila(e.actual['version']))
+        return respuesta, 409
     except ValueError as e:
-        log.warning(f"Error de validación al actualizar {cedula}: {e}")
+        log.warning("Error de validación al actualizar %s: %s", cedula, e)
         return jsonify({"error": "Conflicto de datos", "message": str(e)}), 409 # Conflicto
     except Exception as e:
-        log.error(f"Error al actualizar {cedula}: {e}", exc_info=True)
+        log.error("Error al actualizar %s: %s", cedula, e, exc_info=True)
         return jsonify({"error": "Error interno del servidor al actualizar empleado", "details": str(e)}), 500
 
 # DELETE /api/delete/empleados/<cedula> - Eliminar lógicamente un empleado (establecer estatus = 0)
 @empleados_bp.route('/delete/empleados/<int:cedula>', methods=['DELETE'])
 def delete_empleado_logico(cedula):
     """Elimina lógicamente un empleado por su cédula."""
-    log.debug(f"DELETE /delete/empleados/{cedula}")
+    log.debug("DELETE /delete/empleados/%s", cedula)
     try:
         success = delete_empleado_logico_service(cedula)
         if success:
-            log.info(f"Empleado {cedula} eliminado")
+            log.info("Empleado %s eliminado", cedula)
             return jsonify({"message": f"Empleado con cédula {cedula} eliminado lógicamente."}), 200
         else:
-            log.warning(f"Empleado {cedula} no encontrado/ya inactivo")
+            log.warning("Empleado %s no encontrado/ya inactivo", cedula)
             return jsonify({"error": "No encontrado", "message": f"Empleado con cédula {cedula} no encontrado o ya estaba inactivo."}), 404
     except Exception as e:
-        log.error(f"Error al eliminar {cedula}: {e}", exc_info=True)
+        log.error("Error al eliminar %s: %s", cedula, e, exc_info=True)
         return jsonify({"error": "Error interno del servidor al eliminar empleado", "details": str(e)}), 500
+
+# PUT /api/put/empleados/lote - Actualizar en lote con un único UPDATE
+# {"cedulas": [1, 2]} o {"filtro": {"cargo_id": 3}}, más {"cambios": {"cargo_id": 4, "fecha_ingreso": "2024-01-01"}}
+@empleados_bp.route('/put/empleados/lote', methods=['PUT'])
+def update_empleados_lote():
+    """Actualiza varios empleados activos en una sola transacción; retorna el resultado por cédula."""
+    log.debug("PUT /put/empleados/lote")
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "Datos incompletos", "message": "Debe indicar la selección y los cambios."}), 400
+    try:
+        resultado = update_empleados_lote_service(data)
+        log.info("Actualización en lote de empleados: %s afectados, %s no encontrados", resultado['afectados'], resultado['no_encontrados'])
+        return jsonify(resultado), 200
+    except (ValueError, TypeError) as e:
+        log.warning("Actualización en lote de empleados inválida: %s", e)
+        return jsonify({"error": "Datos inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error en la actualización en lote de empleados: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al actualizar empleados", "details": str(e)}), 500
+
+# DELETE /api/delete/empleados/lote - Eliminar lógicamente en lote ({"cedulas": [...]} o {"filtro": {...}})
+@empleados_bp.route('/delete/empleados/lote', methods=['DELETE'])
+def delete_empleados_lote():
+    """Elimina lógicamente varios empleados en una sola transacción; retorna el resultado por cédula."""
+    log.debug("DELETE /delete/empleados/lote")
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "Datos incompletos", "message": "Debe indicar 'cedulas' o 'filtro'."}), 400
+    try:
+        resultado = delete_empleados_lote_service(data)
+        log.info("Eliminación en lote de empleados: %s afectados, %s no encontrados", resultado['afectados'], resultado['no_encontrados'])
+        return jsonify(resultado), 200
+    except (ValueError, TypeError) as e:
+        log.warning("Eliminación en lote de empleados inválida: %s", e)
+        return jsonify({"error": "Datos inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error en la eliminación en lote de empleados: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al eliminar empleados", "details": str(e)}), 500
+
+# POST /api/import/empleados - Importación masiva desde un archivo CSV o XLSX (campo 'archivo')
+@empleados_bp.route('/import/empleados', methods=['POST'])
+def import_empleados():
+    """Importa empleados en lote, insertando o actualizando por cédula."""
+    log.debug("POST /api/import/empleados")
+    archivo = request.files.get('archivo')
+    if not archivo or not archivo.filename:
+        log.warning("Intento de importación sin archivo")
+        return jsonify({"error": "Datos incompletos", "message": "Debe enviar un archivo CSV o XLSX en el campo 'archivo'."}), 400
+
+    formato = archivo.filename.rsplit('.', 1)[-1].lower()
+    try:
+        resumen = import_empleados_service(archivo.stream, formato, request.args.get('chunk_size', type=int))
+        log.info("Importación de %s: %s insertados, %s actualizados, %s errores", archivo.filename, resumen['insertados'], resumen['actualizados'], len(resumen['errores']))
+        return jsonify(resumen), 200
+    except ValueError as e:
+        log.warning("Archivo de importación inválido: %s", e)
+        return jsonify({"error": "Archivo inválido", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error al importar empleados: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al importar empleados", "details": str(e)}), 500
+
+# GET /api/export/empleados?formato=ndjson|csv&estatus=1|0|todos - Exportación en streaming
+@empleados_bp.route('/export/empleados', methods=['GET'])
+def export_empleados():
+    """Exporta los empleados fila por fila sin construir la lista completa en memoria."""
+    log.debug("GET /api/export/empleados")
+    formato = request.args.get('formato', 'ndjson')
+    try:
+        estatus = parse_estatus_param(request.args.get('estatus'))
+        contenido = export_empleados_service(formato, estatus)
+    except ValueError as e:
+        log.warning("Parámetros de exportación inválidos: %s", e)
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    return Response(
+        stream_with_context(contenido),
+        mimetype=MIMETYPES_EXPORTACION[formato],
+        headers={"Content-Disposition": f"attachment; filename=empleados.{formato}"},
+    )
@@ -0,0 +1,112 @@
+from flask import Blueprint, request, jsonify, url_for
+from services.nomina_service import (
+    validar_trabajo,
+    crear_trabajo_service,
+    get_trabajo_service,
+    get_trabajos_service,
+    get_recibos_service,
+    get_resumen_cargos_service
+)
+from utils.http_utils import formato_columnar
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Crear Blueprint
+nomina_bp = Blueprint('nomina_bp', __name__, url_prefix='/api')
+
+# --- Rutas API para Nómina ---
+
+# POST /api/add/nomina/trabajos - Calcular en segundo plano los recibos de un período
+# {"periodo": "AAAA-MM", "particion": "cedula" | "cargo", "particiones": 16} (sólo el período es obligatorio)
+# Responde 202 de inmediato; el avance se consulta en la URL del encabezado Location
+@nomina_bp.route('/add/nomina/trabajos', methods=['POST'])
+def add_trabajo():
+    """Inicia un trabajo de nómina para un período."""
+    log.debug("POST /api/add/nomina/trabajos")
+    data = request.get_json(silent=True)
+
+    if not data or not data.get('periodo'):
+        log.warning("Intento de crear un trabajo de nómina sin período")
+        return jsonify({"error": "Datos incompletos", "message": "El Período (AAAA-MM) es obligatorio."}), 400
+    try:
+        validar_trabajo(data)
+    except ValueError as e:
+        return jsonify({"error": "Datos inválidos", "message": str(e)}), 400
+
+    try:
+        trabajo = crear_trabajo_service(data)
+        response = jsonify(trabajo)
+        response.headers['Location'] = url_for('nomina_bp.get_trabajo', id=trabajo['id'])
+        return response, 202
+    except ValueError as e:
+        log.warning("No se pudo crear el trabajo de nómina del período %s: %s", data.get('periodo'), e)
+        return jsonify({"error": "Conflicto de datos", "message": str(e)}), 409
+    except Exception as e:
+        log.error("Error al crear el trabajo de nómina del período %s: %s", data.get('periodo'), e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al crear el trabajo de nómina", "details": str(e)}), 500
+
+# GET /api/get/nomina/trabajos - Trabajos de nómina recientes (filtro opcional: periodo)
+@nomina_bp.route('/get/nomina/trabajos', methods=['GET'])
+def get_trabajos():
+    """Obtiene los trabajos de nómina más recientes."""
+    log.debug("GET /get/nomina/trabajos")
+    try:
+        return jsonify(get_trabajos_service(periodo=request.args.get('periodo'))), 200
+    except ValueError as e:
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error inesperado al obtener los trabajos de nómina: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener los trabajos de nómina", "details": str(e)}), 500
+
+# GET /api/get/nomina/trabajos/<id> - Estado y avance de un trabajo de nómina
+@nomina_bp.route('/get/nomina/trabajos/<id>', methods=['GET'])
+def get_trabajo(id):
+    """Obtiene el estado, el avance y los totales de un trabajo de nómina."""
+    log.debug("GET /get/nomina/trabajos/%s", id)
+    try:
+        trabajo = get_trabajo_service(id)
+        if trabajo is None:
+            return jsonify({"error": "No encontrado", "message": f"Trabajo de nómina {id} no encontrado."}), 404
+        return jsonify(trabajo), 200
+    except Exception as e:
+        log.error("Error inesperado al obtener el trabajo de nómina %s: %s", id, e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener el trabajo de nómina", "details": str(e)}), 500
+
+# GET /api/get/nomina/trabajos/<id>/recibos - Recibos por empleado (filtro opcional: cargo_id, 0 = sin cargo)
+# Paginado por cédula con ?limit=&cursor=: {"items": [...], "next_cursor": "...", "limit": 100}
+# Con ?formato=columnas las filas se envían como listas: {"columns": [...], "rows": [[...], ...]}
+@nomina_bp.route('/get/nomina/trabajos/<id>/recibos', methods=['GET'])
+def get_recibos(id):
+    """Obtiene una página de los recibos de un trabajo de nómina."""
+    log.debug("GET /get/nomina/trabajos/%s/recibos", id)
+    try:
+        pagina = get_recibos_service(
+            id,
+            cargo_id=request.args.get('cargo_id', type=int),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            columnar=formato_columnar(),
+        )
+        if pagina is None:
+            return jsonify({"error": "No encontrado", "message": f"Trabajo de nómina {id} no encontrado."}), 404
+        return jsonify(pagina), 200
+    except ValueError as e:
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error inesperado al obtener los recibos del trabajo %s: %s", id, e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener los recibos", "details": str(e)}), 500
+
+# GET /api/get/nomina/trabajos/<id>/cargos - Totales por cargo de un trabajo de nómina
+@nomina_bp.route('/get/nomina/trabajos/<id>/cargos', methods=['GET'])
+def get_resumen_cargos(id):
+    """Obtiene los totales por cargo (empleados, sueldos, créditos, débitos y neto) de un trabajo."""
+    log.debug("GET /get/nomina/trabajos/%s/cargos", id)
+    try:
+        resumen = get_resumen_cargos_service(id)
+        if resumen is None:
+            return jsonify({"error": "No encontrado", "message": f"Trabajo de nómina {id} no encontrado."}), 404
+        return jsonify(resumen), 200
+    except Exception as e:
+        log.error("Error inesperado al obtener el resumen por cargo del trabajo %s: %s", id, e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener el resumen por cargo", "details": str(e)}), 500
@@ -0,0 +1,120 @@
+from flask import Blueprint, request, jsonify
+from services.pago_service import (
+    aplicar_pago_por_cargo_service,
+    get_pagos_service,
+    get_historial_pagos_service,
+    get_cierres_service,
+    cerrar_periodo_service,
+    validar_periodo
+)
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Crear Blueprint
+pagos_bp = Blueprint('pagos_bp', __name__, url_prefix='/api')
+
+# --- Rutas API para Pagos --- 
+
+# GET /api/get/pagos - Obtener pagos (filtros opcionales: cedula, cargo_id, lote, periodo, limit)
+@pagos_bp.route('/get/pagos', methods=['GET'])
+def get_pagos():
+    """Obtiene los pagos registrados."""
+    log.debug("GET /get/pagos")
+    try:
+        pagos_list = get_pagos_service(
+            cedula=request.args.get('cedula', type=int),
+            cargo_id=request.args.get('cargo_id', type=int),
+            lote=request.args.get('lote'),
+            limit=request.args.get('limit', type=int),
+            periodo=request.args.get('periodo'),
+        )
+        log.debug("Pagos obtenidos del servicio: %s registros", len(pagos_list))
+        return jsonify(pagos_list), 200
+    except ValueError as e:
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error inesperado al obtener pagos: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener pagos", "details": str(e)}), 500
+
+# POST /api/add/pagos/cargo/<id> - Aplicar un crédito o débito a todos los empleados activos de un cargo
+@pagos_bp.route('/add/pagos/cargo/<int:id>', methods=['POST'])
+def add_pago_por_cargo(id):
+    """Aplica un pago masivo (crédito o débito) sobre el sueldo base de un cargo."""
+    log.debug("POST /api/add/pagos/cargo/%s", id)
+    data = request.get_json()
+
+    if not data or not data.get('tipo'):
+        log.warning("Intento de aplicar pago por cargo sin tipo")
+        return jsonify({"error": "Datos incompletos", "message": "El Tipo de pago (credito o debito) es obligatorio."}), 400
+
+    try:
+        resumen = aplicar_pago_por_cargo_service(id, data)
+        if resumen:
+            log.info("Pago por cargo %s aplicado: lote %s", id, resumen.get('lote'))
+            return jsonify(resumen), 201
+        else:
+            log.warning("Cargo %s no encontrado/inactivo", id)
+            return jsonify({"error": "No encontrado", "message": f"Cargo con ID {id} no encontrado o está inactivo."}), 404
+    except ValueError as e:
+        log.warning("Error de validación al aplicar pago por cargo %s: %s", id, e)
+        return jsonify({"error": "Datos inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error al aplicar pago por cargo %s: %s", id, e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al aplicar pago", "details": str(e)}), 500
+
+# GET /api/get/pagos/historial - Totales por período (filtros opcionales: cedula, cargo_id, desde, hasta)
+@pagos_bp.route('/get/pagos/historial', methods=['GET'])
+def get_historial_pagos():
+    """Obtiene el historial de pagos por período, incluidos los períodos cerrados."""
+    log.debug("GET /get/pagos/historial")
+    try:
+        historial = get_historial_pagos_service(
+            cedula=request.args.get('cedula', type=int),
+            cargo_id=request.args.get('cargo_id', type=int),
+            desde=request.args.get('desde'),
+            hasta=request.args.get('hasta'),
+        )
+        return jsonify(historial), 200
+    except ValueError as e:
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error inesperado al obtener el historial de pagos: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener el historial de pagos", "details": str(e)}), 500
+
+# GET /api/get/pagos/cierres - Períodos cerrados con sus totales
+@pagos_bp.route('/get/pagos/cierres', methods=['GET'])
+def get_cierres():
+    """Obtiene los períodos de pago cerrados."""
+    log.debug("GET /get/pagos/cierres")
+    try:
+        return jsonify(get_cierres_service()), 200
+    except Exception as e:
+        log.error("Error inesperado al obtener los cierres: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener los cierres", "details": str(e)}), 500
+
+# POST /api/add/pagos/cierres - Cerrar un período terminado y archivar sus pagos
+@pagos_bp.route('/add/pagos/cierres', methods=['POST'])
+def add_cierre():
+    """Cierra un período de pagos ({"periodo": "AAAA-MM"})."""
+    log.debug("POST /api/add/pagos/cierres")
+    data = request.get_json(silent=True)
+
+    if not data or not data.get('periodo'):
+        log.warning("Intento de cierre sin período")
+        return jsonify({"error": "Datos incompletos", "message": "El Período (AAAA-MM) es obligatorio."}), 400
+    try:
+        validar_periodo(data['periodo'])
+    except ValueError as e:
+        return jsonify({"error": "Datos inválidos", "message": str(e)}), 400
+
+    try:
+        cierre = cerrar_periodo_service(data['periodo'])
+        log.info("Período %s cerrado", cierre['periodo'])
+        return jsonify(cierre), 201
+    except ValueError as e:
+        log.warning("No se pudo cerrar el período %s: %s", data.get('periodo'), e)
+        return jsonify({"error": "Conflicto de datos", "message": str(e)}), 409
+    except Exception as e:
+        log.error("Error al cerrar el período %s: %s", data.get('periodo'), e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al cerrar el período", "details": str(e)}), 500
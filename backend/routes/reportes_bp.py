@@ -0,0 +1,69 @@
+from flask import Blueprint, request, jsonify
+from services.reporte_service import get_resumen_service
+from services.analitica_service import (
+    get_distribucion_edades_service,
+    get_proyeccion_retiros_service,
+    get_proximos_service
+)
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Crear Blueprint
+reportes_bp = Blueprint('reportes_bp', __name__, url_prefix='/api')
+
+# --- Rutas API para Reportes --- 
+
+# GET /api/reportes/resumen - Resumen de empleados activos: cantidad y costo por cargo y nivel,
+# distribución por sexo y por rangos de edad y antigüedad (desde la tabla precalculada)
+@reportes_bp.route('/reportes/resumen', methods=['GET'])
+def get_resumen():
+    """Obtiene el resumen precalculado de empleados activos."""
+    log.debug("GET /reportes/resumen")
+    try:
+        resumen = get_resumen_service()
+        return jsonify(resumen), 200
+    except Exception as e:
+        log.error("Error inesperado al obtener el resumen de reportes: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener el resumen", "details": str(e)}), 500
+
+# GET /api/reportes/edades - Distribución de edad y antigüedad (promedio, mediana, rangos y por año)
+@reportes_bp.route('/reportes/edades', methods=['GET'])
+def get_distribucion_edades():
+    """Obtiene la distribución de edad y antigüedad de los empleados activos."""
+    log.debug("GET /reportes/edades")
+    try:
+        return jsonify(get_distribucion_edades_service()), 200
+    except Exception as e:
+        log.error("Error inesperado al obtener la distribución de edades: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener la distribución de edades", "details": str(e)}), 500
+
+# GET /api/reportes/retiros?anios=10 - Jubilaciones proyectadas por año
+@reportes_bp.route('/reportes/retiros', methods=['GET'])
+def get_proyeccion_retiros():
+    """Obtiene la proyección de jubilaciones de los próximos años."""
+    log.debug("GET /reportes/retiros")
+    try:
+        return jsonify(get_proyeccion_retiros_service(request.args.get('anios', 10, type=int))), 200
+    except Exception as e:
+        log.error("Error inesperado al proyectar retiros: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al proyectar retiros", "details": str(e)}), 500
+
+# GET /api/reportes/proximos?tipo=cumpleanos|aniversario&dias=30&limit=100 - Próximos cumpleaños o aniversarios
+@reportes_bp.route('/reportes/proximos', methods=['GET'])
+def get_proximos():
+    """Obtiene los empleados con cumpleaños o aniversario de ingreso en los próximos días."""
+    log.debug("GET /reportes/proximos")
+    try:
+        resultado = get_proximos_service(
+            tipo=request.args.get('tipo', 'cumpleanos'),
+            dias=request.args.get('dias', 30, type=int),
+            limit=request.args.get('limit', type=int),
+        )
+        return jsonify(resultado), 200
+    except ValueError as e:
+        log.warning("Parámetros inválidos en próximos: %s", e)
+        return jsonify({"error": "Parámetros inválidos", "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error inesperado al obtener próximos cumpleaños/aniversarios: %s", e, exc_info=True)
+        return jsonify({"error": "Error interno del servidor al obtener próximos", "details": str(e)}), 500
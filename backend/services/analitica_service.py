@@ -0,0 +1,257 @@
+"""
+Analítica de edades y antigüedad de toda la plantilla en forma vectorizada.
+
+Las fechas de nacimiento e ingreso de los empleados activos se cargan como arreglos
+columnares de NumPy (datetime64[D], más el año y el mes-día precalculados como enteros)
+y se guardan en caché por versión de la tabla 'empleados'. Tras una escritura los
+arreglos se actualizan sólo con las filas modificadas (feed de cambios por revisión),
+de modo que cada consulta es aritmética sobre arreglos, sin recorrer filas en Python.
+"""
+import os
+from datetime import date
+import numpy as np
+from logger import get_logger
+from database import db
+from models import Empleado
+from sqlalchemy import select, text
+from sqlalchemy.exc import SQLAlchemyError
+from services.version_service import get_version
+from services.reporte_service import RANGOS_EDAD, RANGOS_ANTIGUEDAD
+from utils.cache_utils import VersionedCache
+
+log = get_logger(__name__)
+
+# Una sola entrada: los arreglos de la versión vigente de 'empleados'
+analitica_cache = VersionedCache(
+    'analitica_empleados',
+    ttl=int(os.environ.get('ANALITICA_CACHE_TTL', 3600)),
+    max_entradas=1,
+)
+
+# Edad de jubilación por sexo (Ley del Seguro Social: 60 años hombres, 55 mujeres)
+EDAD_RETIRO = {'M': 60, 'F': 55}
+EDAD_RETIRO_POR_DEFECTO = 60
+TIPOS_PROXIMOS = {'cumpleanos': 'nacimiento', 'aniversario': 'ingreso'}
+MAX_DIAS_PROXIMOS = 366
+LIMITE_PROXIMOS = 100
+MAX_ANIOS_PROYECCION = 50
+
+def _descomponer(fechas):
+    """
+    Precalcula, para un arreglo de fechas, el año y el mes-día (mes * 100 + día) como
+    enteros: las consultas comparan enteros en lugar de convertir fechas en cada petición.
+    """
+    meses = fechas.astype('datetime64[M]')
+    validos = ~np.isnat(fechas)
+    return {
+        'fecha': fechas,
+        'valido': validos,
+        'anio': np.where(validos, fechas.astype('datetime64[Y]').astype(np.int64) + 1970, 0),
+        'md': np.where(validos, (meses.astype(np.int64) % 12 + 1) * 100 + (fechas - meses).astype(np.int64) + 1, 0),
+    }
+
+def _columnas_desde_filas(filas):
+    cedulas, sexos, nacimientos, ingresos = zip(*filas) if filas else ((), (), (), ())
+    return {
+        'cedula': np.array(cedulas, dtype=np.int64),
+        'sexo': np.array([s or '' for s in sexos], dtype='U1'),
+        'nacimiento': _descomponer(np.array(nacimientos, dtype='datetime64[D]')),  # None -> NaT
+        'ingreso': _descomponer(np.array(ingresos, dtype='datetime64[D]')),
+    }
+
+def _cargar_columnas():
+    """Lee cédula, sexo y fechas de todos los empleados activos como arreglos columnares."""
+    # NOT INDEXED: casi todos los empleados están activos y recorrer la tabla es más
+    # rápido que buscar cada fila a través de un índice por estatus
+    filas = db.session.execute(text(
+        "SELECT cedula, sexo, fecha_nacimiento, fecha_ingreso FROM empleados NOT INDEXED WHERE estatus = 1"
+    )).all()
+    return _columnas_desde_filas(filas)
+
+def _unir(partes):
+    """Concatena columnas con la misma estructura (diccionarios anidados de arreglos)."""
+    if isinstance(partes[0], dict):
+        return {clave: _unir([parte[clave] for parte in partes]) for clave in partes[0]}
+    return np.concatenate(partes)
+
+def _filtrar(columnas, mascara):
+    if isinstance(columnas, dict):
+        return {clave: _filtrar(valor, mascara) for clave, valor in columnas.items()}
+    return columnas[mascara]
+
+def _actualizar_columnas(columnas, desde):
+    """
+    Aplica a los arreglos en caché los empleados modificados después de la revisión
+    'desde'. Retorna None si son tantos que conviene recargar todo.
+    """
+    cambios = db.session.execute(text(
+        "SELECT cedula, sexo, fecha_nacimiento, fecha_ingreso, estatus FROM empleados WHERE revision > :desde"
+    ), {'desde': desde}).all()
+    if len(cambios) > max(1000, columnas['cedula'].size // 4):
+        return None
+    cedulas = np.array([fila.cedula for fila in cambios], dtype=np.int64)
+    conservados = _filtrar(columnas, ~np.isin(columnas['cedula'], cedulas))
+    activos = [tuple(fila)[:4] for fila in cambios if fila.estatus == 1]
+    return _unir([conservados, _columnas_desde_filas(activos)]) if activos else conservados
+
+def get_columnas():
+    """
+    Retorna los arreglos de la versión vigente de 'empleados'. Se cargan completos la
+    primera vez; después de una escritura se actualizan sólo con las filas modificadas.
+    """
+    version, _ = get_version('empleados')
+    # La entrada anterior se toma antes de get(), que descarta las de otra versión
+    version_anterior, anteriores = analitica_cache.ultimo('columnas')
+    columnas = analitica_cache.get('columnas', version)
+    if columnas is not None:
+        return columnas
+    if anteriores is not None and version_anterior < version:
+        columnas = _actualizar_columnas(anteriores, version_anterior)
+    if columnas is None:
+        columnas = _cargar_columnas()
+        log.debug("Analítica: %s empleados cargados (versión %s)", columnas['cedula'].size, version)
+    analitica_cache.set('columnas', version, columnas)
+    return columnas
+
+def anios_cumplidos(fechas, hoy):
+    """
+    Versión vectorizada de calcular_edad sobre fechas descompuestas con _descomponer:
+    años cumplidos a 'hoy'. Retorna (años, válidos); las fechas nulas no son válidas.
+    """
+    return hoy.year - fechas['anio'] - ((hoy.month * 100 + hoy.day) < fechas['md']), fechas['valido']
+
+def distribucion(anios, validos, rangos):
+    """
+    Estadísticas y conteo por rango de un arreglo de años. Todo se deriva del conteo por
+    año (bincount), de modo que no se ordena ni se clasifica cada valor por separado.
+    """
+    valores = anios[validos]
+    resultado = {
+        'empleados': int(valores.size),
+        'sin_dato': int(anios.size - valores.size),
+        'promedio': None, 'mediana': None, 'minimo': None, 'maximo': None,
+        'por_rango': [{'rango': etiqueta, 'empleados': 0} for _, etiqueta in rangos],
+        'por_anio': {},
+    }
+    if not valores.size:
+        return resultado
+    minimo = int(valores.min())
+    conteos = np.bincount(valores - minimo)
+    anios_posibles = np.arange(minimo, minimo + conteos.size)
+    limites = [limite for limite, _ in rangos if limite is not None]
+    por_rango = np.bincount(np.searchsorted(limites, anios_posibles, side='right'), weights=conteos, minlength=len(rangos))
+    # Los valores centrales se ubican en el acumulado de conteos
+    centro = np.searchsorted(np.cumsum(conteos), [(valores.size - 1) // 2, valores.size // 2], side='right') + minimo
+    resultado.update({
+        'promedio': round(float(valores.mean()), 2),
+        'mediana': float(centro.mean()),
+        'minimo': minimo,
+        'maximo': minimo + conteos.size - 1,
+        'por_rango': [{'rango': etiqueta, 'empleados': int(conteo)} for (_, etiqueta), conteo in zip(rangos, por_rango)],
+        'por_anio': {int(anio): int(conteo) for anio, conteo in zip(anios_posibles, conteos) if conteo},
+    })
+    return resultado
+
+def get_distribucion_edades_service(hoy=None):
+    """Distribución de edad y antigüedad de los empleados activos."""
+    hoy = hoy or date.today()
+    try:
+        columnas = get_columnas()
+        return {
+            'edad': distribucion(*anios_cumplidos(columnas['nacimiento'], hoy), RANGOS_EDAD),
+            'antiguedad': distribucion(*anios_cumplidos(columnas['ingreso'], hoy), RANGOS_ANTIGUEDAD),
+            'fecha_corte': hoy.isoformat(),
+        }
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_distribucion_edades_service: %s", e)
+        raise
+
+def get_proyeccion_retiros_service(anios=10, hoy=None):
+    """
+    Proyección de jubilaciones: cuántos empleados activos alcanzan la edad de retiro
+    (según EDAD_RETIRO por sexo) en cada uno de los próximos 'anios' años calendario.
+    """
+    hoy = hoy or date.today()
+    anios = max(1, min(int(anios), MAX_ANIOS_PROYECCION))
+    try:
+        columnas = get_columnas()
+        edad_retiro = np.full(columnas['sexo'].shape, EDAD_RETIRO_POR_DEFECTO)
+        for sexo, edad in EDAD_RETIRO.items():
+            edad_retiro[columnas['sexo'] == sexo] = edad
+        edades, validos = anios_cumplidos(columnas['nacimiento'], hoy)
+        anio_retiro = (columnas['nacimiento']['anio'] + edad_retiro)[validos & (edades < edad_retiro)]
+        conteos = np.bincount(anio_retiro - hoy.year, minlength=anios)[:anios]
+        return {
+            'elegibles': int((validos & (edades >= edad_retiro)).sum()),
+            'por_anio': [{'anio': hoy.year + i, 'empleados': int(conteo)} for i, conteo in enumerate(conteos)],
+            'sin_fecha_nacimiento': int((~validos).sum()),
+            'edad_retiro': EDAD_RETIRO,
+            'fecha_corte': hoy.isoformat(),
+        }
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_proyeccion_retiros_service: %s", e)
+        raise
+
+def _tabla_proximas(hoy):
+    """
+    Para cada mes-día posible (índice mes * 100 + día) calcula su próxima ocurrencia a
+    partir de 'hoy' y los días que faltan; un 29 de febrero cae el 1 de marzo en años no
+    bisiestos. Con la tabla, cada empleado se resuelve indexando un arreglo.
+    """
+    faltan = np.full(1232, np.iinfo(np.int64).max, dtype=np.int64)  # Índices que no son fechas: nunca se seleccionan
+    proximas = {}
+    for mes in range(1, 13):
+        for dia in range(1, 32):
+            ocurrencias = []
+            for anio in (hoy.year, hoy.year + 1):
+                try:
+                    ocurrencias.append(date(anio, mes, dia))
+                except ValueError:
+                    if (mes, dia) != (2, 29):
+                        break
+                    ocurrencias.append(date(anio, 3, 1))
+            else:
+                proxima = ocurrencias[0] if ocurrencias[0] >= hoy else ocurrencias[1]
+                faltan[mes * 100 + dia] = (proxima - hoy).days
+                proximas[mes * 100 + dia] = proxima
+    return faltan, proximas
+
+def get_proximos_service(tipo='cumpleanos', dias=30, limit=None, hoy=None):
+    """
+    Empleados activos cuyo cumpleaños (o aniversario de ingreso) cae en los próximos
+    'dias' días, incluido hoy, ordenados por cercanía. Retorna el total y los primeros 'limit'.
+    """
+    if tipo not in TIPOS_PROXIMOS:
+        raise ValueError(f"Tipo inválido: {tipo}. Use {' o '.join(TIPOS_PROXIMOS)}")
+    hoy = hoy or date.today()
+    dias = max(0, min(int(dias), MAX_DIAS_PROXIMOS))
+    limit = LIMITE_PROXIMOS if limit is None else max(1, min(int(limit), LIMITE_PROXIMOS * 5))
+    try:
+        columnas = get_columnas()
+        fechas = columnas[TIPOS_PROXIMOS[tipo]]
+        faltan_por_md, proxima_por_md = _tabla_proximas(hoy)
+        faltan = faltan_por_md[fechas['md']]
+
+        seleccion = np.flatnonzero(fechas['valido'] & (faltan <= dias))
+        seleccion = seleccion[np.lexsort((columnas['cedula'][seleccion], faltan[seleccion]))]
+        primeros = seleccion[:limit]
+
+        nombres = dict(db.session.execute(
+            select(Empleado.cedula, Empleado.nombre).where(Empleado.cedula.in_(columnas['cedula'][primeros].tolist()))
+        ).all()) if primeros.size else {}
+        items = []
+        for i in primeros:
+            cedula = int(columnas['cedula'][i])
+            proxima = proxima_por_md[int(fechas['md'][i])]
+            items.append({
+                'cedula': cedula,
+                'nombre': nombres.get(cedula),
+                'fecha': str(fechas['fecha'][i]),
+                'proxima': proxima.isoformat(),
+                'dias': int(faltan[i]),
+                'anios': int(proxima.year - fechas['anio'][i]),  # Años que cumple (o de servicio) en esa fecha
+            })
+        return {'tipo': tipo, 'dias': dias, 'total': int(seleccion.size), 'items': items}
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_proximos_service: %s", e)
+        raise
@@ -0,0 +1,157 @@
+"""
+Historial de cambios (auditoría) de empleados y cargos.
+
+Los servicios de escritura llaman a registrar_cambio() con los valores anteriores y nuevos;
+los registros se acumulan en un buffer en memoria de la sesión y se insertan todos juntos,
+con un único executemany, justo antes del commit de la misma transacción. Así la auditoría
+no agrega un commit (ni un fsync) por escritura y, si la transacción se revierte, el buffer
+se descarta: el historial nunca registra cambios que no se confirmaron.
+"""
+import json
+import weakref
+from datetime import date, datetime, timedelta, timezone
+from flask import has_request_context, request
+from logger import get_logger
+from database import db, RoutingSession
+from models import Auditoria
+from sqlalchemy import event, insert, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from utils.pagination_utils import encode_cursor, decode_cursor
+
+log = get_logger(__name__)
+
+# Campos cuyos cambios se registran en el historial
+CAMPOS_AUDITADOS = {
+    'empleados': ('nombre', 'cargo', 'cargo_id', 'fecha_nacimiento', 'sexo', 'fecha_ingreso', 'telefono', 'correo', 'estatus'),
+    'cargos': ('nombre', 'nivel', 'sueldo_base', 'estatus'),
+}
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+# Clave del buffer en session.info
+BUFFER = 'auditoria'
+# SAVEPOINT abierto -> largo del buffer al abrirlo
+_marcas_savepoint = weakref.WeakKeyDictionary()
+
+def _valor(valor):
+    return valor.isoformat() if isinstance(valor, date) else valor
+
+def _json(valores):
+    return json.dumps(valores, ensure_ascii=False, separators=(',', ':')) if valores else None
+
+def _origen():
+    # La cola de escritura ejecuta fuera de la petición y deja su origen en session.info
+    origen = db.session.info.get('origen')
+    if origen is None and has_request_context():
+        origen = f"{request.method} {request.path}"
+    return (origen or 'cli')[:120]
+
+def registrar_cambio(tabla, registro_id, operacion, antes, despues):
+    """
+    Agrega un cambio al buffer de auditoría de la transacción en curso.
+    'despues' tiene los valores escritos y 'antes' los que tenía la fila (ambos pueden tener
+    campos de más); sólo se guardan los campos auditados escritos cuyo valor cambió. Un cambio
+    sin diferencias no se registra.
+    """
+    antes = antes or {}
+    campos = [campo for campo in CAMPOS_AUDITADOS[tabla]
+              if campo in despues and _valor(antes.get(campo)) != _valor(despues[campo])]
+    if not campos:
+        return
+    db.session.info.setdefault(BUFFER, []).append({
+        'tabla': tabla,
+        'registro_id': registro_id,
+        'operacion': operacion,
+        'antes': _json({campo: _valor(antes[campo]) for campo in campos if campo in antes}),
+        'despues': _json({campo: _valor(despues[campo]) for campo in campos}),
+        'origen': _origen(),
+    })
+
+def valores_auditados(tabla, objeto):
+    """Extrae de una instancia del modelo los campos auditados de 'tabla'."""
+    return {campo: getattr(objeto, campo) for campo in CAMPOS_AUDITADOS[tabla]}
+
+def registrar_cambios(tabla, operacion, cambios):
+    """Registra varios cambios [(registro_id, antes, despues), ...] de una escritura en lote."""
+    for registro_id, antes, despues in cambios:
+        registrar_cambio(tabla, registro_id, operacion, antes, despues)
+
+@event.listens_for(RoutingSession, 'before_commit')
+def _volcar_buffer(session):
+    """Inserta los cambios acumulados en la misma transacción que se está confirmando."""
+    registros = session.info.pop(BUFFER, None)
+    if not registros:
+        return
+    fecha = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)  # UTC
+    for registro in registros:
+        registro['fecha'] = fecha
+    session.execute(insert(Auditoria.__table__), registros)
+    log.debug("Auditoría: %s cambios registrados", len(registros))
+
+@event.listens_for(RoutingSession, 'after_transaction_create')
+def _marcar_savepoint(session, transaccion):
+    if transaccion.nested:
+        _marcas_savepoint[transaccion] = len(session.info.get(BUFFER, ()))
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def _descartar_buffer(session, transaccion_anterior):
+    # El rollback de la transacción principal descarta todo el buffer; el de un SAVEPOINT,
+    # sólo los cambios registrados después de abrirlo
+    if transaccion_anterior.parent is None:
+        session.info.pop(BUFFER, None)
+    elif transaccion_anterior.nested:
+        marca = _marcas_savepoint.pop(transaccion_anterior, None)
+        if marca is not None and BUFFER in session.info:
+            del session.info[BUFFER][marca:]
+
+def _parse_fecha(valor, fin=False):
+    """
+    Convierte 'AAAA-MM-DD' o 'AAAA-MM-DDTHH:MM:SS' (UTC) en datetime. Con 'fin', una fecha
+    sin hora se toma como el inicio del día siguiente (límite exclusivo).
+    Lanza ValueError si el valor es inválido.
+    """
+    try:
+        fecha = datetime.fromisoformat(valor.strip().rstrip('Z'))
+    except ValueError:
+        raise ValueError(f"Fecha inválida: {valor!r} (formato AAAA-MM-DD o AAAA-MM-DDTHH:MM:SS)")
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    if fin and len(valor.strip()) == 10:
+        return fecha + timedelta(days=1), False
+    return fecha, True
+
+def get_historial_service(tabla, registro_id, desde=None, hasta=None, limit=None, cursor=None):
+    """
+    Retorna el historial de cambios de un registro (del más reciente al más antiguo), con
+    filtros opcionales de rango de fechas. Usa el índice (tabla, registro_id, fecha, id) y
+    paginación por cursor. Retorna un diccionario con 'items', 'next_cursor' y 'limit'.
+    Lanza ValueError si los parámetros son inválidos.
+    """
+    limit = LIMITE_POR_DEFECTO if limit is None else max(1, min(int(limit), LIMITE_MAXIMO))
+    try:
+        query = select(Auditoria).where(Auditoria.tabla == tabla, Auditoria.registro_id == registro_id)
+        if desde:
+            query = query.where(Auditoria.fecha >= _parse_fecha(desde)[0])
+        if hasta:
+            limite, inclusivo = _parse_fecha(hasta, fin=True)
+            query = query.where(Auditoria.fecha <= limite if inclusivo else Auditoria.fecha < limite)
+        firma = ['auditoria', tabla, registro_id, desde or None, hasta or None]
+        if cursor:
+            try:
+                fecha, id_ = decode_cursor(cursor, firma)
+                fecha = datetime.fromisoformat(fecha)
+            except TypeError:
+                raise ValueError("Cursor inválido")
+            query = query.where(tuple_(Auditoria.fecha, Auditoria.id) < tuple_(fecha, id_))
+
+        filas = db.session.execute(
+            query.order_by(Auditoria.fecha.desc(), Auditoria.id.desc()).limit(limit + 1)
+        ).scalars().all()
+        next_cursor = None
+        if len(filas) > limit:
+            ultima = filas[limit - 1]
+            next_cursor = encode_cursor(firma, [ultima.fecha.isoformat(), ultima.id])
+        return {'items': [fila.to_dict() for fila in filas[:limit]], 'next_cursor': next_cursor, 'limit': limit}
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_historial_service(%s, %s): %s", tabla, registro_id, e)
+        raise
@@ -1,85 +1,310 @@
-from logger import logger as log
+import os
+from logger import get_logger
 from database import db
-from models import Cargo
+from models import Cargo, Empleado
+from services.version_service import ConflictoVersion, incrementar_version, get_version, get_cambios, actualizar_con_revisiones
+from services.reporte_service import ajustar_resumen_cargo
+from cola_escritura import SinCambios, ejecutar_escritura
+from services.auditoria_service import registrar_cambio, registrar_cambios, valores_auditados
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from utils.cache_utils import VersionedCache
+from utils.json_utils import a_columnas
 
-def get_all_active_cargos_service():
-    """Obtiene todos los cargos activos de la base de datos."""
+log = get_logger(__name__)
+
+# Caché del catálogo de cargos activos. La versión se lee de 'versiones_tabla', por lo que
+# una escritura hecha en otro proceso invalida también la caché de este.
+cargos_cache = VersionedCache(
+    'cargos',
+    ttl=int(os.environ.get('CARGOS_CACHE_TTL', 300)),
+    max_entradas=int(os.environ.get('CARGOS_CACHE_MAX_ENTRADAS', 16)),
+)
+LIMITE_CAMBIOS = 500
+LIMITE_LOTE = 1000
+
+# Lectura rápida del catálogo: mismos campos y orden que Cargo.to_dict(), como tuplas
+CAMPOS_LECTURA = ('id', 'nombre', 'nivel', 'sueldo_base', 'estatus', 'revision', 'version')
+COLUMNAS_LECTURA = (Cargo.id, Cargo.nombre, Cargo.nivel, Cargo.sueldo_base, Cargo.estatus, Cargo.revision, Cargo.version)
+
+def get_all_active_cargos_service(columnar=False):
+    """
+    Obtiene todos los cargos activos, desde la caché si la versión de la tabla no ha cambiado.
+    Con 'columnar' retorna {'columns': CAMPOS_LECTURA, 'rows': [...]} en lugar de una lista.
+    """
+    try:
+        version, _ = get_version('cargos')
+        cargos_list = cargos_cache.get('activos', version)
+        if cargos_list is None:
+            filas = db.session.execute(
+                select(*COLUMNAS_LECTURA).where(Cargo.estatus == 1).order_by(Cargo.nivel)
+            )
+            cargos_list = [dict(zip(CAMPOS_LECTURA, fila)) for fila in filas]
+            cargos_cache.set('activos', version, cargos_list)
+        if columnar:
+            return a_columnas(CAMPOS_LECTURA, [tuple(cargo.values()) for cargo in cargos_list])
+        return list(cargos_list)
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_all_active_cargos_service: %s", e)
+        raise
+
+def get_cargos_changes_service(since=-1, limit=None):
+    """Obtiene los cargos insertados, modificados o eliminados lógicamente después de la revisión 'since'."""
+    limit = LIMITE_CAMBIOS if limit is None else max(1, min(int(limit), LIMITE_CAMBIOS))
     try:
-        cargos = Cargo.query.filter_by(estatus=1).order_by(Cargo.nivel).all()
-        return [cargo.to_dict() for cargo in cargos]
+        return get_cambios(Cargo, since, limit)
     except SQLAlchemyError as e:
-        log.error(f"Error de base de datos en get_all_active_cargos_service: {e}")
+        log.error("Error de base de datos en get_cargos_changes_service: %s", e)
         raise
 
+def catalogo_cargos_activos():
+    """
+    Retorna dos diccionarios de los cargos activos: {id: nombre} y
+    {nombre en minúsculas: (id, nombre)} (el de menor id si un nombre se repite).
+    """
+    por_id = {}
+    por_nombre = {}
+    for id, nombre in db.session.execute(
+        select(Cargo.id, Cargo.nombre).where(Cargo.estatus == 1).order_by(Cargo.id.desc())
+    ):
+        por_id[id] = nombre
+        por_nombre[nombre.lower()] = (id, nombre)
+    return por_id, por_nombre
+
+def _propagar_a_empleados(cargo_ids, nombre_cambiado=False):
+    """
+    Propaga un cambio de uno o varios cargos a sus empleados con una sola sentencia basada
+    en conjuntos: asigna a cada empleado una revisión nueva, ya que su representación
+    (nombre, nivel y sueldo del cargo) cambió, y si cambió el nombre actualiza su copia.
+    La copia sólo se reescribe en ese caso: hacerlo también reindexa la búsqueda de texto.
+    """
+    ids = list(cargo_ids)
+    cantidad = db.session.execute(
+        select(func.count()).select_from(Empleado).where(Empleado.cargo_id.in_(ids))
+    ).scalar_one()
+    if not cantidad:
+        return 0
+    ultima = incrementar_version('empleados', cantidad)
+    empleados = Empleado.__table__
+    numerados = (select(empleados.c.cedula, Cargo.nombre,
+                        func.row_number().over(order_by=empleados.c.cedula).label('n'))
+                 .join(Cargo, Cargo.id == empleados.c.cargo_id)
+                 .where(empleados.c.cargo_id.in_(ids)).subquery())
+    valores = {'revision': ultima - cantidad + numerados.c.n}
+    if nombre_cambiado:
+        valores['cargo'] = numerados.c.nombre
+    db.session.execute(update(empleados).where(empleados.c.cedula == numerados.c.cedula).values(**valores))
+    return cantidad
+
+def _add_cargo(data):
+    # Crear nuevo cargo
+    nuevo_cargo = Cargo(
+        nombre=data['nombre'],
+        nivel=data['nivel'],
+        sueldo_base=data['sueldo_base']
+    )
+    
+    # Añadir a la sesión
+    nuevo_cargo.revision = incrementar_version('cargos')
+    db.session.add(nuevo_cargo)
+    db.session.flush()  # Asigna el ID y los valores por defecto antes de auditar el alta
+    registrar_cambio('cargos', nuevo_cargo.id, 'alta', None, valores_auditados('cargos', nuevo_cargo))
+    
+    # Convertir a diccionario para la respuesta
+    return nuevo_cargo.to_dict()
+
 def add_cargo_service(data):
     """Añade un nuevo cargo a la base de datos."""
     try:
-        # Crear nuevo cargo
-        nuevo_cargo = Cargo(
-            nombre=data['nombre'],
-            nivel=data['nivel'],
-            sueldo_base=data['sueldo_base']
-        )
-        
-        # Añadir a la sesión y guardar
-        db.session.add(nuevo_cargo)
-        db.session.commit()
-        
-        # Convertir a diccionario para la respuesta
-        return nuevo_cargo.to_dict()
+        nuevo_cargo = ejecutar_escritura(_add_cargo, data)
+        cargos_cache.invalidate()
+        return nuevo_cargo
     except IntegrityError as e:
-        db.session.rollback()
-        log.error(f"Error de integridad en add_cargo_service: {e}")
+        log.error("Error de integridad en add_cargo_service: %s", e)
         raise ValueError("Es posible que ya exista un cargo con ese nivel")
     except SQLAlchemyError as e:
-        db.session.rollback()
-        log.error(f"Error de base de datos en add_cargo_service: {e}")
+        log.error("Error de base de datos en add_cargo_service: %s", e)
         raise
 
-def update_cargo_service(id, data):
-    """Actualiza un cargo activo existente."""
+def get_cargo_activo(id):
+    """Retorna el cargo activo con el ID indicado (como Cargo.to_dict()), o None."""
+    fila = db.session.execute(select(*COLUMNAS_LECTURA).where(Cargo.id == id, Cargo.estatus == 1)).first()
+    return dict(zip(CAMPOS_LECTURA, fila)) if fila else None
+
+def _update_cargo(id, data, versiones):
+    valores = {campo: data[campo] for campo in ('nombre', 'nivel', 'sueldo_base') if campo in data}
+    cargos = Cargo.__table__
+    condicion = (cargos.c.id == id) & (cargos.c.estatus == 1)
+    if versiones is not None:
+        condicion &= cargos.c.version.in_(versiones)
+
+    # incrementar_version toma el bloqueo de escritura: el estado anterior leído
+    # aquí es el que reemplaza el UPDATE (se necesita para propagar y ajustar el resumen).
+    revision = incrementar_version('cargos')
+    anterior = db.session.execute(
+        select(cargos.c.nombre, cargos.c.nivel, cargos.c.sueldo_base).where(condicion)
+    ).first()
+    resultado = db.session.execute(
+        update(cargos).where(condicion)
+        .values(**valores, revision=revision, version=cargos.c.version + 1)
+    )
+    if resultado.rowcount == 0:
+        actual = get_cargo_activo(id)
+        if actual is None:
+            raise SinCambios(None)  # Cargo no encontrado o inactivo
+        raise ConflictoVersion(actual)
+    nivel, sueldo_base = valores.get('nivel', anterior.nivel), valores.get('sueldo_base', anterior.sueldo_base)
+    _propagar_a_empleados([id], nombre_cambiado=valores.get('nombre', anterior.nombre) != anterior.nombre)
+    ajustar_resumen_cargo(id, anterior.nivel, anterior.sueldo_base, nivel, sueldo_base)
+    registrar_cambio('cargos', id, 'modificacion', anterior._asdict(), valores)
+    return get_cargo_activo(id)
+
+def update_cargo_service(id, data, versiones=None):
+    """
+    Actualiza un cargo activo existente con un único UPDATE condicional.
+    Si se indican 'versiones' (las del encabezado If-Match) sólo se aplica cuando la versión
+    de la fila es una de ellas; si no, lanza ConflictoVersion con la fila vigente.
+    Retorna None si el cargo no existe o está inactivo.
+    """
     try:
-        # Buscar cargo por ID y estatus activo
-        cargo = Cargo.query.filter_by(id=id, estatus=1).first()
-        if not cargo:
-            return None  # Cargo no encontrado o inactivo
-        
-        # Actualizar campos si están presentes
-        if 'nombre' in data:
-            cargo.nombre = data['nombre']
-        if 'nivel' in data:
-            cargo.nivel = data['nivel']
-        if 'sueldo_base' in data:
-            cargo.sueldo_base = data['sueldo_base']
-        
-        # Guardar cambios
-        db.session.commit()
-        
-        return cargo.to_dict()
+        cargo = ejecutar_escritura(_update_cargo, id, data, versiones)
+        if cargo is not None:
+            cargos_cache.invalidate()
+        return cargo
     except IntegrityError as e:
-        db.session.rollback()
-        log.error(f"Error de integridad en update_cargo_service: {e}")
+        log.error("Error de integridad en update_cargo_service: %s", e)
         raise ValueError("Falló la actualización, es posible que ya exista un cargo con ese nivel")
     except SQLAlchemyError as e:
-        db.session.rollback()
-        log.error(f"Error de base de datos en update_cargo_service: {e}")
+        log.error("Error de base de datos en update_cargo_service: %s", e)
         raise
 
+def _delete_cargo_logico(id):
+    # Buscar cargo por ID y estatus activo
+    cargo = Cargo.query.filter_by(id=id, estatus=1).first()
+    if not cargo:
+        return False  # Cargo no encontrado o ya inactivo
+    
+    # Cambiar estatus a inactivo
+    cargo.estatus = 0
+    cargo.version = Cargo.version + 1
+    with db.session.no_autoflush:
+        cargo.revision = incrementar_version('cargos')
+    registrar_cambio('cargos', id, 'baja', {'estatus': 1}, {'estatus': 0})
+    return True
+
 def delete_cargo_logico_service(id):
     """Elimina lógicamente un cargo estableciendo estatus a 0."""
     try:
-        # Buscar cargo por ID y estatus activo
-        cargo = Cargo.query.filter_by(id=id, estatus=1).first()
-        if not cargo:
-            return False  # Cargo no encontrado o ya inactivo
-        
-        # Cambiar estatus a inactivo
-        cargo.estatus = 0
-        db.session.commit()
-        
-        return True
+        eliminado = ejecutar_escritura(_delete_cargo_logico, id)
+        if eliminado:
+            cargos_cache.invalidate()
+        return eliminado
     except SQLAlchemyError as e:
+        log.error("Error de base de datos en delete_cargo_logico_service: %s", e)
+        raise
+
+def _seleccion_lote(data):
+    """
+    Interpreta la selección de una operación en lote sobre cargos activos: una lista 'ids'
+    o un 'filtro' por rango de nivel ({"nivel_desde": 1, "nivel_hasta": 3}, ambos opcionales).
+    Retorna (predicado, ids solicitados o None). Lanza ValueError si no es válida.
+    """
+    ids, filtro = data.get('ids'), data.get('filtro')
+    if (ids is None) == (filtro is None):
+        raise ValueError("Debe indicar 'ids' o 'filtro', pero no ambos")
+    if ids is not None:
+        if not isinstance(ids, list) or not ids:
+            raise ValueError("'ids' debe ser una lista no vacía")
+        if len(ids) > LIMITE_LOTE:
+            raise ValueError(f"Se permiten como máximo {LIMITE_LOTE} cargos por lote")
+        ids = list(dict.fromkeys(int(id) for id in ids))
+        return (Cargo.estatus == 1) & Cargo.id.in_(ids), ids
+    if not isinstance(filtro, dict):
+        raise ValueError("'filtro' debe ser un objeto")
+    invalidos = set(filtro) - {'nivel_desde', 'nivel_hasta'}
+    if invalidos:
+        raise ValueError(f"Campos de filtro inválidos: {', '.join(sorted(invalidos))}")
+    predicado = Cargo.estatus == 1
+    if filtro.get('nivel_desde') is not None:
+        predicado &= Cargo.nivel >= int(filtro['nivel_desde'])
+    if filtro.get('nivel_hasta') is not None:
+        predicado &= Cargo.nivel <= int(filtro['nivel_hasta'])
+    return predicado, None
+
+def _parse_cambios_lote(cambios):
+    """
+    Valida los cambios en lote de cargos: 'sueldo_base' (valor fijo) o 'porcentaje_sueldo'
+    (p. ej. 10 aumenta un 10 %, -5 reduce un 5 %; se redondea a 2 decimales).
+    """
+    if not isinstance(cambios, dict) or len(cambios) != 1 or not set(cambios) <= {'sueldo_base', 'porcentaje_sueldo'}:
+        raise ValueError("'cambios' debe indicar 'sueldo_base' o 'porcentaje_sueldo'")
+    if 'sueldo_base' in cambios:
+        sueldo = float(cambios['sueldo_base'])
+        if sueldo < 0:
+            raise ValueError("El sueldo base no puede ser negativo")
+        return {'sueldo_base': sueldo}
+    porcentaje = float(cambios['porcentaje_sueldo'])
+    if porcentaje <= -100:
+        raise ValueError("El porcentaje debe ser mayor que -100")
+    return {'sueldo_base': func.round(Cargo.sueldo_base * (1 + porcentaje / 100), 2)}
+
+def _aplicar_lote(data, valores, estado, propagar):
+    """
+    Aplica 'valores' a los cargos seleccionados con un único UPDATE en una transacción.
+    Con 'propagar' se renuevan las revisiones de sus empleados y se ajusta el resumen.
+    """
+    predicado, solicitados = _seleccion_lote(data)
+    try:
+        anteriores = {fila.id: fila for fila in db.session.execute(
+            select(Cargo.id, Cargo.nivel, Cargo.sueldo_base).where(predicado)
+        )}
+        if anteriores:
+            actualizar_con_revisiones(Cargo.__table__, Cargo.__table__.c.id, predicado,
+                                      {**valores, 'version': Cargo.__table__.c.version + 1},
+                                      cantidad=len(anteriores))
+            if propagar:
+                _propagar_a_empleados(anteriores)
+                nuevos = dict(db.session.execute(
+                    select(Cargo.id, Cargo.sueldo_base).where(Cargo.id.in_(list(anteriores)))
+                ).all())
+                for id, fila in anteriores.items():
+                    ajustar_resumen_cargo(id, fila.nivel, fila.sueldo_base, fila.nivel, nuevos[id])
+                registrar_cambios('cargos', 'modificacion', [
+                    (id, {'sueldo_base': fila.sueldo_base}, {'sueldo_base': nuevos[id]}) for id, fila in anteriores.items()
+                ])
+            else:
+                registrar_cambios('cargos', 'baja', [(id, {'estatus': 1}, {'estatus': 0}) for id in anteriores])
+        db.session.commit()
+        cargos_cache.invalidate()
+    except SQLAlchemyError:
         db.session.rollback()
-        log.error(f"Error de base de datos en delete_cargo_logico_service: {e}")
-        raise 
\ No newline at end of file
+        raise
+
+    if solicitados is None:
+        resultados = [{'id': id, 'estado': estado} for id in sorted(anteriores)]
+    else:
+        resultados = [{'id': id, 'estado': estado if id in anteriores else 'no_encontrado'} for id in solicitados]
+    return {
+        'afectados': len(anteriores),
+        'no_encontrados': len(resultados) - len(anteriores),
+        'resultados': resultados,
+    }
+
+def update_cargos_lote_service(data):
+    """
+    Actualiza en lote el sueldo base de los cargos activos indicados por 'ids' o 'filtro'
+    (fijo o por porcentaje). Lanza ValueError si la petición no es válida.
+    """
+    try:
+        return _aplicar_lote(data, _parse_cambios_lote(data.get('cambios')), 'actualizado', propagar=True)
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en update_cargos_lote_service: %s", e)
+        raise
+
+def delete_cargos_lote_service(data):
+    """Elimina lógicamente en lote los cargos activos indicados por 'ids' o 'filtro'."""
+    try:
+        return _aplicar_lote(data, {'estatus': 0}, 'eliminado', propagar=False)
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en delete_cargos_lote_service: %s", e)
+        raise
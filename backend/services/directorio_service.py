@@ -0,0 +1,240 @@
+"""
+Directorio en memoria de los empleados activos, por cédula y por correo.
+
+Responde sin consultar la base de datos si una cédula está activa y a qué cédula pertenece
+un correo, para validar altas y modificaciones antes de tomar el bloqueo de escritura y
+descartar las que apuntan a empleados inexistentes. Se guarda en dos TablaHashEnteros
+(cédula -> clave del correo y clave del correo -> cédula): unos 64 MB por millón de
+empleados, en lugar de varios cientos con dicts de Python. La clave del correo es un hash
+de 63 bits del correo en minúsculas; una coincidencia se confirma contra la base de datos
+antes de rechazar nada.
+
+El directorio se construye al arrancar (en el proceso maestro con preload_app, de modo que
+los workers lo heredan) y se mantiene al día en cada proceso:
+  - las escrituras de este proceso lo actualizan tras su commit (aplicar);
+  - antes de cada consulta se compara la versión de 'empleados' con la última revisión
+    aplicada y, si cambió, se leen sólo las filas con revisión posterior (igual que el
+    feed de cambios), con lo que también ve las escrituras de otros workers;
+  - cada DIRECTORIO_RECONCILIAR_S segundos (por defecto 900, 0 lo desactiva) se reconstruye
+    desde la base de datos en segundo plano y se registran las diferencias encontradas.
+"""
+import os
+import threading
+import time
+import numpy as np
+from flask import current_app
+from logger import get_logger
+from database import db
+from models import Empleado
+from services.version_service import get_version
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from utils.hash_utils import TablaHashEnteros
+
+log = get_logger(__name__)
+
+DIRECTORIO_RECONCILIAR_S = float(os.environ.get('DIRECTORIO_RECONCILIAR_S', 900))
+TAMANO_LECTURA = 50000
+_MASCARA_63 = (1 << 63) - 1
+
+def normalizar_correo(correo):
+    """
+    Forma con que se comparan los correos (sin espacios ni mayúsculas), la misma que usa el
+    índice único sobre lower(correo); None si no hay correo.
+    """
+    if not correo:
+        return None
+    return correo.strip().lower() or None
+
+def clave_correo(correo):
+    """Clave entera positiva del correo (sin distinguir mayúsculas); 0 si no hay correo."""
+    correo = normalizar_correo(correo)
+    if correo is None:
+        return 0
+    # hash() es estable dentro del proceso y los workers creados con fork heredan la semilla
+    return (hash(correo) & _MASCARA_63) or 1
+
+class DirectorioEmpleados:
+    """Índice compacto de empleados activos, sincronizado por revisiones con la base de datos."""
+    __slots__ = ('_cedulas', '_correos', 'revision', '_lock', '_reconciliado', '_reconciliando',
+                 'hits', 'misses', 'diferencias')
+
+    def __init__(self):
+        self._cedulas = None  # cédula -> clave del correo (0 sin correo); None si no se ha construido
+        self._correos = None  # clave del correo -> cédula
+        self.revision = 0  # Última revisión de 'empleados' incorporada
+        self._lock = threading.RLock()
+        self._reconciliado = 0.0
+        self._reconciliando = False
+        self.hits = 0  # Consultas respondidas con el directorio ya al día
+        self.misses = 0  # Consultas que tuvieron que leer cambios antes de responder
+        self.diferencias = 0
+
+    @staticmethod
+    def _leer():
+        """Lee de la base de datos la versión de 'empleados' y las tablas completas."""
+        version = get_version('empleados')[0]
+        cedulas, correos = [], []
+        filas = db.session.execute(
+            select(Empleado.cedula, Empleado.correo).where(Empleado.estatus == 1)
+            .execution_options(yield_per=TAMANO_LECTURA)
+        )
+        for cedula, correo in filas:
+            if cedula <= 0:  # Fuera del directorio (ver _aplicar)
+                continue
+            cedulas.append(cedula)
+            correos.append(clave_correo(correo))
+        cedulas = np.array(cedulas, dtype=np.int64)
+        correos = np.array(correos, dtype=np.int64)
+        con_correo = correos > 0
+        return (version, TablaHashEnteros.desde_arrays(cedulas, correos),
+                TablaHashEnteros.desde_arrays(correos[con_correo], cedulas[con_correo]))
+
+    def construir(self):
+        """Carga el directorio completo desde la base de datos (requiere contexto de aplicación)."""
+        inicio = time.perf_counter()
+        version, cedulas, correos = self._leer()
+        with self._lock:
+            self._cedulas, self._correos, self.revision = cedulas, correos, version
+            self._reconciliado = time.monotonic()
+        log.info("Directorio de empleados construido: %s activos, %.1f MB en %.2f s",
+                 len(cedulas), self.bytes / 1e6, time.perf_counter() - inicio)
+
+    def _aplicar(self, cedula, correo, activo):
+        if cedula <= 0:
+            # La tabla hash sólo admite claves positivas; estas cédulas (que la API ya no
+            # acepta) se consultan siempre como ausentes en lugar de fallar tras el commit
+            return
+        anterior = self._cedulas.eliminar(cedula)
+        if anterior and self._correos.get(anterior) == cedula:
+            self._correos.eliminar(anterior)
+        if activo:
+            clave = clave_correo(correo)
+            self._cedulas.asignar(cedula, clave)
+            if clave:
+                self._correos.asignar(clave, cedula)
+
+    def aplicar(self, cedula, correo, activo=True):
+        """
+        Registra el estado de un empleado tras el commit de una escritura de este proceso.
+        Nunca lanza: la escritura ya está confirmada y un fallo sólo adelanta la reconciliación.
+        """
+        with self._lock:
+            if self._cedulas is None:
+                return
+            try:
+                self._aplicar(int(cedula), correo, activo)
+            except Exception as e:
+                log.error("No se pudo aplicar la cédula %s al directorio de empleados: %s", cedula, e)
+                self._reconciliado = 0.0  # La próxima consulta lo reconstruye desde la base de datos
+
+    def sincronizar(self):
+        """
+        Incorpora los cambios confirmados desde la última revisión aplicada (de cualquier
+        proceso). Cuesta una lectura por clave primaria si no hubo cambios.
+        """
+        if self._cedulas is None:
+            self.construir()
+        self._programar_reconciliacion()
+        version = get_version('empleados')[0]
+        with self._lock:
+            if version <= self.revision:  # Otro hilo pudo sincronizar más allá de la versión leída
+                self.hits += 1
+                return
+            filas = db.session.execute(
+                select(Empleado.cedula, Empleado.correo, Empleado.estatus, Empleado.revision)
+                .where(Empleado.revision > self.revision).order_by(Empleado.revision)
+            ).all()
+            for cedula, correo, estatus, _ in filas:
+                self._aplicar(cedula, correo, estatus == 1)
+            self.revision = max(version, filas[-1].revision) if filas else version
+            self.misses += 1
+        log.debug("Directorio de empleados sincronizado: %s cambios hasta la revisión %s", len(filas), self.revision)
+
+    def existe(self, cedula):
+        """Indica si hay un empleado activo con la cédula."""
+        self.sincronizar()
+        with self._lock:
+            return int(cedula) in self._cedulas
+
+    def cedula_de_correo(self, correo):
+        """
+        Retorna la cédula del empleado activo que tiene el correo (sin distinguir mayúsculas),
+        o None. Una coincidencia se confirma leyendo por clave primaria el correo guardado,
+        de modo que una colisión del hash nunca produce un falso duplicado.
+        """
+        clave = clave_correo(correo)
+        if not clave:
+            return None
+        self.sincronizar()
+        with self._lock:
+            cedula = self._correos.get(clave)
+        if cedula is None:
+            return None
+        guardado = db.session.execute(
+            select(func.lower(Empleado.correo)).where(Empleado.cedula == cedula, Empleado.estatus == 1)
+        ).scalar()
+        return cedula if guardado == normalizar_correo(correo) else None
+
+    def reconciliar(self):
+        """
+        Reconstruye el directorio desde la base de datos, lo reemplaza y retorna cuántas
+        cédulas faltaban o sobraban en el directorio anterior (debería ser 0).
+        """
+        version, cedulas, correos = self._leer()
+        with self._lock:
+            anteriores = self._cedulas.claves() if self._cedulas is not None else np.empty(0, dtype=np.int64)
+            nuevas = cedulas.claves()
+            faltantes = int(np.setdiff1d(nuevas, anteriores, assume_unique=True).size)
+            sobrantes = int(np.setdiff1d(anteriores, nuevas, assume_unique=True).size)
+            # Las escrituras confirmadas mientras se leía se incorporan en la próxima sincronización
+            self._cedulas, self._correos, self.revision = cedulas, correos, version
+            self._reconciliado = time.monotonic()
+            self.diferencias += faltantes + sobrantes
+        if faltantes or sobrantes:
+            log.warning("Reconciliación del directorio de empleados: %s faltantes y %s sobrantes corregidos",
+                        faltantes, sobrantes)
+        return {'activos': len(cedulas), 'faltantes': faltantes, 'sobrantes': sobrantes}
+
+    def _programar_reconciliacion(self):
+        if not DIRECTORIO_RECONCILIAR_S or self._reconciliando \
+                or time.monotonic() - self._reconciliado < DIRECTORIO_RECONCILIAR_S:
+            return
+        with self._lock:
+            if self._reconciliando:
+                return
+            self._reconciliando = True
+        app = current_app._get_current_object()
+        threading.Thread(target=self._reconciliar_en_segundo_plano, args=(app,),
+                         name='reconciliar-directorio', daemon=True).start()
+
+    def _reconciliar_en_segundo_plano(self, app):
+        with app.app_context():
+            try:
+                self.reconciliar()
+            except SQLAlchemyError as e:
+                log.error("Error de base de datos al reconciliar el directorio de empleados: %s", e)
+                self._reconciliado = time.monotonic()  # Reintentar en el próximo intervalo
+            finally:
+                self._reconciliando = False
+                db.session.remove()
+
+    @property
+    def bytes(self):
+        with self._lock:
+            if self._cedulas is None:
+                return 0
+            return self._cedulas.bytes + self._correos.bytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                'nombre': 'directorio_empleados',
+                'entradas': len(self._cedulas) if self._cedulas is not None else 0,
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'diferencias': self.diferencias,
+            }
+
+directorio_empleados = DirectorioEmpleados()
@@ -1,117 +1,517 @@
-from datetime import datetime
-from logger import logger as log
+import re
+from datetime import datetime, date
+from logger import get_logger
 from database import db
-from models import Empleado
+from models import Empleado, Cargo
+from sqlalchemy import String, cast, column, func, select, table, type_coerce, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from services.version_service import ConflictoVersion, incrementar_version, get_cambios, actualizar_con_revisiones
+from services.reporte_service import CAMPOS_RESUMEN, estado_empleado, registrar_cambios_resumen
+from cola_escritura import SinCambios, ejecutar_escritura
+from services.auditoria_service import CAMPOS_AUDITADOS, registrar_cambio, registrar_cambios, valores_auditados
+from services.directorio_service import directorio_empleados
+from utils.fecha_utils import calcular_edad
+from utils.json_utils import a_columnas
+from utils.pagination_utils import encode_cursor, decode_cursor, keyset_predicate
 
-def calcular_edad(fecha_nacimiento):
-    if not fecha_nacimiento:
-        return None
-    hoy = datetime.now()
-    edad = hoy.year - fecha_nacimiento.year
-    if (hoy.month, hoy.day) < (fecha_nacimiento.month, fecha_nacimiento.day):
-        edad -= 1
-    return edad
-
-def get_all_active_empleados_service():
-    """Obtiene todos los empleados activos de la base de datos."""
+log = get_logger(__name__)
+
+# Columnas permitidas para filtrar y ordenar el listado paginado (mismas que ofrece el frontend)
+COLUMNAS_FILTRO = {
+    'cedula': Empleado.cedula,
+    'nombre': Empleado.nombre,
+    'cargo': Empleado.cargo,
+    'sexo': Empleado.sexo,
+    'fecha_ingreso': Empleado.fecha_ingreso,
+}
+
+# clave de ordenamiento -> (campo del modelo, expresión SQL, invertir dirección)
+# Los textos se comparan sin distinguir mayúsculas, igual que el ordenamiento del frontend.
+# 'edad' se resuelve ordenando por fecha de nacimiento en sentido inverso.
+COLUMNAS_ORDEN = {
+    'cedula': ('cedula', Empleado.cedula, False),
+    'nombre': ('nombre', Empleado.nombre.collate('NOCASE'), False),
+    'cargo': ('cargo', Empleado.cargo.collate('NOCASE'), False),
+    'sexo': ('sexo', Empleado.sexo, False),
+    'fecha_ingreso': ('fecha_ingreso', Empleado.fecha_ingreso, False),
+    'edad': ('fecha_nacimiento', Empleado.fecha_nacimiento, True),
+}
+CAMPOS_FECHA = ('fecha_ingreso', 'fecha_nacimiento')
+ORDEN_POR_DEFECTO = [('nombre', 'asc')]
+MAX_CRITERIOS_ORDEN = 2
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+LIMITE_BUSQUEDA_POR_DEFECTO = 20
+
+# Operaciones en lote: máximo de cédulas por petición, filtros y campos que se pueden modificar.
+# Nombre y correo no se modifican en lote (el correo es único).
+LIMITE_LOTE = 5000
+FILTROS_LOTE = {
+    'cargo_id': Empleado.cargo_id,
+    'sexo': Empleado.sexo,
+}
+CAMPOS_LOTE = ('cargo_id', 'cargo', 'fecha_nacimiento', 'sexo', 'fecha_ingreso', 'telefono')
+
+# Tabla virtual FTS5 de búsqueda (se crea en database.crear_indice_busqueda)
+empleados_fts = table('empleados_fts', column('rowid'), column('rank'), column('empleados_fts'))
+
+# Lectura rápida para los listados: columnas con los mismos campos y en el mismo orden que
+# Empleado.to_dict(), leídas como tuplas sin crear instancias del modelo. Las fechas se leen
+# como el texto ISO (AAAA-MM-DD) que guarda SQLite, sin convertirlas a date y de vuelta.
+CAMPOS_LECTURA = ('cedula', 'nombre', 'cargo', 'cargo_id', 'cargo_nivel', 'cargo_sueldo_base',
+                  'fecha_nacimiento', 'sexo', 'fecha_ingreso', 'telefono', 'correo', 'estatus', 'revision',
+                  'version')
+COLUMNAS_LECTURA = (
+    Empleado.cedula, Empleado.nombre, func.coalesce(Cargo.nombre, Empleado.cargo), Empleado.cargo_id,
+    Cargo.nivel, Cargo.sueldo_base, type_coerce(Empleado.fecha_nacimiento, String), Empleado.sexo,
+    type_coerce(Empleado.fecha_ingreso, String), Empleado.telefono, Empleado.correo, Empleado.estatus,
+    Empleado.revision, Empleado.version,
+)
+
+def select_lectura(*adicionales):
+    """
+    Consulta de la lectura rápida (empleados con su cargo por LEFT JOIN). Las columnas
+    'adicionales' se agregan al final de cada fila, después de las de CAMPOS_LECTURA.
+    """
+    return (select(*COLUMNAS_LECTURA, *adicionales).select_from(Empleado)
+            .outerjoin(Cargo, Cargo.id == Empleado.cargo_id))
+
+def filas_a_diccionarios(filas):
+    """Convierte filas de select_lectura() en diccionarios como los de Empleado.to_dict()."""
+    campos = CAMPOS_LECTURA
+    return [dict(zip(campos, fila)) for fila in filas]
+
+def get_all_active_empleados_service(columnar=False):
+    """
+    Obtiene todos los empleados activos de la base de datos. Con 'columnar' retorna
+    {'columns': CAMPOS_LECTURA, 'rows': [...]} en lugar de una lista de diccionarios.
+    """
     try:
-        empleados = Empleado.query.filter_by(estatus=1).order_by(Empleado.nombre).all()
-        return [empleado.to_dict() for empleado in empleados]
+        filas = db.session.execute(
+            select_lectura().where(Empleado.estatus == 1).order_by(Empleado.nombre)
+        )
+        return a_columnas(CAMPOS_LECTURA, filas) if columnar else filas_a_diccionarios(filas)
     except SQLAlchemyError as e:
-        log.error(f"Error de base de datos en get_all_active_empleados_service: {e}")
+        log.error("Error de base de datos en get_all_active_empleados_service: %s", e)
         raise
 
-def add_empleado_service(data):
-    """Añade un nuevo empleado a la base de datos."""
+def parse_sort_param(sort):
+    """
+    Convierte el parámetro 'sort' ("nombre:asc,fecha_ingreso:desc") en una lista de
+    criterios (clave, dirección). Lanza ValueError si algún criterio no es válido.
+    """
+    if not sort:
+        return list(ORDEN_POR_DEFECTO)
+    criterios = []
+    for parte in sort.split(','):
+        clave, _, direccion = parte.strip().partition(':')
+        direccion = direccion or 'asc'
+        if clave not in COLUMNAS_ORDEN or direccion not in ('asc', 'desc'):
+            raise ValueError(f"Criterio de ordenamiento inválido: {parte}")
+        if clave not in [c for c, _ in criterios]:
+            criterios.append((clave, direccion))
+    if len(criterios) > MAX_CRITERIOS_ORDEN:
+        raise ValueError(f"Se permiten como máximo {MAX_CRITERIOS_ORDEN} criterios de ordenamiento")
+    return criterios
+
+def get_empleados_page_service(limit=None, cursor=None, sort=None, filter_column=None, filter_value=None,
+                               columnar=False):
+    """
+    Obtiene una página de empleados activos usando paginación por cursor.
+    El filtrado y el ordenamiento se resuelven en la base de datos; la cédula se añade
+    siempre como último criterio para que el orden sea total y el cursor no repita filas.
+    Retorna un diccionario con 'items', 'next_cursor' y 'limit' ('columns' y 'rows' en
+    lugar de 'items' con 'columnar').
+    """
+    limit = LIMITE_POR_DEFECTO if limit is None else max(1, min(int(limit), LIMITE_MAXIMO))
+    criterios = parse_sort_param(sort)
+
+    claves = []  # (campo, expresión, descendente)
+    for clave, direccion in criterios:
+        campo, expr, invertir = COLUMNAS_ORDEN[clave]
+        claves.append((campo, expr, (direccion == 'desc') != invertir))
+    if 'cedula' not in [clave for clave, _ in criterios]:
+        claves.append(('cedula', Empleado.cedula, False))
+
     try:
-        # Convertir fechas de string a objetos Date si existen
-        fecha_nacimiento = None
-        if data.get('fecha_nacimiento'):
-            fecha_nacimiento = datetime.strptime(data['fecha_nacimiento'], '%Y-%m-%d').date()
-            
-        fecha_ingreso = None
-        if data.get('fecha_ingreso'):
-            fecha_ingreso = datetime.strptime(data['fecha_ingreso'], '%Y-%m-%d').date()
-        
-        # Crear nuevo empleado
-        nuevo_empleado = Empleado(
-            cedula=data['cedula'],
-            nombre=data['nombre'],
-            cargo=data.get('cargo'),
-            fecha_nacimiento=fecha_nacimiento,
-            sexo=data.get('sexo'),
-            fecha_ingreso=fecha_ingreso,
-            telefono=data.get('telefono'),
-            correo=data.get('correo')
-        )
-        
-        # Añadir a la sesión y guardar
-        db.session.add(nuevo_empleado)
-        db.session.commit()
+        # Los valores de las claves de orden van al final de cada fila para armar el cursor
+        query = select_lectura(*[expr for _, expr, _ in claves]).where(Empleado.estatus == 1)
+
+        if filter_value:
+            if filter_column not in COLUMNAS_FILTRO:
+                raise ValueError(f"Columna de filtro inválida: {filter_column}")
+            patron = '%' + filter_value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            query = query.where(cast(COLUMNAS_FILTRO[filter_column], String).ilike(patron, escape='\\'))
+
+        # La firma liga el cursor al ordenamiento y filtro con que fue emitido
+        firma = [[campo, desc] for campo, _, desc in claves] + [filter_column if filter_value else None, filter_value or None]
+        if cursor:
+            valores = decode_cursor(cursor, firma)
+            if len(valores) != len(claves):
+                raise ValueError("Cursor inválido")
+            valores = [
+                date.fromisoformat(v) if campo in CAMPOS_FECHA and v is not None else v
+                for (campo, _, _), v in zip(claves, valores)
+            ]
+            query = query.where(keyset_predicate([(expr, desc) for _, expr, desc in claves], valores))
+
+        query = query.order_by(*[expr.desc() if desc else expr.asc() for _, expr, desc in claves])
+        filas = db.session.execute(query.limit(limit + 1)).all()
+
+        next_cursor = None
+        if len(filas) > limit:
+            valores = filas[limit - 1][len(CAMPOS_LECTURA):]
+            next_cursor = encode_cursor(firma, [v.isoformat() if isinstance(v, date) else v for v in valores])
+        if columnar:
+            return {**a_columnas(CAMPOS_LECTURA, filas[:limit]), 'next_cursor': next_cursor, 'limit': limit}
+        return {'items': filas_a_diccionarios(filas[:limit]), 'next_cursor': next_cursor, 'limit': limit}
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_empleados_page_service: %s", e)
+        raise
+
+def get_empleados_changes_service(since=-1, limit=None):
+    """Obtiene los empleados insertados, modificados o eliminados lógicamente después de la revisión 'since'."""
+    limit = LIMITE_MAXIMO if limit is None else max(1, min(int(limit), LIMITE_MAXIMO))
+    try:
+        return get_cambios(Empleado, since, limit)
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_empleados_changes_service: %s", e)
+        raise
+
+def construir_consulta_fts(q):
+    """
+    Convierte el texto del usuario en una consulta FTS5: cada palabra se busca como
+    prefijo y deben aparecer todas ("mar gonz" -> "mar"* "gonz"*). Las comillas y
+    operadores de FTS5 se descartan. Lanza ValueError si no queda ninguna palabra.
+    """
+    terminos = re.findall(r'\w+', q or '')
+    if not terminos:
+        raise ValueError("El parámetro 'q' debe contener al menos una palabra")
+    return ' '.join(f'"{termino}"*' for termino in terminos)
+
+def search_empleados_service(q, limit=None, cursor=None):
+    """
+    Busca empleados activos por nombre, correo, cargo o cédula con el índice FTS5.
+    Los resultados se ordenan por relevancia (bm25) y se paginan por cursor sobre
+    (relevancia, cédula). Retorna un diccionario con 'items', 'next_cursor' y 'limit'.
+    """
+    limit = LIMITE_BUSQUEDA_POR_DEFECTO if limit is None else max(1, min(int(limit), LIMITE_MAXIMO))
+    consulta = construir_consulta_fts(q)
+    claves = [(empleados_fts.c.rank, False), (Empleado.cedula, False)]
+    firma = ['busqueda', consulta]
+    try:
+        query = (select_lectura(empleados_fts.c.rank)
+                 .join(empleados_fts, empleados_fts.c.rowid == Empleado.cedula)
+                 .where(empleados_fts.c.empleados_fts.match(consulta), Empleado.estatus == 1))
+        if cursor:
+            valores = decode_cursor(cursor, firma)
+            if len(valores) != len(claves):
+                raise ValueError("Cursor inválido")
+            query = query.where(keyset_predicate(claves, valores))
+        filas = db.session.execute(query.order_by(empleados_fts.c.rank, Empleado.cedula).limit(limit + 1)).all()
+
+        items = filas_a_diccionarios(filas[:limit])
+        next_cursor = None
+        if len(filas) > limit:
+            ultimo = filas[limit - 1]
+            next_cursor = encode_cursor(firma, [ultimo[-1], ultimo.cedula])
+        return {'items': items, 'next_cursor': next_cursor, 'limit': limit}
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en search_empleados_service: %s", e)
+        raise
+
+def resolver_cargo(cargo_id=None, nombre=None):
+    """
+    Determina el cargo de un empleado a partir de 'cargo_id' o, si no se envía, del nombre.
+    Retorna la tupla (cargo_id, nombre del cargo). Un nombre sin cargo activo equivalente se
+    conserva como texto con cargo_id None. Lanza ValueError si el cargo_id no es válido.
+    """
+    if cargo_id not in (None, ''):
+        cargo = Cargo.query.filter_by(id=int(cargo_id), estatus=1).first()
+        if not cargo:
+            raise ValueError(f"El cargo con ID {cargo_id} no existe o está inactivo")
+        return cargo.id, cargo.nombre
+    if not nombre:
+        return None, None
+    cargo = (Cargo.query.filter(Cargo.nombre.collate('NOCASE') == nombre, Cargo.estatus == 1)
+             .order_by(Cargo.id).first())
+    return (cargo.id, cargo.nombre) if cargo else (None, nombre)
+
+def _correo(correo):
+    # Se guarda sin espacios (como en la importación): lower(correo) coincide con normalizar_correo
+    return (correo.strip() or None) if isinstance(correo, str) else correo
+
+def _add_empleado(data):
+    # Convertir fechas de string a objetos Date si existen
+    fecha_nacimiento = None
+    if data.get('fecha_nacimiento'):
+        fecha_nacimiento = datetime.strptime(data['fecha_nacimiento'], '%Y-%m-%d').date()
         
-        # Convertir a diccionario para la respuesta
-        return nuevo_empleado.to_dict()
+    fecha_ingreso = None
+    if data.get('fecha_ingreso'):
+        fecha_ingreso = datetime.strptime(data['fecha_ingreso'], '%Y-%m-%d').date()
+    
+    cargo_id, cargo_nombre = resolver_cargo(data.get('cargo_id'), data.get('cargo'))
+    
+    # Crear nuevo empleado
+    nuevo_empleado = Empleado(
+        cedula=data['cedula'],
+        nombre=data['nombre'],
+        cargo=cargo_nombre,
+        cargo_id=cargo_id,
+        fecha_nacimiento=fecha_nacimiento,
+        sexo=data.get('sexo'),
+        fecha_ingreso=fecha_ingreso,
+        telefono=data.get('telefono'),
+        correo=_correo(data.get('correo'))
+    )
+    
+    # Añadir a la sesión
+    nuevo_empleado.revision = incrementar_version('empleados')
+    registrar_cambios_resumen([(None, estado_empleado(nuevo_empleado))])
+    db.session.add(nuevo_empleado)
+    db.session.flush()  # Asigna los valores por defecto (estatus) antes de auditar el alta
+    registrar_cambio('empleados', nuevo_empleado.cedula, 'alta', None, valores_auditados('empleados', nuevo_empleado))
+    
+    # Convertir a diccionario para la respuesta
+    return nuevo_empleado.to_dict()
+
+def _validar_correo(correo, cedula=None):
+    """Lanza ValueError si el correo pertenece a otro empleado activo (según el directorio en memoria)."""
+    dueno = directorio_empleados.cedula_de_correo(correo)
+    if dueno is not None and dueno != cedula:
+        raise ValueError(f"El correo {correo} ya pertenece a la cédula {dueno}")
+
+def add_empleado_service(data):
+    """
+    Añade un nuevo empleado a la base de datos. Los duplicados con empleados activos se
+    rechazan con el directorio en memoria, sin tomar el bloqueo de escritura; la restricción
+    de unicidad de la tabla sigue cubriendo el resto (p. ej. empleados inactivos).
+    """
+    try:
+        cedula = int(data['cedula'])
+    except (TypeError, ValueError):
+        cedula = None  # La base de datos decide
+    if cedula is not None and cedula <= 0:
+        raise ValueError("La Cédula debe ser un número entero positivo")
+    try:
+        if cedula is not None and directorio_empleados.existe(cedula):
+            raise ValueError(f"Ya existe un empleado activo con la cédula {cedula}")
+        _validar_correo(data.get('correo'))
+        nuevo_empleado = ejecutar_escritura(_add_empleado, data)
+        directorio_empleados.aplicar(nuevo_empleado['cedula'], nuevo_empleado['correo'])
+        return nuevo_empleado
     except IntegrityError as e:
-        db.session.rollback()
-        log.error(f"Error de integridad en add_empleado_service: {e}")
+        log.error("Error de integridad en add_empleado_service: %s", e)
         raise ValueError("La Cédula o el Correo ya existen")
     except SQLAlchemyError as e:
-        db.session.rollback()
-        log.error(f"Error de base de datos en add_empleado_service: {e}")
+        log.error("Error de base de datos en add_empleado_service: %s", e)
         raise
 
-def update_empleado_service(cedula, data):
-    """Actualiza un empleado activo existente."""
+def _valores_actualizacion(data):
+    """Convierte los campos presentes en 'data' en los valores del UPDATE de un empleado."""
+    valores = {}
+    if 'nombre' in data:
+        valores['nombre'] = data['nombre']
+    if 'cargo_id' in data or 'cargo' in data:
+        valores['cargo_id'], valores['cargo'] = resolver_cargo(data.get('cargo_id'), data.get('cargo'))
+    if 'fecha_nacimiento' in data and data['fecha_nacimiento']:
+        valores['fecha_nacimiento'] = datetime.strptime(data['fecha_nacimiento'], '%Y-%m-%d').date()
+    if 'sexo' in data:
+        valores['sexo'] = data['sexo']
+    if 'fecha_ingreso' in data and data['fecha_ingreso']:
+        valores['fecha_ingreso'] = datetime.strptime(data['fecha_ingreso'], '%Y-%m-%d').date()
+    if 'telefono' in data:
+        valores['telefono'] = data['telefono']
+    if 'correo' in data:
+        valores['correo'] = _correo(data['correo'])
+    return valores
+
+def get_empleado_activo(cedula):
+    """Retorna el empleado activo con la cédula indicada (como Empleado.to_dict()), o None."""
+    filas = db.session.execute(select_lectura().where(Empleado.cedula == cedula, Empleado.estatus == 1))
+    return next(iter(filas_a_diccionarios(filas)), None)
+
+def _update_empleado(cedula, data, versiones):
+    valores = _valores_actualizacion(data)
+    empleados = Empleado.__table__
+    condicion = (empleados.c.cedula == cedula) & (empleados.c.estatus == 1)
+    if versiones is not None:
+        condicion &= empleados.c.version.in_(versiones)
+
+    # incrementar_version toma el bloqueo de escritura: la fila ya no puede cambiar
+    # hasta el commit, por lo que el estado anterior leído aquí es el que se reemplaza.
+    revision = incrementar_version('empleados')
+    cambia_resumen = bool(valores.keys() & set(CAMPOS_RESUMEN))
+    leidos = [campo for campo in CAMPOS_AUDITADOS['empleados'] if campo in valores or cambia_resumen and campo in CAMPOS_RESUMEN]
+    anterior = None
+    if leidos:
+        fila = db.session.execute(select(*[empleados.c[campo] for campo in leidos]).where(condicion)).first()
+        anterior = fila._asdict() if fila else None
+    resultado = db.session.execute(
+        update(empleados).where(condicion)
+        .values(**valores, revision=revision, version=empleados.c.version + 1)
+    )
+    if resultado.rowcount == 0:
+        actual = get_empleado_activo(cedula)
+        if actual is None:
+            raise SinCambios(None)  # Empleado no encontrado o inactivo
+        raise ConflictoVersion(actual)
+    if anterior is not None:
+        if cambia_resumen:
+            antes = estado_empleado(anterior)
+            registrar_cambios_resumen([(antes, {**antes, **{c: v for c, v in valores.items() if c in CAMPOS_RESUMEN}})])
+        registrar_cambio('empleados', cedula, 'modificacion', anterior, valores)
+    return get_empleado_activo(cedula)
+
+def update_empleado_service(cedula, data, versiones=None):
+    """
+    Actualiza un empleado activo existente con un único UPDATE condicional.
+    Si se indican 'versiones' (las del encabezado If-Match) sólo se aplica cuando la versión
+    de la fila es una de ellas; si no, lanza ConflictoVersion con la fila vigente.
+    Retorna None si el empleado no existe o está inactivo.
+    """
     try:
-        # Buscar empleado por cédula y estatus activo
-        empleado = Empleado.query.filter_by(cedula=cedula, estatus=1).first()
-        if not empleado:
-            return None  # Empleado no encontrado o inactivo
-        
-        # Actualizar campos si están presentes
-        if 'nombre' in data:
-            empleado.nombre = data['nombre']
-        if 'cargo' in data:
-            empleado.cargo = data['cargo']
-        if 'fecha_nacimiento' in data and data['fecha_nacimiento']:
-            empleado.fecha_nacimiento = datetime.strptime(data['fecha_nacimiento'], '%Y-%m-%d').date()
-        if 'sexo' in data:
-            empleado.sexo = data['sexo']
-        if 'fecha_ingreso' in data and data['fecha_ingreso']:
-            empleado.fecha_ingreso = datetime.strptime(data['fecha_ingreso'], '%Y-%m-%d').date()
-        if 'telefono' in data:
-            empleado.telefono = data['telefono']
-        if 'correo' in data:
-            empleado.correo = data['correo']
-        
-        # Guardar cambios
-        db.session.commit()
-        
-        return empleado.to_dict()
+        if not directorio_empleados.existe(cedula):
+            return None
+        if data.get('correo'):
+            _validar_correo(data['correo'], cedula)
+        empleado = ejecutar_escritura(_update_empleado, cedula, data, versiones)
+        if empleado is not None and 'correo' in data:
+            directorio_empleados.aplicar(cedula, empleado['correo'])
+        return empleado
     except IntegrityError as e:
-        db.session.rollback()
-        log.error(f"Error de integridad en update_empleado_service: {e}")
+        log.error("Error de integridad en update_empleado_service: %s", e)
         raise ValueError("Falló la actualización, posible Correo duplicado")
     except SQLAlchemyError as e:
-        db.session.rollback()
-        log.error(f"Error de base de datos en update_empleado_service: {e}")
+        log.error("Error de base de datos en update_empleado_service: %s", e)
         raise
 
+def _delete_empleado_logico(cedula):
+    # Buscar empleado por cédula y estatus activo
+    empleado = Empleado.query.filter_by(cedula=cedula, estatus=1).first()
+    if not empleado:
+        return False  # Empleado no encontrado o ya inactivo
+    
+    # Cambiar estatus a inactivo
+    antes = estado_empleado(empleado)
+    empleado.estatus = 0
+    empleado.version = Empleado.version + 1
+    with db.session.no_autoflush:
+        empleado.revision = incrementar_version('empleados')
+        registrar_cambios_resumen([(antes, estado_empleado(empleado))])
+    registrar_cambio('empleados', cedula, 'baja', {'estatus': 1}, {'estatus': 0})
+    return True
+
 def delete_empleado_logico_service(cedula):
     """Elimina lógicamente un empleado estableciendo estatus a 0."""
     try:
-        # Buscar empleado por cédula y estatus activo
-        empleado = Empleado.query.filter_by(cedula=cedula, estatus=1).first()
-        if not empleado:
-            return False  # Empleado no encontrado o ya inactivo
-        
-        # Cambiar estatus a inactivo
-        empleado.estatus = 0
-        db.session.commit()
-        
-        return True
+        if not directorio_empleados.existe(cedula):
+            return False
+        eliminado = ejecutar_escritura(_delete_empleado_logico, cedula)
+        if eliminado:
+            directorio_empleados.aplicar(cedula, None, activo=False)
+        return eliminado
     except SQLAlchemyError as e:
+        log.error("Error de base de datos en delete_empleado_logico_service: %s", e)
+        raise
+
+def _seleccion_lote(data):
+    """
+    Interpreta la selección de una operación en lote: una lista 'cedulas' o un 'filtro'
+    (p. ej. {"cargo_id": 3}), siempre sobre empleados activos. Retorna (predicado,
+    cédulas solicitadas o None). Lanza ValueError si la selección no es válida.
+    """
+    cedulas, filtro = data.get('cedulas'), data.get('filtro')
+    if (cedulas is None) == (filtro is None):
+        raise ValueError("Debe indicar 'cedulas' o 'filtro', pero no ambos")
+    if cedulas is not None:
+        if not isinstance(cedulas, list) or not cedulas:
+            raise ValueError("'cedulas' debe ser una lista no vacía")
+        if len(cedulas) > LIMITE_LOTE:
+            raise ValueError(f"Se permiten como máximo {LIMITE_LOTE} cédulas por lote")
+        cedulas = list(dict.fromkeys(int(cedula) for cedula in cedulas))
+        return (Empleado.estatus == 1) & Empleado.cedula.in_(cedulas), cedulas
+    if not isinstance(filtro, dict) or not filtro:
+        raise ValueError("'filtro' debe indicar al menos un campo")
+    invalidos = set(filtro) - set(FILTROS_LOTE)
+    if invalidos:
+        raise ValueError(f"Campos de filtro inválidos: {', '.join(sorted(invalidos))}")
+    predicado = Empleado.estatus == 1
+    for campo, valor in filtro.items():
+        predicado &= FILTROS_LOTE[campo] == valor
+    return predicado, None
+
+def _parse_cambios_lote(cambios):
+    """Valida y convierte los campos a modificar en lote. Lanza ValueError si no son válidos."""
+    if not isinstance(cambios, dict) or not cambios:
+        raise ValueError("'cambios' debe indicar al menos un campo")
+    invalidos = set(cambios) - set(CAMPOS_LOTE)
+    if invalidos:
+        raise ValueError(f"Campos no modificables en lote: {', '.join(sorted(invalidos))}")
+    valores = {campo: cambios[campo] for campo in ('sexo', 'telefono') if campo in cambios}
+    for campo in ('fecha_nacimiento', 'fecha_ingreso'):
+        if campo in cambios:
+            valores[campo] = datetime.strptime(cambios[campo], '%Y-%m-%d').date() if cambios[campo] else None
+    if 'cargo_id' in cambios or 'cargo' in cambios:
+        valores['cargo_id'], valores['cargo'] = resolver_cargo(cambios.get('cargo_id'), cambios.get('cargo'))
+    return valores
+
+def _aplicar_lote(data, valores, estado):
+    """
+    Aplica 'valores' a los empleados seleccionados con un único UPDATE en una transacción,
+    ajustando el resumen de reportes. Retorna el resultado por cédula.
+    """
+    predicado, solicitadas = _seleccion_lote(data)
+    try:
+        # Campos del resumen y campos modificados (para la auditoría), leídos en una sola consulta
+        campos = list(dict.fromkeys([*CAMPOS_RESUMEN, *valores]))
+        anteriores = {fila.cedula: fila._asdict() for fila in db.session.execute(
+            select(Empleado.cedula, *[getattr(Empleado, campo) for campo in campos]).where(predicado)
+        )}
+        if anteriores:
+            actualizar_con_revisiones(Empleado.__table__, Empleado.__table__.c.cedula, predicado,
+                                      {**valores, 'version': Empleado.__table__.c.version + 1},
+                                      cantidad=len(anteriores))
+            cambios_resumen = {campo: valor for campo, valor in valores.items() if campo in CAMPOS_RESUMEN}
+            registrar_cambios_resumen([(antes, {**antes, **cambios_resumen})
+                                       for antes in map(estado_empleado, anteriores.values())])
+            registrar_cambios('empleados', 'baja' if estado == 'eliminado' else 'modificacion',
+                              [(cedula, anterior, valores) for cedula, anterior in anteriores.items()])
+        db.session.commit()
+    except SQLAlchemyError:
         db.session.rollback()
-        log.error(f"Error de base de datos en delete_empleado_logico_service: {e}")
+        raise
+    if estado == 'eliminado':
+        for cedula in anteriores:
+            directorio_empleados.aplicar(cedula, None, activo=False)
+
+    if solicitadas is None:
+        resultados = [{'cedula': cedula, 'estado': estado} for cedula in sorted(anteriores)]
+    else:
+        resultados = [{'cedula': cedula, 'estado': estado if cedula in anteriores else 'no_encontrado'}
+                      for cedula in solicitadas]
+    return {
+        'afectados': len(anteriores),
+        'no_encontrados': len(resultados) - len(anteriores),
+        'resultados': resultados,
+    }
+
+def update_empleados_lote_service(data):
+    """
+    Actualiza en lote los empleados activos indicados por 'cedulas' o 'filtro' con los
+    campos de 'cambios'. Lanza ValueError si la petición no es válida.
+    """
+    try:
+        return _aplicar_lote(data, _parse_cambios_lote(data.get('cambios')), 'actualizado')
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en update_empleados_lote_service: %s", e)
+        raise
+
+def delete_empleados_lote_service(data):
+    """Elimina lógicamente en lote los empleados activos indicados por 'cedulas' o 'filtro'."""
+    try:
+        return _aplicar_lote(data, {'estatus': 0}, 'eliminado')
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en delete_empleados_lote_service: %s", e)
         raise
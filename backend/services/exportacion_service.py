@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from datetime import date
+from logger import get_logger
+from models import Empleado, Cargo
+from database import db
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+log = get_logger(__name__)
+
+MIMETYPES_EXPORTACION = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+FILAS_POR_BLOQUE = 1000  # filas leídas del cursor y enviadas al cliente en cada bloque
+
+COLUMNAS_EMPLEADO = ('cedula', 'nombre', 'cargo', 'cargo_id', 'fecha_nacimiento', 'sexo', 'fecha_ingreso', 'telefono', 'correo', 'estatus', 'revision')
+COLUMNAS_CARGO = ('id', 'nombre', 'nivel', 'sueldo_base', 'estatus', 'revision')
+
+def parse_estatus_param(estatus):
+    """Convierte el parámetro 'estatus' (1, 0 o 'todos') en el filtro a aplicar. None significa sin filtro."""
+    if estatus is None or estatus == '':
+        return 1
+    if estatus in ('todos', 'all'):
+        return None
+    if estatus in ('0', '1'):
+        return int(estatus)
+    raise ValueError("El estatus debe ser 1 (activos), 0 (inactivos) o 'todos'")
+
+def _valor(valor):
+    return valor.strftime('%Y-%m-%d') if isinstance(valor, date) else valor
+
+def _generar(modelo, columnas, orden, estatus, formato):
+    """
+    Genera el contenido de la exportación por bloques, leyendo las filas del cursor
+    de la base de datos a medida que se envían (memoria constante).
+    """
+    if formato not in MIMETYPES_EXPORTACION:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+    tabla = modelo.__table__
+    consulta = select(*[tabla.c[col] for col in columnas]).order_by(tabla.c[orden])
+    if estatus is not None:
+        consulta = consulta.where(tabla.c.estatus == estatus)
+
+    def generador():
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer) if formato == 'csv' else None
+        if escritor:
+            escritor.writerow(columnas)
+        try:
+            resultado = db.session.execute(consulta.execution_options(yield_per=FILAS_POR_BLOQUE))
+            for bloque in resultado.partitions():
+                if escritor:
+                    escritor.writerows([[_valor(v) for v in fila] for fila in bloque])
+                else:
+                    for fila in bloque:
+                        buffer.write(json.dumps(dict(zip(columnas, map(_valor, fila))), ensure_ascii=False))
+                        buffer.write('\n')
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        except SQLAlchemyError as e:
+            log.error("Error de base de datos durante la exportación de %s: %s", tabla.name, e)
+            raise
+
+    return generador()
+
+def export_empleados_service(formato='ndjson', estatus=1):
+    """Retorna un generador con la exportación de empleados en formato NDJSON o CSV."""
+    return _generar(Empleado, COLUMNAS_EMPLEADO, 'cedula', estatus, formato)
+
+def export_cargos_service(formato='ndjson', estatus=1):
+    """Retorna un generador con la exportación de cargos en formato NDJSON o CSV."""
+    return _generar(Cargo, COLUMNAS_CARGO, 'id', estatus, formato)
@@ -0,0 +1,267 @@
+import csv
+import io
+from datetime import date
+from itertools import islice
+from logger import get_logger
+from database import db
+from models import Empleado
+from services.version_service import incrementar_version
+from services.cargo_service import catalogo_cargos_activos
+from services.reporte_service import CAMPOS_RESUMEN, estado_empleado, registrar_cambios_resumen
+from services.auditoria_service import CAMPOS_AUDITADOS, registrar_cambio
+from services.directorio_service import directorio_empleados, normalizar_correo
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+log = get_logger(__name__)
+
+# Columnas reconocidas en el archivo de importación (encabezados iguales a los del modelo)
+COLUMNAS_IMPORTACION = ('cedula', 'nombre', 'cargo', 'cargo_id', 'fecha_nacimiento', 'sexo', 'fecha_ingreso', 'telefono', 'correo')
+COLUMNAS_ACTUALIZABLES = ('nombre', 'cargo', 'cargo_id', 'fecha_nacimiento', 'sexo', 'fecha_ingreso', 'telefono', 'correo', 'estatus', 'revision')
+TAMANO_LOTE_POR_DEFECTO = 2000
+TAMANO_LOTE_MAXIMO = 10000
+
+def _leer_csv(stream):
+    """Genera (número de fila, diccionario) leyendo el CSV de forma incremental."""
+    texto = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    lector = csv.DictReader(texto)
+    for numero, fila in enumerate(lector, start=2):  # la fila 1 es el encabezado
+        yield numero, fila
+
+def _leer_xlsx(stream):
+    """Genera (número de fila, diccionario) leyendo la primera hoja en modo de solo lectura (requiere openpyxl)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("La importación de archivos XLSX requiere el paquete 'openpyxl'")
+    libro = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = [str(c).strip() if c is not None else '' for c in next(filas, [])]
+        for numero, valores in enumerate(filas, start=2):
+            yield numero, dict(zip(encabezado, valores))
+    finally:
+        libro.close()
+
+class _ParserFechas:
+    """Convierte fechas 'YYYY-MM-DD' memorizando los valores ya vistos (se repiten mucho en una nómina)."""
+    __slots__ = ('_cache',)
+
+    def __init__(self):
+        self._cache = {}
+
+    def __call__(self, valor):
+        if valor is None or valor == '':
+            return None
+        if isinstance(valor, date):  # openpyxl entrega datetime/date
+            return valor if type(valor) is date else valor.date()
+        fecha = self._cache.get(valor)
+        if fecha is None:
+            # Otros tipos (p. ej. una celda numérica de XLSX) se validan como texto: la fila
+            # se reporta como error en lugar de abortar la importación
+            try:
+                fecha = date.fromisoformat(str(valor).strip()[:10])
+            except ValueError:
+                raise ValueError(f"Fecha inválida: {valor!r} (formato AAAA-MM-DD)")
+            self._cache[valor] = fecha
+        return fecha
+
+def _a_entero(valor):
+    # Las celdas numéricas de XLSX llegan como '12345678.0'
+    if valor is None:
+        return None
+    return int(float(valor)) if '.' in valor else int(valor)
+
+def _normalizar_fila(fila, parse_fecha, cargos):
+    """Convierte una fila cruda en los valores del modelo. Lanza ValueError si es inválida."""
+    def texto(clave):
+        valor = fila.get(clave)
+        if valor is None:
+            return None
+        valor = str(valor).strip()
+        return valor or None
+
+    cedula = _a_entero(texto('cedula'))
+    nombre = texto('nombre')
+    if not cedula or not nombre:
+        raise ValueError("La Cédula y el Nombre son campos obligatorios")
+    if cedula < 0:
+        raise ValueError("La Cédula debe ser un número entero positivo")
+
+    # Cargo por id o por nombre, resuelto contra el catálogo cargado una sola vez
+    cargo_id = _a_entero(texto('cargo_id'))
+    cargo = texto('cargo')
+    cargos_por_id, cargos_por_nombre = cargos
+    if cargo_id is not None:
+        if cargo_id not in cargos_por_id:
+            raise ValueError(f"El cargo con ID {cargo_id} no existe o está inactivo")
+        cargo = cargos_por_id[cargo_id]
+    elif cargo:
+        cargo_id, cargo = cargos_por_nombre.get(cargo.lower(), (None, cargo))
+    return {
+        'cedula': cedula,
+        'nombre': nombre,
+        'cargo': cargo,
+        'cargo_id': cargo_id,
+        'fecha_nacimiento': parse_fecha(fila.get('fecha_nacimiento')),
+        'sexo': texto('sexo'),
+        'fecha_ingreso': parse_fecha(fila.get('fecha_ingreso')),
+        'telefono': _a_entero(texto('telefono')),
+        'correo': texto('correo'),
+        'estatus': 1,
+    }
+
+def _upsert(registros):
+    """Inserta o actualiza (por cédula) un lote de registros con un único executemany."""
+    sentencia = sqlite_insert(Empleado.__table__)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=['cedula'],
+        set_={**{col: getattr(sentencia.excluded, col) for col in COLUMNAS_ACTUALIZABLES},
+              'version': Empleado.__table__.c.version + 1},
+    )
+    db.session.execute(sentencia, registros)
+
+def _asignar_revisiones(registros):
+    """Reserva un rango de revisiones de 'empleados' y asigna una distinta a cada registro."""
+    ultima = incrementar_version('empleados', len(registros))
+    for revision, registro in enumerate(registros, start=ultima - len(registros) + 1):
+        registro['revision'] = revision
+
+def _registrar_cambios(registros, existentes):
+    """Ajusta el resumen de reportes y registra en la auditoría el estado final de cada cédula del lote."""
+    finales = {registro['cedula']: registro for registro in registros}  # La última fila de una cédula prevalece
+    registrar_cambios_resumen([
+        (estado_empleado(existentes[cedula]) if cedula in existentes else None, estado_empleado(registro))
+        for cedula, registro in finales.items()
+    ])
+    for cedula, registro in finales.items():
+        anterior = existentes.get(cedula)
+        registrar_cambio('empleados', cedula, 'alta' if anterior is None else 'modificacion', anterior, registro)
+
+def _procesar_lote(filas, parse_fecha, cargos, correos_vistos, resumen):
+    """Valida, detecta conflictos de correo y aplica un lote en una sola transacción."""
+    registros = []
+    numeros = []
+    for numero, fila in filas:
+        try:
+            registro = _normalizar_fila(fila, parse_fecha, cargos)
+        except (ValueError, TypeError) as e:
+            resumen['errores'].append({'fila': numero, 'cedula': fila.get('cedula'), 'error': str(e)})
+            continue
+        registros.append(registro)
+        numeros.append(numero)
+
+    if not registros:
+        return
+
+    # Conflictos de correo con empleados ya registrados (otra cédula), sin distinguir
+    # mayúsculas como las altas individuales (índice único sobre lower(correo))
+    correos = list({normalizar_correo(r['correo']) for r in registros if r['correo']})
+    duenos = {}
+    if correos:
+        duenos = dict(db.session.execute(
+            select(func.lower(Empleado.correo), Empleado.cedula).where(func.lower(Empleado.correo).in_(correos))
+        ).all())
+    validos = []
+    for numero, registro in zip(numeros, registros):
+        correo = normalizar_correo(registro['correo'])
+        dueno = duenos.get(correo)
+        if dueno is not None and dueno != registro['cedula']:
+            resumen['errores'].append({'fila': numero, 'cedula': registro['cedula'],
+                                       'error': f"El correo {registro['correo']} ya pertenece a la cédula {dueno}"})
+            continue
+        # Sólo las filas que pasan todas las validaciones reservan su correo en el archivo:
+        # una fila rechazada no debe bloquear la del verdadero dueño del correo
+        if correo and correos_vistos.get(correo, registro['cedula']) != registro['cedula']:
+            resumen['errores'].append({'fila': numero, 'cedula': registro['cedula'],
+                                       'error': f"Correo duplicado en el archivo: {registro['correo']}"})
+            continue
+        if correo:
+            correos_vistos[correo] = registro['cedula']
+        validos.append((numero, registro))
+    if not validos:
+        return
+
+    cedulas = [r['cedula'] for _, r in validos]
+    # Estado previo de los existentes, para ajustar el resumen de reportes y auditar los cambios
+    campos = list(dict.fromkeys([*CAMPOS_RESUMEN, *CAMPOS_AUDITADOS['empleados']]))
+    existentes = {
+        fila.cedula: fila._asdict()
+        for fila in db.session.execute(
+            select(Empleado.cedula, *[getattr(Empleado, campo) for campo in campos])
+            .where(Empleado.cedula.in_(cedulas))
+        )
+    }
+
+    confirmados = [r for _, r in validos]
+    try:
+        _asignar_revisiones(confirmados)
+        _upsert(confirmados)
+        _registrar_cambios(confirmados, existentes)
+        db.session.commit()
+    except IntegrityError:
+        # Un conflicto no detectado (p. ej. una escritura concurrente): reintentar fila por fila
+        db.session.rollback()
+        _asignar_revisiones(confirmados)
+        aplicados = []
+        for numero, registro in validos:
+            try:
+                with db.session.begin_nested():
+                    _upsert([registro])
+                aplicados.append(registro)
+            except IntegrityError as e:
+                resumen['errores'].append({'fila': numero, 'cedula': registro['cedula'],
+                                           'error': "La Cédula o el Correo ya existen"})
+                log.debug("Fila %s rechazada en importación: %s", numero, e.orig)
+        _registrar_cambios(aplicados, existentes)
+        db.session.commit()
+        aplicadas = {registro['cedula'] for registro in aplicados}
+        for _, registro in validos:
+            correo = normalizar_correo(registro['correo'])
+            if registro['cedula'] not in aplicadas and correos_vistos.get(correo) == registro['cedula']:
+                del correos_vistos[correo]  # La fila rechazada libera su correo
+        confirmados = aplicados
+
+    for registro in confirmados:
+        directorio_empleados.aplicar(registro['cedula'], registro['correo'])
+        if registro['cedula'] in existentes:
+            resumen['actualizados'] += 1
+        else:
+            resumen['insertados'] += 1
+
+def import_empleados_service(stream, formato='csv', chunk_size=None):
+    """
+    Importa empleados desde un archivo CSV o XLSX leyendo por lotes.
+    Cada lote se inserta/actualiza por cédula en una sola transacción; las filas
+    inválidas o con correo duplicado se reportan sin abortar el resto del archivo.
+    """
+    chunk_size = TAMANO_LOTE_POR_DEFECTO if chunk_size is None else max(1, min(int(chunk_size), TAMANO_LOTE_MAXIMO))
+    if formato == 'csv':
+        filas = _leer_csv(stream)
+    elif formato == 'xlsx':
+        filas = _leer_xlsx(stream)
+    else:
+        raise ValueError(f"Formato de archivo no soportado: {formato}")
+
+    resumen = {'procesadas': 0, 'insertados': 0, 'actualizados': 0, 'errores': []}
+    parse_fecha = _ParserFechas()
+    correos_vistos = {}
+    try:
+        cargos = catalogo_cargos_activos()
+        while True:
+            lote = list(islice(filas, chunk_size))
+            if not lote:
+                break
+            resumen['procesadas'] += len(lote)
+            _procesar_lote(lote, parse_fecha, cargos, correos_vistos, resumen)
+            log.debug("Importación: %s filas procesadas", resumen['procesadas'])
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Error de base de datos en import_empleados_service: %s", e)
+        raise
+    except (csv.Error, UnicodeDecodeError) as e:
+        db.session.rollback()
+        raise ValueError(f"Archivo inválido cerca de la fila {resumen['procesadas'] + 1}: {e}")
+    resumen['errores'].sort(key=lambda error: error['fila'])
+    return resumen
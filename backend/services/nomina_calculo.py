@@ -0,0 +1,111 @@
+"""
+Cálculo de los recibos de nómina de una partición de empleados.
+
+Se ejecuta en los procesos del pool de services/nomina_service.py, por lo que sólo usa
+sqlite3 y NumPy (sin Flask ni SQLAlchemy, que el proceso no necesita cargar): abre su
+propia conexión de sólo lectura, agrega los pagos del período con NumPy y retorna arrays,
+que el proceso principal escribe en bloque.
+
+El recibo de un empleado es el sueldo base de su cargo (activo) más los créditos y menos
+los débitos del período. Los pagos de un período abierto se leen de la tabla 'pagos'; los
+de uno cerrado, de su snapshot columnar.
+"""
+import sqlite3
+import numpy as np
+from utils.columnar_utils import SnapshotReader
+
+SIN_CARGO = 0  # cargo_id de los empleados sin cargo en los resultados
+
+_conexiones = {}  # ruta de la base de datos -> conexión de este proceso
+_snapshots = SnapshotReader()
+
+def _conexion(ruta, busy_timeout_ms):
+    # Cada proceso del pool reutiliza su conexión entre particiones
+    conexion = _conexiones.get(ruta)
+    if conexion is None:
+        conexion = sqlite3.connect(f'file:{ruta}?mode=ro', uri=True, timeout=busy_timeout_ms / 1000)
+        _conexiones[ruta] = conexion
+    return conexion
+
+def predicado_particion(particion):
+    """Condición SQL sobre 'e' (empleados) que selecciona la partición, y sus parámetros."""
+    if particion['tipo'] == 'cedula':
+        condiciones, parametros = [], []
+        if particion['desde'] is not None:
+            condiciones.append('e.cedula >= ?')
+            parametros.append(particion['desde'])
+        if particion['hasta'] is not None:
+            condiciones.append('e.cedula < ?')
+            parametros.append(particion['hasta'])
+        return ' AND '.join(condiciones) or '1', parametros
+    condiciones = []
+    if particion['cargos']:
+        condiciones.append(f"e.cargo_id IN ({', '.join('?' * len(particion['cargos']))})")
+    if particion['sin_cargo']:
+        condiciones.append('e.cargo_id IS NULL')
+    return '(' + ' OR '.join(condiciones) + ')', list(particion['cargos'])
+
+def _pagos_tabla(conexion, periodo, predicado, parametros):
+    """(cédula, es débito, monto) de los pagos activos del período de los empleados de la partición."""
+    filas = conexion.execute(
+        f"SELECT p.cedula, p.tipo = 'debito', p.monto FROM pagos p "
+        f"WHERE p.periodo = ? AND p.estatus = 1 AND p.cedula IN "
+        f"(SELECT e.cedula FROM empleados e WHERE e.estatus = 1 AND {predicado})",
+        [periodo, *parametros],
+    ).fetchall()
+    pagos = np.array(filas, dtype=np.float64).reshape(-1, 3)
+    return pagos[:, 0].astype(np.int64), pagos[:, 1].astype(bool), pagos[:, 2]
+
+def _pagos_snapshot(snapshot, cedulas):
+    """Igual que _pagos_tabla, desde el snapshot de un período cerrado (ordenado por cédula)."""
+    manifiesto, columnas = _snapshots.abrir(snapshot)
+    # Sólo el tramo de cédulas de la partición
+    inicio, fin = np.searchsorted(columnas['cedula'], [cedulas[0], cedulas[-1] + 1])
+    activos = np.flatnonzero(columnas['estatus'][inicio:fin] == 1) + inicio
+    debito = manifiesto['diccionarios']['tipo'].index('debito')
+    return columnas['cedula'][activos], columnas['tipo'][activos] == debito, columnas['monto'][activos]
+
+def calcular_particion(ruta, periodo, snapshot, particion, busy_timeout_ms=30000):
+    """
+    Calcula los recibos de los empleados activos de 'particion' en 'periodo'. 'snapshot' es
+    el directorio del snapshot si el período está cerrado, o None. Retorna un diccionario
+    de arrays (cedula, cargo_id, sueldo_base, creditos, debitos, neto, pagos) ordenados
+    por cédula.
+    """
+    conexion = _conexion(ruta, busy_timeout_ms)
+    predicado, parametros = predicado_particion(particion)
+    empleados = conexion.execute(
+        f"SELECT e.cedula, COALESCE(e.cargo_id, {SIN_CARGO}), COALESCE(c.sueldo_base, 0) FROM empleados e "
+        f"LEFT JOIN cargos c ON c.id = e.cargo_id AND c.estatus = 1 "
+        f"WHERE e.estatus = 1 AND {predicado} ORDER BY e.cedula",
+        parametros,
+    ).fetchall()
+    cedulas = np.fromiter((fila[0] for fila in empleados), dtype=np.int64, count=len(empleados))
+    cargos = np.fromiter((fila[1] for fila in empleados), dtype=np.int64, count=len(empleados))
+    sueldos = np.fromiter((fila[2] for fila in empleados), dtype=np.float64, count=len(empleados))
+    creditos = np.zeros(len(cedulas))
+    debitos = np.zeros(len(cedulas))
+    cantidad = np.zeros(len(cedulas), dtype=np.int64)
+
+    if len(cedulas):
+        if snapshot is None:
+            cedulas_pago, es_debito, montos = _pagos_tabla(conexion, periodo, predicado, parametros)
+        else:
+            cedulas_pago, es_debito, montos = _pagos_snapshot(snapshot, cedulas)
+        # Posición del empleado de cada pago; se descartan los de cédulas fuera de la partición
+        posiciones = np.minimum(np.searchsorted(cedulas, cedulas_pago), len(cedulas) - 1)
+        validos = cedulas[posiciones] == cedulas_pago
+        posiciones, es_debito, montos = posiciones[validos], es_debito[validos], montos[validos]
+        creditos = np.bincount(posiciones[~es_debito], weights=montos[~es_debito], minlength=len(cedulas))
+        debitos = np.bincount(posiciones[es_debito], weights=montos[es_debito], minlength=len(cedulas))
+        cantidad = np.bincount(posiciones, minlength=len(cedulas))
+
+    return {
+        'cedula': cedulas,
+        'cargo_id': cargos,
+        'sueldo_base': sueldos,
+        'creditos': np.round(creditos, 2),
+        'debitos': np.round(debitos, 2),
+        'neto': np.round(sueldos + creditos - debitos, 2),
+        'pagos': cantidad,
+    }
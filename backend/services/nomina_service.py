@@ -0,0 +1,304 @@
+"""
+Trabajos de nómina: recibos por empleado y totales por cargo de un período, calculados en
+segundo plano con un pool de procesos.
+
+Crear un trabajo sólo registra la fila en 'trabajos_nomina' y responde; un hilo del
+proceso reparte los empleados activos en particiones (rangos de cédula con la misma
+cantidad de empleados, o grupos de cargos equilibrados) y las envía a un
+ProcessPoolExecutor. Cada proceso calcula su partición con su propia conexión de sólo
+lectura (services/nomina_calculo.py), de modo que el cálculo escala con los núcleos en
+lugar de correr en un solo hilo; el hilo coordinador escribe los recibos de cada
+partición con un único executemany y actualiza el avance del trabajo, que cualquier
+worker puede consultar porque está en la base de datos.
+
+Variables de entorno:
+  NOMINA_PROCESOS                 procesos del pool (por defecto, los núcleos disponibles)
+  NOMINA_PARTICIONES_POR_PROCESO  particiones por proceso, para equilibrar la carga (por defecto 4)
+  NOMINA_TRABAJO_EXPIRA_S         segundos sin avances tras los que un trabajo se da por
+                                  abandonado, p. ej. si se reinició su worker (por defecto 600)
+"""
+import heapq
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from logger import get_logger
+from database import db, SQLITE_BUSY_TIMEOUT_MS
+from models import Empleado, CierreNomina, TrabajoNomina, ReciboNomina, ResumenCargoNomina
+from services.nomina_calculo import calcular_particion
+from services.pago_service import SNAPSHOTS_DIR, validar_periodo
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from utils.json_utils import a_columnas
+from utils.pagination_utils import encode_cursor, decode_cursor
+
+log = get_logger(__name__)
+
+NOMINA_PROCESOS = int(os.environ.get('NOMINA_PROCESOS', os.cpu_count() or 1))
+NOMINA_PARTICIONES_POR_PROCESO = int(os.environ.get('NOMINA_PARTICIONES_POR_PROCESO', 4))
+NOMINA_TRABAJO_EXPIRA_S = int(os.environ.get('NOMINA_TRABAJO_EXPIRA_S', 600))
+
+TIPOS_PARTICION = ('cedula', 'cargo')
+ESTADOS_ACTIVOS = ('pendiente', 'en_proceso')
+PARTICIONES_MAXIMAS = 256
+LIMITE_TRABAJOS = 50
+LIMITE_RECIBOS_POR_DEFECTO = 100
+LIMITE_RECIBOS_MAXIMO = 1000
+CAMPOS_RECIBO = ('cedula', 'cargo_id', 'sueldo_base', 'creditos', 'debitos', 'neto', 'pagos')
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def _ahora():
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)  # UTC
+
+def _pool_procesos():
+    """Pool compartido del proceso (uno nuevo si este proceso se creó con fork)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # 'spawn': los procesos del pool no heredan los hilos ni las conexiones de este
+            _pool = ProcessPoolExecutor(max_workers=NOMINA_PROCESOS, mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+        return _pool
+
+def _particiones_por_cedula(cantidad):
+    """Rangos de cédula [desde, hasta) con la misma cantidad de empleados activos."""
+    grupos = (select(Empleado.cedula, func.ntile(cantidad).over(order_by=Empleado.cedula).label('grupo'))
+              .where(Empleado.estatus == 1).subquery())
+    inicios = db.session.execute(
+        select(func.min(grupos.c.cedula)).group_by(grupos.c.grupo).order_by(func.min(grupos.c.cedula))
+    ).scalars().all()
+    # El primer y el último rango quedan abiertos: cubren también las altas posteriores
+    limites = [None, *inicios[1:], None]
+    return [{'tipo': 'cedula', 'desde': desde, 'hasta': hasta} for desde, hasta in zip(limites, limites[1:])]
+
+def _particiones_por_cargo(cantidad):
+    """Grupos de cargos con cantidades de empleados activos parecidas (el cargo más grande primero)."""
+    conteos = db.session.execute(
+        select(Empleado.cargo_id, func.count()).where(Empleado.estatus == 1)
+        .group_by(Empleado.cargo_id).order_by(func.count().desc())
+    ).all()
+    grupos = [(0, indice, []) for indice in range(min(cantidad, len(conteos)))]
+    for cargo_id, empleados in conteos:
+        total, indice, cargos = heapq.heappop(grupos)
+        cargos.append(cargo_id)
+        heapq.heappush(grupos, (total + empleados, indice, cargos))
+    return [{'tipo': 'cargo', 'cargos': [c for c in cargos if c is not None], 'sin_cargo': None in cargos}
+            for _, _, cargos in sorted(grupos, key=lambda grupo: grupo[1])]
+
+def _abandonado(trabajo):
+    """Marca como fallido un trabajo activo sin avances desde hace NOMINA_TRABAJO_EXPIRA_S."""
+    ultimo = trabajo.actualizado_en or trabajo.creado_en
+    if trabajo.estado not in ESTADOS_ACTIVOS or _ahora() - ultimo < timedelta(seconds=NOMINA_TRABAJO_EXPIRA_S):
+        return False
+    trabajo.estado = 'fallido'
+    trabajo.error = f"Trabajo abandonado: sin avances desde {ultimo:%Y-%m-%dT%H:%M:%SZ}"
+    trabajo.terminado_en = _ahora()
+    return True
+
+def validar_trabajo(data):
+    """
+    Valida los datos de un trabajo de nómina: 'periodo' (AAAA-MM), 'particion' ('cedula'
+    por defecto, o 'cargo') y 'particiones' (opcional). Retorna (periodo, particion,
+    particiones) o lanza ValueError.
+    """
+    periodo = validar_periodo(data.get('periodo'))
+    particion = data.get('particion') or 'cedula'
+    if particion not in TIPOS_PARTICION:
+        raise ValueError(f"Partición inválida: {particion} (use {' o '.join(TIPOS_PARTICION)})")
+    particiones = data.get('particiones')
+    if particiones is not None:
+        if not isinstance(particiones, int) or not 1 <= particiones <= PARTICIONES_MAXIMAS:
+            raise ValueError(f"'particiones' debe ser un entero entre 1 y {PARTICIONES_MAXIMAS}")
+    return periodo, particion, particiones
+
+def registrar_trabajo_service(data):
+    """
+    Registra un trabajo de nómina pendiente (ver validar_trabajo) sin iniciarlo y lo
+    retorna. Lanza ValueError si los datos no son válidos o el período ya tiene un
+    trabajo en curso.
+    """
+    periodo, particion, particiones = validar_trabajo(data)
+    try:
+        activos = TrabajoNomina.query.filter(TrabajoNomina.periodo == periodo,
+                                             TrabajoNomina.estado.in_(ESTADOS_ACTIVOS)).all()
+        if [trabajo for trabajo in activos if not _abandonado(trabajo)]:
+            db.session.commit()
+            raise ValueError(f"El período {periodo} ya tiene un trabajo de nómina en curso")
+        trabajo = TrabajoNomina(id=uuid.uuid4().hex, periodo=periodo, estado='pendiente', particion=particion,
+                                particiones=particiones or 0, creado_en=_ahora())
+        db.session.add(trabajo)
+        db.session.commit()
+        log.info("Trabajo de nómina %s registrado para el período %s (partición por %s)", trabajo.id, periodo, particion)
+        return trabajo.to_dict()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Error de base de datos en registrar_trabajo_service: %s", e)
+        raise
+
+def crear_trabajo_service(data):
+    """
+    Registra un trabajo de nómina y lo inicia en un hilo de segundo plano; retorna el
+    trabajo sin esperar el cálculo. Lanza ValueError como registrar_trabajo_service.
+    """
+    trabajo = registrar_trabajo_service(data)
+    app = current_app._get_current_object()
+    threading.Thread(target=_ejecutar_en_segundo_plano, args=(app, trabajo['id']),
+                     name=f"nomina-{trabajo['id'][:8]}", daemon=True).start()
+    return trabajo
+
+def _ejecutar_en_segundo_plano(app, trabajo_id):
+    with app.app_context():
+        try:
+            ejecutar_trabajo(trabajo_id)
+        except Exception as e:  # El error ya quedó registrado en el trabajo
+            log.error("Trabajo de nómina %s fallido: %s", trabajo_id, e)
+        finally:
+            db.session.remove()
+
+def _escribir_recibos(trabajo_id, recibos):
+    """Inserta los recibos de una partición con un único executemany."""
+    columnas = [recibos[campo].tolist() for campo in CAMPOS_RECIBO]
+    filas = [dict(zip(CAMPOS_RECIBO, valores), trabajo_id=trabajo_id) for valores in zip(*columnas)]
+    if filas:
+        db.session.execute(insert(ReciboNomina.__table__), filas)
+    return len(filas)
+
+def ejecutar_trabajo(trabajo_id, procesos=None):
+    """
+    Calcula un trabajo de nómina pendiente (normalmente en el hilo que inicia
+    crear_trabajo_service; la línea de comandos y los benchmarks lo llaman directamente).
+    Con 'procesos' usa un pool propio de ese tamaño en lugar del compartido.
+    """
+    trabajo = db.session.get(TrabajoNomina, trabajo_id)
+    if trabajo is None or trabajo.estado != 'pendiente':
+        raise ValueError(f"El trabajo {trabajo_id} no existe o ya se ejecutó")
+    pool = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) \
+        if procesos else _pool_procesos()
+    futuros = []
+    try:
+        trabajo.estado, trabajo.iniciado_en = 'en_proceso', _ahora()
+        trabajo.actualizado_en = trabajo.iniciado_en
+        cantidad = trabajo.particiones or (procesos or NOMINA_PROCESOS) * NOMINA_PARTICIONES_POR_PROCESO
+        trabajo.empleados = db.session.execute(
+            select(func.count()).select_from(Empleado).where(Empleado.estatus == 1)
+        ).scalar_one()
+        cantidad = max(1, min(cantidad, trabajo.empleados))
+        particiones = (_particiones_por_cedula if trabajo.particion == 'cedula' else _particiones_por_cargo)(cantidad)
+        trabajo.particiones = len(particiones)
+        cierre = db.session.get(CierreNomina, trabajo.periodo)
+        snapshot = os.path.join(SNAPSHOTS_DIR, cierre.archivo) if cierre is not None else None
+        db.session.commit()
+
+        ruta = db.engine.url.database
+        futuros = [pool.submit(calcular_particion, ruta, trabajo.periodo, snapshot, particion, SQLITE_BUSY_TIMEOUT_MS)
+                   for particion in particiones]
+        for futuro in as_completed(futuros):
+            recibos = futuro.result()
+            trabajo.recibos += _escribir_recibos(trabajo_id, recibos)
+            trabajo.sueldos += float(recibos['sueldo_base'].sum())
+            trabajo.creditos += float(recibos['creditos'].sum())
+            trabajo.debitos += float(recibos['debitos'].sum())
+            trabajo.particiones_completadas += 1
+            trabajo.actualizado_en = _ahora()
+            db.session.commit()  # Cada partición confirmada hace visible el avance
+
+        recibos = ReciboNomina.__table__.c
+        db.session.execute(insert(ResumenCargoNomina.__table__).from_select(
+            ['trabajo_id', 'cargo_id', 'empleados', 'sueldos', 'creditos', 'debitos', 'neto'],
+            select(recibos.trabajo_id, recibos.cargo_id, func.count(), func.sum(recibos.sueldo_base),
+                   func.sum(recibos.creditos), func.sum(recibos.debitos), func.sum(recibos.neto))
+            .where(recibos.trabajo_id == trabajo_id).group_by(recibos.cargo_id)
+        ))
+        trabajo.estado, trabajo.terminado_en = 'completado', _ahora()
+        db.session.commit()
+        log.info("Trabajo de nómina %s completado: %s recibos en %s particiones (%.1f s)", trabajo_id,
+                 trabajo.recibos, trabajo.particiones, (trabajo.terminado_en - trabajo.iniciado_en).total_seconds())
+        return trabajo.to_dict()
+    except Exception as e:
+        for futuro in futuros:
+            futuro.cancel()
+        db.session.rollback()
+        # Los recibos ya confirmados se conservan; el trabajo queda fallido
+        db.session.execute(
+            update(TrabajoNomina).where(TrabajoNomina.id == trabajo_id)
+            .values(estado='fallido', error=str(e)[:1000], terminado_en=_ahora())
+        )
+        db.session.commit()
+        raise
+    finally:
+        if procesos:
+            pool.shutdown(cancel_futures=True)
+
+def get_trabajo_service(trabajo_id):
+    """Retorna el estado y el avance de un trabajo de nómina, o None si no existe."""
+    try:
+        trabajo = db.session.get(TrabajoNomina, trabajo_id)
+        if trabajo is None:
+            return None
+        if _abandonado(trabajo):
+            db.session.commit()
+        return trabajo.to_dict()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Error de base de datos en get_trabajo_service(%s): %s", trabajo_id, e)
+        raise
+
+def get_trabajos_service(periodo=None):
+    """Retorna los trabajos de nómina más recientes, opcionalmente de un período."""
+    try:
+        query = TrabajoNomina.query
+        if periodo is not None:
+            query = query.filter(TrabajoNomina.periodo == validar_periodo(periodo))
+        trabajos = query.order_by(TrabajoNomina.creado_en.desc()).limit(LIMITE_TRABAJOS).all()
+        return [trabajo.to_dict() for trabajo in trabajos]
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_trabajos_service: %s", e)
+        raise
+
+def get_recibos_service(trabajo_id, cargo_id=None, limit=None, cursor=None, columnar=False):
+    """
+    Retorna una página de los recibos de un trabajo (por cédula), opcionalmente de un
+    cargo (0 = sin cargo), con paginación por cursor: {'items', 'next_cursor', 'limit'}
+    ('columns' y 'rows' en lugar de 'items' con 'columnar'). Retorna None si el trabajo no existe.
+    """
+    limit = LIMITE_RECIBOS_POR_DEFECTO if limit is None else max(1, min(int(limit), LIMITE_RECIBOS_MAXIMO))
+    try:
+        if db.session.get(TrabajoNomina, trabajo_id) is None:
+            return None
+        recibos = ReciboNomina.__table__.c
+        query = select(*[recibos[campo] for campo in CAMPOS_RECIBO]).where(recibos.trabajo_id == trabajo_id)
+        if cargo_id is not None:
+            query = query.where(recibos.cargo_id == cargo_id)
+        firma = ['recibos', trabajo_id, cargo_id]
+        if cursor:
+            valores = decode_cursor(cursor, firma)
+            if len(valores) != 1:
+                raise ValueError("Cursor inválido")
+            query = query.where(recibos.cedula > valores[0])
+        filas = db.session.execute(query.order_by(recibos.cedula).limit(limit + 1)).all()
+
+        next_cursor = encode_cursor(firma, [filas[limit - 1].cedula]) if len(filas) > limit else None
+        if columnar:
+            return {**a_columnas(CAMPOS_RECIBO, filas[:limit]), 'next_cursor': next_cursor, 'limit': limit}
+        return {'items': [dict(zip(CAMPOS_RECIBO, fila)) for fila in filas[:limit]],
+                'next_cursor': next_cursor, 'limit': limit}
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_recibos_service(%s): %s", trabajo_id, e)
+        raise
+
+def get_resumen_cargos_service(trabajo_id):
+    """Retorna los totales por cargo de un trabajo de nómina, o None si el trabajo no existe."""
+    try:
+        if db.session.get(TrabajoNomina, trabajo_id) is None:
+            return None
+        resumen = ResumenCargoNomina.query.filter_by(trabajo_id=trabajo_id).order_by(ResumenCargoNomina.cargo_id).all()
+        return [fila.to_dict() for fila in resumen]
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_resumen_cargos_service(%s): %s", trabajo_id, e)
+        raise
@@ -0,0 +1,351 @@
+"""
+Pagos (créditos y débitos) y su libro de sólo inserción por período.
+
+Los pagos de los períodos abiertos están en la tabla 'pagos'. Al cerrar un período sus
+pagos se escriben en un snapshot columnar inmutable (un .npy por columna, ver
+utils/columnar_utils.py), ordenado por (cédula, fecha, id), y se retiran de la tabla.
+El historial lee los períodos cerrados desde los snapshots con mmap.
+"""
+import os
+import re
+import uuid
+from datetime import datetime, date, timezone
+import numpy as np
+from logger import get_logger
+from database import db, DB_PATH
+from models import Empleado, Cargo, Pago, CierreNomina
+from sqlalchemy import delete, func, insert, select, literal, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from utils.columnar_utils import SnapshotReader, escribir_snapshot
+
+log = get_logger(__name__)
+
+TIPOS_PAGO = ('credito', 'debito')
+LIMITE_PAGOS = 500
+
+# Directorio de los snapshots de períodos cerrados (por defecto junto a la base de datos)
+SNAPSHOTS_DIR = os.environ.get('SNAPSHOTS_DIR', os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), 'snapshots'))
+PATRON_PERIODO = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+SIN_VALOR = -1  # cargo_id, concepto y lote nulos en el snapshot
+
+# Columnas del snapshot de pagos: (nombre, tipo de NumPy)
+COLUMNAS_SNAPSHOT = (
+    ('id', np.int64),
+    ('cedula', np.int64),
+    ('cargo_id', np.int64),
+    ('tipo', np.int8),  # índice en TIPOS_PAGO
+    ('monto', np.float64),
+    ('concepto', np.int32),  # índice en el diccionario del manifiesto
+    ('fecha', 'datetime64[D]'),
+    ('lote', np.int32),  # índice en el diccionario del manifiesto
+    ('estatus', np.int8),
+)
+COLUMNAS_DICCIONARIO = ('concepto', 'lote')
+
+snapshots = SnapshotReader()
+
+def validar_periodo(periodo):
+    """Valida un período 'AAAA-MM'. Lanza ValueError si no lo es."""
+    if not isinstance(periodo, str) or not PATRON_PERIODO.match(periodo):
+        raise ValueError(f"Período inválido: {periodo!r} (formato AAAA-MM)")
+    return periodo
+
+def _periodo_cerrado(periodo):
+    return db.session.get(CierreNomina, periodo) is not None
+
+def _calcular_monto(sueldo_base, data):
+    """Calcula el monto por empleado: un monto fijo o un porcentaje del sueldo base (100% por defecto)."""
+    if data.get('monto') is not None:
+        monto = float(data['monto'])
+    else:
+        porcentaje = float(data.get('porcentaje', 100))
+        monto = sueldo_base * porcentaje / 100
+    if monto <= 0:
+        raise ValueError("El monto del pago debe ser mayor que cero")
+    return round(monto, 2)
+
+def aplicar_pago_por_cargo_service(cargo_id, data):
+    """
+    Aplica un crédito o débito a todos los empleados activos de un cargo.
+    Se ejecuta como un único INSERT ... SELECT dentro de una transacción, sin
+    cargar los empleados en memoria. Retorna el resumen del lote o None si el
+    cargo no existe o está inactivo.
+    """
+    tipo = data.get('tipo')
+    if tipo not in TIPOS_PAGO:
+        raise ValueError("El tipo de pago debe ser 'credito' o 'debito'")
+
+    try:
+        cargo = Cargo.query.filter_by(id=cargo_id, estatus=1).first()
+        if not cargo:
+            return None  # Cargo no encontrado o inactivo
+
+        monto = _calcular_monto(cargo.sueldo_base, data)
+        fecha = date.today()
+        if data.get('fecha'):
+            fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
+        periodo = fecha.strftime('%Y-%m')
+        if _periodo_cerrado(periodo):
+            raise ValueError(f"El período {periodo} está cerrado; no admite nuevos pagos")
+        lote = uuid.uuid4().hex
+
+        seleccion = select(
+            Empleado.cedula,
+            literal(cargo.id),
+            literal(tipo),
+            literal(monto),
+            literal(data.get('concepto')),
+            literal(fecha, Pago.fecha.type),
+            literal(periodo),
+            literal(lote),
+            literal(1),
+        ).where(
+            Empleado.estatus == 1,
+            Empleado.cargo_id == cargo.id,
+        )
+        resultado = db.session.execute(
+            insert(Pago).from_select(
+                ['cedula', 'cargo_id', 'tipo', 'monto', 'concepto', 'fecha', 'periodo', 'lote', 'estatus'],
+                seleccion,
+            )
+        )
+        db.session.commit()
+
+        empleados_afectados = resultado.rowcount
+        log.info("Lote %s: %s de %s aplicado a %s empleados del cargo %s", lote, tipo, monto, empleados_afectados, cargo.id)
+        return {
+            'lote': lote,
+            'cargo_id': cargo.id,
+            'tipo': tipo,
+            'monto': monto,
+            'fecha': fecha.strftime('%Y-%m-%d'),
+            'periodo': periodo,
+            'empleados_afectados': empleados_afectados,
+            'total': round(monto * empleados_afectados, 2),
+        }
+    except IntegrityError as e:
+        # El trigger del libro rechaza los pagos de un período cerrado mientras tanto
+        db.session.rollback()
+        log.warning("Pago rechazado en aplicar_pago_por_cargo_service: %s", e.orig)
+        raise ValueError(f"El período {periodo} está cerrado; no admite nuevos pagos")
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Error de base de datos en aplicar_pago_por_cargo_service: %s", e)
+        raise
+
+def _ruta_snapshot(archivo):
+    return os.path.join(SNAPSHOTS_DIR, archivo)
+
+def _indices_snapshot(columnas, manifiesto, cedula=None, cargo_id=None, lote=None):
+    """Posiciones de los pagos activos del snapshot que cumplen los filtros."""
+    if cedula is not None:
+        # Las filas están ordenadas por cédula: los pagos de un empleado son un tramo contiguo
+        inicio, fin = np.searchsorted(columnas['cedula'], [cedula, cedula + 1])
+        indices = np.arange(inicio, fin)
+    else:
+        indices = np.arange(manifiesto['filas'])
+    mascara = columnas['estatus'][indices] == 1
+    if cargo_id is not None:
+        mascara &= columnas['cargo_id'][indices] == cargo_id
+    if lote:
+        lotes = manifiesto['diccionarios']['lote']
+        if lote not in lotes:
+            return indices[:0]
+        mascara &= columnas['lote'][indices] == lotes.index(lote)
+    return indices[mascara]
+
+def _pagos_snapshot(cierre, cedula=None, cargo_id=None, lote=None, limit=LIMITE_PAGOS):
+    """Pagos de un período cerrado, leídos de su snapshot, en el formato de Pago.to_dict()."""
+    manifiesto, columnas = snapshots.abrir(_ruta_snapshot(cierre.archivo))
+    indices = _indices_snapshot(columnas, manifiesto, cedula, cargo_id, lote)
+    # Más recientes primero: fecha descendente y, a igual fecha, id descendente
+    orden = np.lexsort((columnas['id'][indices], columnas['fecha'][indices]))[::-1][:limit]
+    indices = indices[orden]
+    conceptos, lotes = manifiesto['diccionarios']['concepto'], manifiesto['diccionarios']['lote']
+    return [
+        {
+            'id': id,
+            'cedula': cedula_pago,
+            'cargo_id': None if cargo == SIN_VALOR else cargo,
+            'tipo': TIPOS_PAGO[tipo],
+            'monto': monto,
+            'concepto': None if concepto == SIN_VALOR else conceptos[concepto],
+            'fecha': fecha,
+            'periodo': cierre.periodo,
+            'lote': None if codigo_lote == SIN_VALOR else lotes[codigo_lote],
+            'estatus': estatus,
+        }
+        for id, cedula_pago, cargo, tipo, monto, concepto, fecha, codigo_lote, estatus in zip(
+            *[columnas[nombre][indices].tolist() for nombre in ('id', 'cedula', 'cargo_id', 'tipo', 'monto', 'concepto')],
+            np.datetime_as_string(columnas['fecha'][indices]).tolist(),
+            *[columnas[nombre][indices].tolist() for nombre in ('lote', 'estatus')],
+        )
+    ]
+
+def get_pagos_service(cedula=None, cargo_id=None, lote=None, limit=None, periodo=None):
+    """
+    Obtiene los pagos activos más recientes, opcionalmente filtrados por empleado, cargo,
+    lote o período. Los de un período cerrado se leen de su snapshot.
+    """
+    limit = LIMITE_PAGOS if limit is None else max(1, min(int(limit), LIMITE_PAGOS))
+    try:
+        if periodo is not None:
+            cierre = db.session.get(CierreNomina, validar_periodo(periodo))
+            if cierre is not None:
+                return _pagos_snapshot(cierre, cedula, cargo_id, lote, limit)
+        query = Pago.query.filter_by(estatus=1)
+        if cedula is not None:
+            query = query.filter_by(cedula=cedula)
+        if cargo_id is not None:
+            query = query.filter_by(cargo_id=cargo_id)
+        if lote:
+            query = query.filter_by(lote=lote)
+        if periodo is not None:
+            query = query.filter_by(periodo=periodo)
+        pagos = query.order_by(Pago.fecha.desc(), Pago.id.desc()).limit(limit).all()
+        return [pago.to_dict() for pago in pagos]
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_pagos_service: %s", e)
+        raise
+
+def _codificar(valores):
+    """Codifica textos repetidos como índices en un diccionario (None -> SIN_VALOR)."""
+    diccionario = {}
+    codigos = np.fromiter(
+        (SIN_VALOR if valor is None else diccionario.setdefault(valor, len(diccionario)) for valor in valores),
+        dtype=np.int32, count=len(valores),
+    )
+    return codigos, list(diccionario)
+
+def _columnas_snapshot(filas):
+    """
+    Convierte las filas de pagos (en el orden de COLUMNAS_SNAPSHOT) en arrays de NumPy
+    ordenados por (cédula, fecha, id). Retorna (columnas, diccionarios).
+    """
+    valores = dict(zip([nombre for nombre, _ in COLUMNAS_SNAPSHOT], zip(*filas))) if filas else {}
+    columnas, diccionarios = {}, {}
+    indice_tipo = {tipo: indice for indice, tipo in enumerate(TIPOS_PAGO)}
+    for nombre, tipo in COLUMNAS_SNAPSHOT:
+        datos = valores.get(nombre, ())
+        if nombre in COLUMNAS_DICCIONARIO:
+            columnas[nombre], diccionarios[nombre] = _codificar(datos)
+        elif nombre == 'tipo':
+            columnas[nombre] = np.fromiter((indice_tipo[t] for t in datos), dtype=tipo, count=len(datos))
+        elif nombre == 'cargo_id':
+            columnas[nombre] = np.array([SIN_VALOR if v is None else v for v in datos], dtype=tipo)
+        else:
+            columnas[nombre] = np.array(datos, dtype=tipo)
+    # Ordenar en NumPy es más rápido que un ORDER BY de SQLite sobre todo el período
+    orden = np.lexsort((columnas['id'], columnas['fecha'], columnas['cedula']))
+    return {nombre: valores[orden] for nombre, valores in columnas.items()}, diccionarios
+
+def cerrar_periodo_service(periodo):
+    """
+    Cierra un período terminado: escribe el snapshot de sus pagos, registra el cierre con
+    sus totales y retira los pagos de la tabla, todo en una transacción. Desde entonces el
+    período no admite pagos nuevos. Lanza ValueError si el período no es válido o ya se cerró.
+    """
+    validar_periodo(periodo)
+    if periodo >= date.today().strftime('%Y-%m'):
+        raise ValueError(f"El período {periodo} aún no ha terminado")
+    try:
+        if _periodo_cerrado(periodo):
+            raise ValueError(f"El período {periodo} ya está cerrado")
+        # Registrar el cierre primero toma el bloqueo de escritura y, por el trigger del
+        # libro, impide que se registren pagos del período mientras se escribe el snapshot.
+        cierre = CierreNomina(periodo=periodo, archivo=os.path.join('pagos', periodo),
+                              cerrado_en=datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0))
+        db.session.add(cierre)
+        db.session.flush()
+
+        # Texto SQL: las fechas llegan como el texto ISO guardado, sin conversión por fila
+        filas = db.session.execute(
+            text(f"SELECT {', '.join(nombre for nombre, _ in COLUMNAS_SNAPSHOT)} FROM pagos WHERE periodo = :periodo"),
+            {'periodo': periodo},
+        ).all()
+        columnas, diccionarios = _columnas_snapshot(filas)
+        activos = columnas['estatus'] == 1
+        cierre.pagos = int(activos.sum())
+        cierre.creditos = round(float(columnas['monto'][activos & (columnas['tipo'] == 0)].sum()), 2)
+        cierre.debitos = round(float(columnas['monto'][activos & (columnas['tipo'] == 1)].sum()), 2)
+        escribir_snapshot(_ruta_snapshot(cierre.archivo), columnas, {
+            'tabla': 'pagos',
+            'periodo': periodo,
+            'orden': ['cedula', 'fecha', 'id'],
+            'diccionarios': {'tipo': list(TIPOS_PAGO), **diccionarios},
+        })
+        # Si el commit fallara, el período sigue abierto y el próximo cierre reemplaza el snapshot
+        db.session.execute(delete(Pago).where(Pago.periodo == periodo))
+        db.session.commit()
+        log.info("Período %s cerrado: %s pagos archivados en %s", periodo, cierre.pagos, cierre.archivo)
+        return cierre.to_dict()
+    except IntegrityError as e:
+        db.session.rollback()
+        log.warning("Cierre concurrente del período %s: %s", periodo, e.orig)
+        raise ValueError(f"El período {periodo} ya está cerrado")
+    except (SQLAlchemyError, OSError) as e:
+        db.session.rollback()
+        log.error("Error en cerrar_periodo_service(%s): %s", periodo, e)
+        raise
+
+def get_cierres_service():
+    """Obtiene los períodos cerrados, del más reciente al más antiguo."""
+    try:
+        return [cierre.to_dict() for cierre in CierreNomina.query.order_by(CierreNomina.periodo.desc()).all()]
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_cierres_service: %s", e)
+        raise
+
+def _totales(pagos, creditos, debitos):
+    return {'pagos': pagos, 'creditos': round(creditos, 2), 'debitos': round(debitos, 2),
+            'neto': round(creditos - debitos, 2)}
+
+def get_historial_pagos_service(cedula=None, cargo_id=None, desde=None, hasta=None):
+    """
+    Totales de pagos por período (cantidad, créditos, débitos y neto), opcionalmente de un
+    empleado o un cargo y entre los períodos 'desde' y 'hasta' (AAAA-MM, inclusive).
+    Los períodos abiertos se agregan en SQL; los cerrados, desde los totales del cierre o,
+    si hay filtros, desde el snapshot, sin leer la tabla de pagos.
+    """
+    for periodo in (desde, hasta):
+        if periodo is not None:
+            validar_periodo(periodo)
+    try:
+        historial = {}
+
+        cierres = CierreNomina.query
+        if desde:
+            cierres = cierres.filter(CierreNomina.periodo >= desde)
+        if hasta:
+            cierres = cierres.filter(CierreNomina.periodo <= hasta)
+        for cierre in cierres.all():
+            if cedula is None and cargo_id is None:
+                totales = _totales(cierre.pagos, cierre.creditos, cierre.debitos)
+            else:
+                manifiesto, columnas = snapshots.abrir(_ruta_snapshot(cierre.archivo))
+                indices = _indices_snapshot(columnas, manifiesto, cedula, cargo_id)
+                montos, tipos = columnas['monto'][indices], columnas['tipo'][indices]
+                totales = _totales(len(indices), float(montos[tipos == 0].sum()), float(montos[tipos == 1].sum()))
+            historial[cierre.periodo] = {'periodo': cierre.periodo, 'cerrado': True, **totales}
+
+        abiertos = select(Pago.periodo, Pago.tipo, func.count(), func.sum(Pago.monto)).where(Pago.estatus == 1)
+        if cedula is not None:
+            abiertos = abiertos.where(Pago.cedula == cedula)
+        if cargo_id is not None:
+            abiertos = abiertos.where(Pago.cargo_id == cargo_id)
+        if desde:
+            abiertos = abiertos.where(Pago.periodo >= desde)
+        if hasta:
+            abiertos = abiertos.where(Pago.periodo <= hasta)
+        sumas = {}
+        for periodo, tipo, cantidad, total in db.session.execute(abiertos.group_by(Pago.periodo, Pago.tipo)):
+            suma = sumas.setdefault(periodo, [0, 0.0, 0.0])
+            suma[0] += cantidad
+            suma[1 if tipo == 'credito' else 2] += total
+        for periodo, (cantidad, creditos, debitos) in sumas.items():
+            historial[periodo] = {'periodo': periodo, 'cerrado': False, **_totales(cantidad, creditos, debitos)}
+
+        return [fila for _, fila in sorted(historial.items(), reverse=True) if fila['pagos']]
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_historial_pagos_service: %s", e)
+        raise
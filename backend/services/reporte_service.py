@@ -0,0 +1,250 @@
+"""
+Resumen precalculado de empleados para los reportes del Dashboard.
+
+La tabla 'resumen_empleados' guarda, para los empleados activos, la cantidad y el costo
+(suma de sueldo_base de su cargo) por cargo, nivel, sexo, rango de edad y rango de
+antigüedad. Los servicios de escritura registran el cambio de cada empleado (estado
+anterior y nuevo) y aquí se traduce en incrementos de las filas afectadas, dentro de la
+misma transacción. El reporte se arma leyendo sólo esas filas.
+
+Los rangos de edad y antigüedad dependen de la fecha: la fila 'corte' guarda el día en que
+se calcularon y las escrituras ajustan esos rangos según ese mismo día. El reporte nunca
+escribe: si el corte es de otro día calcula esos dos rangos al vuelo (y todo el resumen si
+nunca se calculó). El cambio de día se guarda con 'flask --app app reconstruir-resumen',
+pensado para programarse a diario.
+"""
+from datetime import date
+from logger import get_logger
+from database import db
+from models import Empleado, Cargo, ResumenEmpleados
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from utils.fecha_utils import calcular_edad
+
+log = get_logger(__name__)
+
+# Campos del empleado que determinan su aporte al resumen
+CAMPOS_RESUMEN = ('estatus', 'cargo_id', 'sexo', 'fecha_nacimiento', 'fecha_ingreso')
+
+# (límite superior exclusivo en años, etiqueta); None = sin límite
+RANGOS_EDAD = [(25, '<25'), (35, '25-34'), (45, '35-44'), (55, '45-54'), (None, '55+')]
+RANGOS_ANTIGUEDAD = [(1, '<1'), (5, '1-4'), (10, '5-9'), (20, '10-19'), (None, '20+')]
+
+DIMENSIONES = ('total', 'cargo', 'nivel', 'sexo', 'edad', 'antiguedad')
+DIMENSIONES_FECHA = ('edad', 'antiguedad')
+DIMENSION_CORTE = 'corte'
+
+def _clave(valor):
+    return '' if valor is None else str(valor)
+
+def _rango(anios, rangos):
+    if anios is None:
+        return ''
+    for limite, etiqueta in rangos:
+        if limite is None or anios < limite:
+            return etiqueta
+
+def estado_empleado(empleado):
+    """Extrae de un empleado (modelo o diccionario) los campos que determinan su aporte al resumen."""
+    if isinstance(empleado, dict):
+        return {campo: empleado.get(campo) for campo in CAMPOS_RESUMEN}
+    return {campo: getattr(empleado, campo) for campo in CAMPOS_RESUMEN}
+
+def _dia_corte():
+    """Día en que se calcularon los rangos de fecha guardados; None si el resumen nunca se calculó."""
+    corte = db.session.execute(
+        select(ResumenEmpleados.clave).where(ResumenEmpleados.dimension == DIMENSION_CORTE)
+    ).scalar()
+    return date.fromisoformat(corte) if corte else None
+
+def _aportes(estado, cargos, hoy):
+    """Filas (dimensión, clave, costo) a las que suma un empleado; ninguna si no está activo."""
+    if not estado or estado['estatus'] != 1:
+        return []
+    nivel, sueldo = cargos.get(estado['cargo_id'], (None, None))
+    costo = sueldo or 0.0
+    return [
+        ('total', '', costo),
+        ('cargo', _clave(estado['cargo_id']), costo),
+        ('nivel', _clave(nivel), costo),
+        ('sexo', _clave(estado['sexo']), 0.0),
+        ('edad', _rango(calcular_edad(estado['fecha_nacimiento'], hoy), RANGOS_EDAD), 0.0),
+        ('antiguedad', _rango(calcular_edad(estado['fecha_ingreso'], hoy), RANGOS_ANTIGUEDAD), 0.0),
+    ]
+
+def _sumar(deltas, dimension, clave, empleados, costo):
+    delta = deltas.setdefault((dimension, clave), [0, 0.0])
+    delta[0] += empleados
+    delta[1] += costo
+
+def _aplicar_deltas(deltas):
+    """Suma los incrementos {(dimensión, clave): [empleados, costo]} con un único executemany."""
+    filas = [
+        {'dimension': dimension, 'clave': clave, 'empleados': empleados, 'costo': costo}
+        for (dimension, clave), (empleados, costo) in deltas.items()
+        if empleados or costo
+    ]
+    if not filas:
+        return
+    tabla = ResumenEmpleados.__table__
+    sentencia = sqlite_insert(tabla)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=['dimension', 'clave'],
+        set_={'empleados': tabla.c.empleados + sentencia.excluded.empleados,
+              'costo': tabla.c.costo + sentencia.excluded.costo},
+    )
+    db.session.execute(sentencia, filas)
+
+def registrar_cambios_resumen(cambios):
+    """
+    Ajusta el resumen con una lista de cambios (estado anterior, estado nuevo) obtenidos
+    con estado_empleado; None representa un empleado inexistente. Debe llamarse antes
+    del commit de la escritura para que ambos se confirmen juntos.
+    """
+    ids = {estado['cargo_id'] for par in cambios for estado in par if estado and estado['cargo_id'] is not None}
+    cargos = {}
+    if ids:
+        cargos = {id: (nivel, sueldo) for id, nivel, sueldo in db.session.execute(
+            select(Cargo.id, Cargo.nivel, Cargo.sueldo_base).where(Cargo.id.in_(ids))
+        )}
+    # Los rangos de fecha se ajustan al día del corte, no al de hoy, para que cuadren con las
+    # filas guardadas (las escrituras ya tienen el bloqueo: el corte no cambia hasta el commit)
+    hoy = _dia_corte() or date.today()
+    deltas = {}
+    for antes, despues in cambios:
+        for signo, estado in ((-1, antes), (1, despues)):
+            for dimension, clave, costo in _aportes(estado, cargos, hoy):
+                _sumar(deltas, dimension, clave, signo, signo * costo)
+    _aplicar_deltas(deltas)
+
+def ajustar_resumen_cargo(cargo_id, nivel_anterior, sueldo_anterior, nivel, sueldo):
+    """Traslada el costo y los empleados de un cargo cuando cambian su nivel o su sueldo base."""
+    if (nivel_anterior, sueldo_anterior) == (nivel, sueldo):
+        return
+    empleados = db.session.execute(
+        select(ResumenEmpleados.empleados).where(ResumenEmpleados.dimension == 'cargo',
+                                                 ResumenEmpleados.clave == _clave(cargo_id))
+    ).scalar()
+    if not empleados:
+        return
+    costo_anterior = empleados * float(sueldo_anterior or 0)
+    costo = empleados * float(sueldo or 0)
+    deltas = {}
+    _sumar(deltas, 'total', '', 0, costo - costo_anterior)
+    _sumar(deltas, 'cargo', _clave(cargo_id), 0, costo - costo_anterior)
+    _sumar(deltas, 'nivel', _clave(nivel_anterior), -empleados, -costo_anterior)
+    _sumar(deltas, 'nivel', _clave(nivel), empleados, costo)
+    _aplicar_deltas(deltas)
+
+def _calcular(dimensiones, hoy):
+    """Calcula desde la tabla de empleados las filas de las dimensiones indicadas."""
+    activos = Empleado.estatus == 1
+    deltas = {}
+    if 'cargo' in dimensiones:  # 'total', 'cargo' y 'nivel' salen de la misma consulta
+        for cargo_id, nivel, empleados, costo in db.session.execute(
+            select(Empleado.cargo_id, Cargo.nivel, func.count(), func.coalesce(func.sum(Cargo.sueldo_base), 0.0))
+            .select_from(Empleado).outerjoin(Cargo, Cargo.id == Empleado.cargo_id)
+            .where(activos).group_by(Empleado.cargo_id)
+        ):
+            _sumar(deltas, 'total', '', empleados, costo)
+            _sumar(deltas, 'cargo', _clave(cargo_id), empleados, costo)
+            _sumar(deltas, 'nivel', _clave(nivel), empleados, costo)
+    if 'sexo' in dimensiones:
+        for sexo, empleados in db.session.execute(
+            select(Empleado.sexo, func.count()).where(activos).group_by(Empleado.sexo)
+        ):
+            _sumar(deltas, 'sexo', _clave(sexo), empleados, 0.0)
+    # Las fechas distintas son muchas menos que los empleados: se agrupa en SQL y se clasifica aquí
+    for dimension, columna, rangos in (('edad', Empleado.fecha_nacimiento, RANGOS_EDAD),
+                                       ('antiguedad', Empleado.fecha_ingreso, RANGOS_ANTIGUEDAD)):
+        if dimension in dimensiones:
+            for fecha, empleados in db.session.execute(
+                select(columna, func.count()).where(activos).group_by(columna)
+            ):
+                _sumar(deltas, dimension, _rango(calcular_edad(fecha, hoy), rangos), empleados, 0.0)
+    return deltas
+
+def _recalcular(dimensiones, hoy):
+    # Borrar primero toma el bloqueo de escritura: ninguna otra escritura puede colarse
+    # entre el cálculo y la inserción.
+    db.session.execute(delete(ResumenEmpleados).where(
+        ResumenEmpleados.dimension.in_([*dimensiones, DIMENSION_CORTE])))
+    _aplicar_deltas(_calcular(dimensiones, hoy))
+    db.session.add(ResumenEmpleados(dimension=DIMENSION_CORTE, clave=hoy.isoformat(), empleados=0, costo=0))
+
+def reconstruir_resumen_service():
+    """Recalcula desde cero todo el resumen. Retorna la cantidad de empleados activos."""
+    try:
+        _recalcular(DIMENSIONES, date.today())
+        db.session.commit()
+        total = db.session.execute(
+            select(ResumenEmpleados.empleados).where(ResumenEmpleados.dimension == 'total')
+        ).scalar()
+        log.info("Resumen de empleados reconstruido: %s empleados activos", total or 0)
+        return total or 0
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Error de base de datos en reconstruir_resumen_service: %s", e)
+        raise
+
+def get_resumen_service():
+    """
+    Obtiene el resumen de empleados activos a partir de las filas precalculadas, sin escribir.
+    Si se calculó otro día, los rangos de edad y antigüedad se calculan al vuelo; si nunca se
+    calculó, todo el resumen (hasta que se ejecute reconstruir-resumen).
+    """
+    try:
+        hoy = date.today()
+        corte = _dia_corte()
+        if corte is None:
+            pendientes = DIMENSIONES
+        elif corte != hoy:
+            pendientes = DIMENSIONES_FECHA
+        else:
+            pendientes = ()
+        if pendientes:
+            log.debug("Resumen con corte %s: se calculan al vuelo %s", corte, ', '.join(pendientes))
+
+        filas = {}  # {dimensión: {clave: (empleados, costo)}}
+        for dimension, clave, empleados, costo in db.session.execute(
+            select(ResumenEmpleados.dimension, ResumenEmpleados.clave, ResumenEmpleados.empleados, ResumenEmpleados.costo)
+            .where(ResumenEmpleados.empleados > 0, ResumenEmpleados.dimension.not_in([*pendientes, DIMENSION_CORTE]))
+        ):
+            filas.setdefault(dimension, {})[clave] = (empleados, costo)
+        for (dimension, clave), (empleados, costo) in _calcular(pendientes, hoy).items():
+            if empleados > 0:
+                filas.setdefault(dimension, {})[clave] = (empleados, costo)
+        cargos = filas.get('cargo', {})
+        nombres = dict(db.session.execute(
+            select(Cargo.id, Cargo.nombre).where(Cargo.id.in_([int(c) for c in cargos if c]))
+        ).all()) if cargos else {}
+
+        total = filas.get('total', {}).get('')
+        def por_rango(dimension, rangos):
+            valores = filas.get(dimension, {})
+            etiquetas = [etiqueta for _, etiqueta in rangos] + ([''] if '' in valores else [])
+            return [{'rango': etiqueta or None, 'empleados': valores[etiqueta][0] if etiqueta in valores else 0}
+                    for etiqueta in etiquetas]
+
+        return {
+            'total_empleados': total[0] if total else 0,
+            'costo_total': round(total[1], 2) if total else 0.0,
+            'por_cargo': sorted(
+                [{'cargo_id': int(clave) if clave else None, 'cargo': nombres.get(int(clave)) if clave else None,
+                  'empleados': empleados, 'costo': round(costo, 2)} for clave, (empleados, costo) in cargos.items()],
+                key=lambda c: -c['empleados']),
+            'por_nivel': sorted(
+                [{'nivel': int(clave) if clave else None, 'empleados': empleados, 'costo': round(costo, 2)}
+                 for clave, (empleados, costo) in filas.get('nivel', {}).items()],
+                key=lambda n: (n['nivel'] is None, n['nivel'])),
+            'por_sexo': [{'sexo': clave or None, 'empleados': empleados}
+                         for clave, (empleados, _) in sorted(filas.get('sexo', {}).items())],
+            'por_edad': por_rango('edad', RANGOS_EDAD),
+            'por_antiguedad': por_rango('antiguedad', RANGOS_ANTIGUEDAD),
+            'fecha_corte': hoy.isoformat(),
+        }
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Error de base de datos en get_resumen_service: %s", e)
+        raise
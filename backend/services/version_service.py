@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+from logger import get_logger
+from database import db
+from models import VersionTabla
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+log = get_logger(__name__)
+
+class ConflictoVersion(Exception):
+    """
+    La fila cambió desde la versión que el cliente indicó en If-Match: la actualización
+    no se aplicó. 'actual' es la fila vigente, para que el cliente pueda resolver el conflicto.
+    """
+
+    def __init__(self, actual):
+        super().__init__(f"El registro fue modificado por otro usuario (versión actual: {actual['version']})")
+        self.actual = actual
+
+def incrementar_version(tabla, cantidad=1):
+    """
+    Incrementa el contador de cambios de una tabla dentro de la transacción en curso y
+    retorna el nuevo valor. Debe llamarse antes del commit de la escritura para que ambos
+    se confirmen juntos. Con 'cantidad' > 1 reserva un rango de revisiones consecutivas
+    (nuevo valor - cantidad + 1 ... nuevo valor) para escrituras en lote.
+    """
+    ahora = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)  # UTC
+    sentencia = sqlite_insert(VersionTabla.__table__).values(tabla=tabla, version=cantidad, actualizado=ahora)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=['tabla'],
+        set_={'version': VersionTabla.__table__.c.version + cantidad, 'actualizado': ahora},
+    )
+    db.session.execute(sentencia)
+    # La escritura anterior ya tomó el bloqueo de escritura, por lo que el valor leído es el propio
+    return db.session.execute(
+        select(VersionTabla.version).where(VersionTabla.tabla == tabla)
+    ).scalar_one()
+
+def get_version(tabla):
+    """Retorna la tupla (version, actualizado) de una tabla; (0, None) si nunca ha sido modificada."""
+    try:
+        fila = db.session.execute(
+            select(VersionTabla.version, VersionTabla.actualizado).where(VersionTabla.tabla == tabla)
+        ).first()
+        return (fila.version, fila.actualizado) if fila else (0, None)
+    except SQLAlchemyError as e:
+        log.error("Error de base de datos en get_version(%s): %s", tabla, e)
+        raise
+
+def get_cambios(modelo, since, limit):
+    """
+    Retorna las filas de 'modelo' (activas o eliminadas lógicamente) cuya revisión es mayor
+    que 'since', en orden de revisión. 'revision' en la respuesta es el valor que el cliente
+    debe enviar como 'since' en la siguiente consulta.
+    """
+    filas = modelo.query.filter(modelo.revision > since).order_by(modelo.revision).limit(limit + 1).all()
+    items = [fila.to_dict() for fila in filas[:limit]]
+    return {
+        'items': items,
+        'revision': items[-1]['revision'] if items else since,
+        'has_more': len(filas) > limit,
+    }
+
+def actualizar_con_revisiones(tabla, clave, predicado, valores, cantidad=None):
+    """
+    Aplica 'valores' con un único UPDATE basado en conjuntos a las filas de 'tabla' que
+    cumplen 'predicado', asignando a cada una una revisión nueva y distinta (se reserva un
+    rango con incrementar_version). 'clave' es la columna que ordena la numeración.
+    'cantidad' evita contar las filas si el llamador ya lo hizo. Retorna la cantidad.
+    """
+    if cantidad is None:
+        cantidad = db.session.execute(select(func.count()).select_from(tabla).where(predicado)).scalar_one()
+    if not cantidad:
+        return 0
+    ultima = incrementar_version(tabla.name, cantidad)
+    numerados = (select(clave, func.row_number().over(order_by=clave).label('n'))
+                 .where(predicado).subquery())
+    db.session.execute(
+        update(tabla).where(clave == numerados.c[clave.name])
+        .values(**valores, revision=ultima - cantidad + numerados.c.n)
+    )
+    return cantidad
@@ -0,0 +1,68 @@
+"""
+Caché en memoria con versión, TTL y tamaño máximo.
+
+Cada entrada se guarda junto con la versión de la tabla de la que proviene. Una
+lectura sólo es válida si la versión actual (leída de la base de datos, de modo que
+es la misma para todos los procesos) coincide con la guardada y no ha expirado el TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class VersionedCache:
+    """Caché LRU acotada cuyas entradas se invalidan por versión o por tiempo."""
+
+    def __init__(self, nombre, ttl=300, max_entradas=128):
+        self.nombre = nombre
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self._entradas = OrderedDict()  # clave -> (version, expira, valor)
+        self._lock = threading.Lock()
+
+    def get(self, clave, version):
+        """Retorna el valor guardado para la versión indicada, o None si no está vigente."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] == version and entrada[1] > time.monotonic():
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+                return entrada[2]
+            if entrada is not None:
+                del self._entradas[clave]
+            self.misses += 1
+            return None
+
+    def ultimo(self, clave):
+        """
+        Retorna (version, valor) de la entrada guardada aunque su versión ya no sea la
+        vigente, para actualizarla de forma incremental; (None, None) si no hay o expiró.
+        No cuenta como acierto ni como fallo.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[1] <= time.monotonic():
+                return None, None
+            return entrada[0], entrada[2]
+
+    def set(self, clave, version, valor):
+        with self._lock:
+            self._entradas[clave] = (version, time.monotonic() + self.ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidate(self):
+        """Descarta todas las entradas (las escrituras de este proceso lo llaman tras el commit)."""
+        with self._lock:
+            self._entradas.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'nombre': self.nombre,
+                'entradas': len(self._entradas),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,79 @@
+"""
+Snapshots columnares inmutables con arrays de NumPy.
+
+Un snapshot es un directorio con un archivo .npy por columna y un 'manifiesto.json' con
+sus metadatos. Se escribe en un directorio temporal que se renombra al terminar, de modo
+que un lector nunca ve un snapshot a medias. Las columnas se abren con mmap: sólo se leen
+del disco las páginas que se usan y los procesos comparten la caché del sistema operativo.
+"""
+import json
+import os
+import shutil
+import threading
+import uuid
+import numpy as np
+
+MANIFIESTO = 'manifiesto.json'
+
+def _escribir(ruta, escribir):
+    with open(ruta, 'wb') as archivo:
+        escribir(archivo)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+
+def escribir_snapshot(directorio, columnas, metadatos):
+    """
+    Escribe las 'columnas' ({nombre: array de NumPy}, todas del mismo largo) y los
+    'metadatos' (serializables a JSON) en 'directorio', reemplazándolo si ya existe.
+    """
+    largos = {len(valores) for valores in columnas.values()}
+    if len(largos) > 1:
+        raise ValueError("Todas las columnas del snapshot deben tener el mismo largo")
+    temporal = f'{directorio}.tmp-{uuid.uuid4().hex}'
+    os.makedirs(temporal)
+    try:
+        for nombre, valores in columnas.items():
+            _escribir(os.path.join(temporal, f'{nombre}.npy'),
+                      lambda archivo, v=valores: np.save(archivo, np.ascontiguousarray(v), allow_pickle=False))
+        manifiesto = {
+            **metadatos,
+            'filas': largos.pop() if largos else 0,
+            'columnas': {nombre: valores.dtype.str for nombre, valores in columnas.items()},
+        }
+        _escribir(os.path.join(temporal, MANIFIESTO),
+                  lambda archivo: archivo.write(json.dumps(manifiesto, ensure_ascii=False).encode('utf-8')))
+        if os.path.exists(directorio):
+            shutil.rmtree(directorio)
+        os.rename(temporal, directorio)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+class SnapshotReader:
+    """
+    Abre snapshots (manifiesto y columnas con mmap) y los conserva abiertos: como son
+    inmutables, una vez abierto un snapshot no hay que volver a validarlo.
+    """
+
+    def __init__(self, max_abiertos=64):
+        self.max_abiertos = max_abiertos
+        self._abiertos = {}  # directorio -> (manifiesto, columnas)
+        self._lock = threading.Lock()
+
+    def abrir(self, directorio):
+        """Retorna (manifiesto, {nombre: array en modo mmap de sólo lectura})."""
+        with self._lock:
+            snapshot = self._abiertos.get(directorio)
+        if snapshot is not None:
+            return snapshot
+        with open(os.path.join(directorio, MANIFIESTO), encoding='utf-8') as archivo:
+            manifiesto = json.load(archivo)
+        columnas = {
+            nombre: np.load(os.path.join(directorio, f'{nombre}.npy'), mmap_mode='r', allow_pickle=False)
+            for nombre in manifiesto['columnas']
+        }
+        with self._lock:
+            if len(self._abiertos) >= self.max_abiertos:
+                self._abiertos.pop(next(iter(self._abiertos)))
+            self._abiertos[directorio] = (manifiesto, columnas)
+        return manifiesto, columnas
@@ -0,0 +1,14 @@
+"""
+Utilidades de fechas compartidas por los servicios.
+"""
+from datetime import date
+
+def calcular_edad(fecha, hoy=None):
+    """Años cumplidos desde 'fecha' hasta 'hoy' (por defecto la fecha actual); None si no hay fecha."""
+    if not fecha:
+        return None
+    hoy = hoy or date.today()
+    edad = hoy.year - fecha.year
+    if (hoy.month, hoy.day) < (fecha.month, fecha.day):
+        edad -= 1
+    return edad
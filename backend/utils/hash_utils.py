@@ -0,0 +1,160 @@
+"""
+Tabla hash compacta de enteros sobre arrays de NumPy.
+
+Un dict de Python con un millón de enteros ocupa del orden de 100 MB (cada clave y cada
+valor es un objeto aparte); esta tabla guarda claves y valores en dos arrays int64 con
+direccionamiento abierto y sondeo lineal: 16 bytes por posición, con una carga máxima
+de 0.7. Las claves deben ser enteros positivos (0 marca una posición libre y -1 una
+borrada); buscar una clave que no lo es retorna "ausente". Las operaciones no son seguras entre hilos: el llamador debe sincronizarlas.
+"""
+import numpy as np
+
+LIBRE = 0
+BORRADA = -1
+CARGA_MAXIMA = 0.7
+_MULTIPLICADOR = 0x9E3779B97F4A7C15  # Hash de Fibonacci: 2**64 / razón áurea
+_MASCARA_64 = (1 << 64) - 1
+
+def _bits_para(cantidad):
+    """Bits de la capacidad (potencia de 2) necesaria para 'cantidad' claves."""
+    return max(4, int(cantidad / CARGA_MAXIMA).bit_length())
+
+class TablaHashEnteros:
+    """Diccionario de enteros positivos a enteros (int64) con memoria acotada y búsquedas O(1)."""
+    __slots__ = ('_claves', '_valores', '_bits', '_usadas', 'tamano')
+
+    def __init__(self, capacidad=0):
+        self._reservar(_bits_para(capacidad))
+
+    def _reservar(self, bits):
+        self._bits = bits
+        self._claves = np.zeros(1 << bits, dtype=np.int64)
+        self._valores = np.zeros(1 << bits, dtype=np.int64)
+        self._usadas = 0  # Posiciones ocupadas o borradas (las borradas alargan los sondeos)
+        self.tamano = 0
+
+    @classmethod
+    def desde_arrays(cls, claves, valores, capacidad=0):
+        """
+        Construye la tabla con todas las claves de una vez, con operaciones vectorizadas.
+        Si una clave se repite prevalece su último valor.
+        """
+        claves = np.asarray(claves, dtype=np.int64)
+        valores = np.asarray(valores, dtype=np.int64)
+        if claves.size and claves.min() <= 0:
+            raise ValueError("Las claves de la tabla hash deben ser enteros positivos")
+        # Última aparición de cada clave
+        invertidas = claves[::-1]
+        _, indices = np.unique(invertidas, return_index=True)
+        claves, valores = invertidas[indices], valores[::-1][indices]
+
+        tabla = cls(max(capacidad, claves.size))
+        mascara = len(tabla._claves) - 1
+        posiciones = tabla._posiciones(claves)
+        pendientes = np.arange(claves.size)
+        # Cada ronda ubica, en cada posición libre, la primera clave pendiente que la pide;
+        # las demás avanzan una posición (sondeo lineal)
+        while pendientes.size:
+            candidatas = posiciones[pendientes]
+            libres = tabla._claves[candidatas] == LIBRE
+            _, primeras = np.unique(candidatas[libres], return_index=True)
+            ubicadas = pendientes[libres][primeras]
+            tabla._claves[posiciones[ubicadas]] = claves[ubicadas]
+            tabla._valores[posiciones[ubicadas]] = valores[ubicadas]
+            restantes = np.ones(pendientes.size, dtype=bool)
+            restantes[np.flatnonzero(libres)[primeras]] = False
+            pendientes = pendientes[restantes]
+            posiciones[pendientes] = (posiciones[pendientes] + 1) & mascara
+        tabla.tamano = tabla._usadas = int(claves.size)
+        return tabla
+
+    def _posiciones(self, claves):
+        producto = claves.astype(np.uint64) * np.uint64(_MULTIPLICADOR)  # Módulo 2**64
+        return (producto >> np.uint64(64 - self._bits)).astype(np.int64)
+
+    def _posicion(self, clave):
+        return ((clave * _MULTIPLICADOR) & _MASCARA_64) >> (64 - self._bits)
+
+    def _buscar(self, clave):
+        """Índice de la posición que tiene la clave, o -1."""
+        if clave <= 0:  # No puede estar (y 0 coincidiría con las posiciones libres)
+            return -1
+        claves = self._claves
+        mascara = len(claves) - 1
+        i = self._posicion(clave)
+        while True:
+            actual = claves[i]
+            if actual == clave:
+                return i
+            if actual == LIBRE:
+                return -1
+            i = (i + 1) & mascara
+
+    def get(self, clave, defecto=None):
+        i = self._buscar(clave)
+        return defecto if i < 0 else int(self._valores[i])
+
+    def __contains__(self, clave):
+        return self._buscar(clave) >= 0
+
+    def __len__(self):
+        return self.tamano
+
+    def asignar(self, clave, valor):
+        """Agrega la clave o reemplaza su valor."""
+        if clave <= 0:
+            raise ValueError("Las claves de la tabla hash deben ser enteros positivos")
+        claves = self._claves
+        mascara = len(claves) - 1
+        i = self._posicion(clave)
+        borrada = -1
+        while True:
+            actual = claves[i]
+            if actual == clave:
+                self._valores[i] = valor
+                return
+            if actual == LIBRE:
+                break
+            if actual == BORRADA and borrada < 0:
+                borrada = i
+            i = (i + 1) & mascara
+        if borrada >= 0:
+            i = borrada  # Reutiliza la primera posición borrada del sondeo
+        else:
+            self._usadas += 1
+        claves[i] = clave
+        self._valores[i] = valor
+        self.tamano += 1
+        if self._usadas > CARGA_MAXIMA * len(claves):
+            self._redimensionar()
+
+    def eliminar(self, clave):
+        """Quita la clave y retorna su valor (None si no estaba)."""
+        i = self._buscar(clave)
+        if i < 0:
+            return None
+        valor = int(self._valores[i])
+        self._claves[i] = BORRADA
+        self.tamano -= 1
+        return valor
+
+    def _redimensionar(self):
+        # Reconstruye sin las posiciones borradas, con espacio para el doble de las claves vigentes
+        claves, valores = self.items()
+        nueva = TablaHashEnteros.desde_arrays(claves, valores, capacidad=2 * claves.size)
+        for atributo in self.__slots__:
+            setattr(self, atributo, getattr(nueva, atributo))
+
+    def claves(self):
+        """Array con las claves vigentes (sin orden)."""
+        return self._claves[self._claves > 0]
+
+    def items(self):
+        """Arrays (claves, valores) de las entradas vigentes."""
+        ocupadas = self._claves > 0
+        return self._claves[ocupadas], self._valores[ocupadas]
+
+    @property
+    def bytes(self):
+        """Memoria ocupada por los arrays."""
+        return self._claves.nbytes + self._valores.nbytes
@@ -0,0 +1,71 @@
+"""
+Utilidades HTTP para GET condicionales (ETag / Last-Modified), actualizaciones condicionales
+(If-Match) y el formato de los listados.
+
+El ETag de un listado se deriva del contador de cambios de la tabla (ver services/version_service.py)
+y de los parámetros de la consulta, de modo que un 304 se decide sin leer las filas.
+El ETag de una fila es su columna 'version'.
+"""
+import hashlib
+from flask import request, make_response
+
+def build_etag(tabla, version, variante=b''):
+    """ETag fuerte: tabla, versión y un resumen de la variante (query string) de la respuesta."""
+    etag = f'{tabla}-{version}'
+    if variante:
+        etag += '-' + hashlib.sha1(variante).hexdigest()[:12]
+    return etag
+
+def conditional_get(tabla, version, actualizado, construir):
+    """
+    Responde 304 si el cliente ya tiene la versión vigente; si no, llama a 'construir'
+    (que retorna una respuesta Flask o una tupla (cuerpo, estado)) y añade los encabezados.
+    'actualizado' es la fecha UTC de la última modificación de la tabla, o None.
+    """
+    etag = build_etag(tabla, version, request.query_string)
+
+    if request.if_none_match:
+        # Comparación débil (RFC 9110): una respuesta comprimida lleva el mismo ETag marcado como débil
+        no_modificado = request.if_none_match.contains_weak(etag)
+    else:
+        no_modificado = bool(actualizado and request.if_modified_since
+                             and actualizado <= request.if_modified_since.replace(tzinfo=None))
+
+    respuesta = make_response('', 304) if no_modificado else make_response(construir())
+    if respuesta.status_code in (200, 304):
+        respuesta.set_etag(etag)
+        if actualizado:
+            respuesta.last_modified = actualizado
+        # Permitir que el cliente guarde la respuesta pero la revalide siempre
+        respuesta.headers['Cache-Control'] = 'no-cache'
+    return respuesta
+
+def etag_fila(version):
+    """ETag de una fila: su versión (la que el cliente debe enviar en If-Match)."""
+    return str(version)
+
+def versiones_if_match():
+    """
+    Retorna las versiones aceptadas por el encabezado If-Match de la petición, o None si no
+    se envió o es '*' (se actualiza sin comprobar la versión). Lanza ValueError si alguna
+    etiqueta no es una versión.
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    try:
+        return [int(etiqueta) for etiqueta in request.if_match]
+    except ValueError:
+        raise ValueError("El encabezado If-Match debe contener la versión del registro, p. ej. \"3\"")
+
+# Formatos de los listados: 'objetos' (un diccionario por fila, por defecto) o 'columnas'
+FORMATOS_LISTADO = ('objetos', 'columnas')
+
+def formato_columnar():
+    """
+    Indica si la petición pide el listado en formato columnar (?formato=columnas).
+    Lanza ValueError si el formato no es válido.
+    """
+    formato = request.args.get('formato', 'objetos')
+    if formato not in FORMATOS_LISTADO:
+        raise ValueError(f"Formato inválido: {formato} (use {' o '.join(FORMATOS_LISTADO)})")
+    return formato == 'columnas'
@@ -0,0 +1,51 @@
+"""
+Serialización JSON de las respuestas.
+
+Si está instalado 'orjson' se usa para codificar (varias veces más rápido que el módulo
+json de la biblioteca estándar en listas grandes); si no, se usa el de Flask. En ambos
+casos el resultado es el mismo: las claves conservan el orden en que se construyen los
+diccionarios y las fechas, Decimal, UUID y dataclasses se convierten igual que en Flask.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+if orjson is not None:
+    OPCIONES_ORJSON = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask que codifica con orjson cuando está disponible."""
+
+    sort_keys = False
+    ensure_ascii = False
+
+    def encode(self, obj, indent=False):
+        """Codifica 'obj' directamente a bytes UTF-8 (sin pasar por str con orjson)."""
+        if orjson is None:
+            argumentos = {'indent': 2} if indent else {'separators': (',', ':')}
+            return super().dumps(obj, **argumentos).encode('utf-8')
+        opciones = OPCIONES_ORJSON | orjson.OPT_INDENT_2 if indent else OPCIONES_ORJSON
+        return orjson.dumps(obj, default=self.default, option=opciones)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.keys() - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.encode(obj, indent) + b'\n', mimetype=self.mimetype)
+
+def a_columnas(campos, filas):
+    """
+    Convierte un listado al formato columnar {"columns": [...], "rows": [[...], ...]}: los
+    nombres de los campos se envían una sola vez en lugar de repetirse en cada fila. Cada
+    fila es una secuencia con los valores de 'campos' en ese orden (los valores de más al
+    final, como las claves de un cursor, se descartan).
+    """
+    largo = len(campos)
+    return {'columns': list(campos), 'rows': [tuple(fila[:largo]) for fila in filas]}
@@ -0,0 +1,73 @@
+"""
+Utilidades para paginación por cursor (keyset pagination).
+
+En lugar de OFFSET, cada página continúa a partir de los valores de ordenamiento
+de la última fila entregada, de modo que el costo de obtener una página es el
+mismo sin importar su profundidad (el índice compuesto se recorre desde el cursor).
+"""
+import base64
+import json
+from sqlalchemy import and_, or_, false
+
+def encode_cursor(firma, valores):
+    """Codifica la firma del ordenamiento y los valores de la última fila en un cursor opaco."""
+    payload = json.dumps({'s': firma, 'v': valores}, separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, firma):
+    """
+    Decodifica un cursor generado por encode_cursor.
+    Lanza ValueError si el cursor es inválido o pertenece a otro ordenamiento.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding).decode('utf-8'))
+        valores = payload['v']
+        firma_cursor = payload['s']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Cursor inválido")
+    if firma_cursor != firma or not isinstance(valores, list):
+        raise ValueError("El cursor no corresponde al ordenamiento o filtro solicitado")
+    return valores
+
+def _igual(expr, valor):
+    return expr.is_(None) if valor is None else expr == valor
+
+def _despues(expr, descendente, valor):
+    # SQLite ordena los NULL primero en ASC y al final en DESC
+    if not descendente:
+        return expr.isnot(None) if valor is None else expr > valor
+    return false() if valor is None else or_(expr < valor, expr.is_(None))
+
+def _desde(expr, descendente, valor):
+    """Condición "en o después del valor" sobre una columna (None si incluye todas las filas)."""
+    if not descendente:
+        return None if valor is None else expr >= valor  # Los NULL van primero
+    if valor is None:
+        return expr.is_(None)  # Los NULL van al final
+    if _admite_nulos(expr):
+        return or_(expr <= valor, expr.is_(None))
+    return expr <= valor
+
+def _admite_nulos(expr):
+    columna = getattr(expr, 'left', expr)  # columna.collate(...) envuelve la columna
+    columna = getattr(columna, 'expression', columna)  # Atributo del modelo
+    return getattr(columna, 'nullable', True)
+
+def keyset_predicate(claves, valores):
+    """
+    Construye la condición "fila posterior al cursor" para un ordenamiento
+    multi-columna con direcciones mixtas.
+
+    claves: lista de tuplas (expresion, descendente) en el mismo orden del ORDER BY.
+    valores: valores de esas columnas en la última fila de la página anterior.
+    """
+    condiciones = []
+    for i, (expr, descendente) in enumerate(claves):
+        previas = [_igual(claves[j][0], valores[j]) for j in range(i)]
+        condiciones.append(and_(*previas, _despues(expr, descendente, valores[i])))
+    # La cota redundante sobre la primera columna permite a SQLite buscar el cursor en el
+    # índice; con sólo el OR recorrería el índice desde el principio en cada página
+    cota = _desde(claves[0][0], claves[0][1], valores[0])
+    return or_(*condiciones) if cota is None else and_(cota, or_(*condiciones))
+
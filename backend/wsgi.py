@@ -0,0 +1,21 @@
+"""
+Punto de entrada de producción (WSGI).
+
+    flask --app app migrar-db       # una vez, antes de iniciar o tras actualizar
+    gunicorn -c gunicorn.conf.py    # o: gunicorn wsgi:app
+
+La aplicación se crea al importar este módulo; con preload_app (gunicorn.conf.py) eso
+ocurre una sola vez en el proceso maestro y los workers la heredan al hacer fork. Al
+arrancar sólo se verifica que el esquema esté al día (DB_AUTO_MIGRATE=1 lo migra si no),
+de modo que varios workers nunca compiten por crear tablas. El directorio en memoria de
+empleados también se construye aquí, una vez, y los workers heredan sus arrays.
+"""
+import os
+import database
+from app import create_app
+from services.directorio_service import directorio_empleados
+
+app = create_app()
+database.verificar_esquema(app, migrar_si_falta=os.environ.get('DB_AUTO_MIGRATE', '0') == '1')
+with app.app_context():
+    directorio_empleados.construir()
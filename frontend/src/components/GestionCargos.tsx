@@ -15,6 +15,7 @@ interface Cargo {
   nivel: number;
   sueldo_base: number;
   estatus: number;
+  version?: number; // Versión de la fila; se envía en If-Match al editar
 }
 
 // Define sort direction and criteria structure
@@ -170,6 +171,8 @@ const GestionCargos: React.FC<GestionCargosProps> = ({ onLogout }) => {
           method: 'PUT',
           headers: {
             'Content-Type': 'application/json',
+            // Evita sobrescribir los cambios de otro usuario hechos mientras se editaba
+            ...(editingCargo.version !== undefined ? { 'If-Match': `"${editingCargo.version}"` } : {}),
           },
           body: JSON.stringify(dataToSend),
         });
@@ -184,6 +187,16 @@ const GestionCargos: React.FC<GestionCargosProps> = ({ onLogout }) => {
         });
       }
 
+      if (response.status === 409) {
+        const conflicto = await response.json();
+        if (conflicto.actual) {
+          setCargos(prevCargos => prevCargos.map(cargo =>
+            cargo.id === conflicto.actual.id ? conflicto.actual : cargo
+          ));
+        }
+        throw new Error(conflicto.message || 'El cargo fue modificado por otro usuario');
+      }
+
       if (!response.ok) {
         const errorText = await response.text();
         console.error("API Error Response:", errorText);
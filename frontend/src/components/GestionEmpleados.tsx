@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import { FaUserPlus, FaEdit, FaTrash, FaBars, FaSort, FaSortUp, FaSortDown, FaArrowLeft } from 'react-icons/fa';
 import Sidebar from './Sidebar';
@@ -19,6 +19,7 @@ interface Empleado {
   telefono?: number;
   correo?: string;
   fecha_nacimiento?: string;
+  version?: number; // Versión de la fila; se envía en If-Match al editar
 }
 
 // Define Cargo type 
@@ -52,6 +53,21 @@ const defaultFormState = {
 // API Base URL (ensure backend server is running on this address)
 const API_BASE_URL = 'http://127.0.0.1:5001/api'; // URL base para todas las llamadas API
 
+// Página de empleados en formato columnar (?formato=columnas): los nombres de los campos
+// llegan una sola vez en 'columns' y cada fila es una lista de valores en ese orden
+interface PaginaEmpleados {
+  columns: string[];
+  rows: unknown[][];
+  next_cursor: string | null;
+}
+
+const filasAEmpleados = ({ columns, rows }: PaginaEmpleados): Empleado[] =>
+  rows.map(row => {
+    const empleado: Record<string, unknown> = {};
+    columns.forEach((columna, i) => { empleado[columna] = row[i]; });
+    return empleado as unknown as Empleado;
+  });
+
 const GestionEmpleados: React.FC<GestionEmpleadosProps> = ({ onLogout }) => {
   const navigate = useNavigate();
   const [isSidebarOpen, setIsSidebarOpen] = useState(false);
@@ -111,75 +127,81 @@ const GestionEmpleados: React.FC<GestionEmpleadosProps> = ({ onLogout }) => {
     }
   }, [isModalOpen]);
 
-  // Obtener empleados al montar el componente
+  // Tamaño de página para el listado paginado del backend
+  const PAGE_SIZE = 50;
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+
+  // Construye los parámetros de consulta: filtrado y ordenamiento se resuelven en el servidor
+  const buildEmpleadosQuery = (cursor: string | null) => {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE), formato: 'columnas' });
+    if (sortCriteria.length > 0) {
+      params.set('sort', sortCriteria.map(c => `${String(c.key)}:${c.direction}`).join(','));
+    }
+    if (filterValue) {
+      params.set('filter_column', String(filterColumn));
+      params.set('filter_value', filterValue);
+    }
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    return params.toString();
+  };
+
+  // Obtener la primera página de empleados al montar y cada vez que cambian filtro u ordenamiento
   useEffect(() => {
+    let cancelled = false;
     const fetchEmpleados = async () => {
       setLoading(true);
       setError(null);
       try {
-        // Usar el nuevo endpoint GET
-        const response = await fetch(`${API_BASE_URL}/get/empleados`);
+        const response = await fetch(`${API_BASE_URL}/get/empleados?${buildEmpleadosQuery(null)}`);
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
-        const data: Empleado[] = await response.json();
-        setEmpleados(data);
+        const data: PaginaEmpleados = await response.json();
+        if (!cancelled) {
+          setEmpleados(filasAEmpleados(data));
+          setNextCursor(data.next_cursor);
+        }
       } catch (error) {
         console.error("Error fetching employees:", error);
-        setError('Error al cargar los datos de los empleados. Por favor, inténtelo de nuevo.'); // Establecer error amigable para el usuario
+        if (!cancelled) {
+          setError('Error al cargar los datos de los empleados. Por favor, inténtelo de nuevo.'); // Establecer error amigable para el usuario
+        }
       } finally {
-        setLoading(false);
+        if (!cancelled) {
+          setLoading(false);
+        }
       }
     };
-    fetchEmpleados();
-  }, []); // El array de dependencias vacío asegura que esto se ejecute solo una vez al montar
-
-  // Lógica de Filtrado y Ordenamiento
-  const filteredAndSortedEmpleados = useMemo(() => {
-    let result = [...empleados];
-
-    // Aplicar filtrado
-    if (filterValue) {
-      result = result.filter(emp =>
-        String(emp[filterColumn]).toLowerCase().includes(filterValue.toLowerCase())
-      );
-    }
+    // Pequeño retardo para no consultar el servidor en cada tecla del filtro
+    const timer = setTimeout(fetchEmpleados, filterValue ? 300 : 0);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [filterColumn, filterValue, sortCriteria]);
 
-    // Aplicar ordenamiento
-    if (sortCriteria.length > 0) {
-      result.sort((a, b) => {
-        for (const criterion of sortCriteria) {
-          const { key, direction } = criterion;
-          const valA = a[key];
-          const valB = b[key];
-
-          let comparison = 0;
-          // Basic comparison (can be enhanced for specific types)
-          if (typeof valA === 'number' && typeof valB === 'number') {
-            comparison = valA - valB;
-          } else if (valA && valB) { // Check if values exist before comparing as strings
-            // Handle date strings specifically for fecha_ingreso
-            if (key === 'fecha_ingreso') {
-              comparison = new Date(valA).getTime() - new Date(valB).getTime();
-            } else {
-              comparison = String(valA).toLowerCase().localeCompare(String(valB).toLowerCase());
-            }
-          } else if (valA) {
-            comparison = 1; // Place items with value after those without
-          } else if (valB) {
-            comparison = -1; // Place items without value before those with
-          }
-
-          if (comparison !== 0) {
-            return direction === 'asc' ? comparison : -comparison;
-          }
-        }
-        return 0; // Equal according to all criteria
-      });
+  // Obtener la siguiente página a partir del cursor
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetch(`${API_BASE_URL}/get/empleados?${buildEmpleadosQuery(nextCursor)}`);
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      const data: PaginaEmpleados = await response.json();
+      setEmpleados(prev => [...prev, ...filasAEmpleados(data)]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error("Error fetching more employees:", error);
+      setError('Error al cargar más empleados. Por favor, inténtelo de nuevo.');
+    } finally {
+      setLoadingMore(false);
     }
-
-    return result;
-  }, [empleados, filterColumn, filterValue, sortCriteria]);
+  };
 
   // Helper function to format date string (YYYY-MM-DD) for display
   const formatDateForDisplay = (dateString: string | undefined | null): string => {
@@ -318,10 +340,20 @@ const GestionEmpleados: React.FC<GestionEmpleadosProps> = ({ onLogout }) => {
         method: method,
         headers: {
           'Content-Type': 'application/json',
+          // Evita sobrescribir los cambios de otro usuario hechos mientras se editaba
+          ...(editingEmployee?.version !== undefined ? { 'If-Match': `"${editingEmployee.version}"` } : {}),
         },
         body: JSON.stringify(dataToSend),
       });
 
+      if (response.status === 409) {
+        const conflicto = await response.json();
+        if (conflicto.actual) {
+          setEmpleados(prev => prev.map(emp => emp.cedula === conflicto.actual.cedula ? conflicto.actual : emp));
+        }
+        throw new Error(conflicto.message || 'El registro fue modificado por otro usuario');
+      }
+
       if (!response.ok) {
         // Handle non-JSON error responses gracefully
         const errorText = await response.text();
@@ -506,8 +538,8 @@ const GestionEmpleados: React.FC<GestionEmpleadosProps> = ({ onLogout }) => {
               </tr>
             </thead>
             <tbody>
-              {filteredAndSortedEmpleados.length > 0 ? (
-                filteredAndSortedEmpleados.map((emp) => (
+              {empleados.length > 0 ? (
+                empleados.map((emp) => (
                   <tr key={emp.cedula}>
                     <td>{emp.cedula}</td>
                     <td>{emp.nombre}</td>
@@ -539,6 +571,17 @@ const GestionEmpleados: React.FC<GestionEmpleadosProps> = ({ onLogout }) => {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+          <div className="has-text-centered mt-4">
+            <button
+              className={`button is-primary is-rounded ${loadingMore ? 'is-loading' : ''}`}
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+            >
+              Cargar más
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Add/Edit Employee Modal */}
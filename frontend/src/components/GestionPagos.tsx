@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import Sidebar from './Sidebar';
 import PagoCard from './PagoCard'; // Import the new card component
@@ -9,8 +9,48 @@ interface GestionPagosProps {
   onLogout: () => void;
 }
 
+// Define Cargo type
+interface Cargo {
+  id: number;
+  nombre: string;
+  nivel: number;
+  sueldo_base: number;
+  estatus: number;
+}
+
+type TipoPago = 'credito' | 'debito';
+
+// API Base URL
+const API_BASE_URL = 'http://127.0.0.1:5001/api';
+
 const GestionPagos: React.FC<GestionPagosProps> = ({ onLogout }) => {
   const [isSidebarOpen, setIsSidebarOpen] = useState(false);
+  const [cargos, setCargos] = useState<Cargo[]>([]);
+  const [tipoPagoCargo, setTipoPagoCargo] = useState<TipoPago | null>(null); // Modal abierto si no es null
+  const [cargoId, setCargoId] = useState('');
+  const [porcentaje, setPorcentaje] = useState('100');
+  const [concepto, setConcepto] = useState('');
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+  const [mensaje, setMensaje] = useState<string | null>(null);
+
+  // Obtener cargos al montar el componente
+  useEffect(() => {
+    const fetchCargos = async () => {
+      try {
+        const response = await fetch(`${API_BASE_URL}/get/cargos`);
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        const data: Cargo[] = await response.json();
+        setCargos(data);
+      } catch (error) {
+        console.error("Error fetching cargos:", error);
+        setError('Error al cargar los datos de los cargos.');
+      }
+    };
+    fetchCargos();
+  }, []);
 
   const toggleSidebar = () => {
     setIsSidebarOpen(!isSidebarOpen);
@@ -27,14 +67,45 @@ const GestionPagos: React.FC<GestionPagosProps> = ({ onLogout }) => {
     // navigate('/pagos/debito-empleado'); // Example navigation
   };
 
-  const handleCreditoCargo = () => {
-    console.log("Crédito por Cargo clickeado");
-    // navigate('/pagos/credito-cargo'); // Example navigation
+  const handleOpenPagoCargo = (tipo: TipoPago) => {
+    setTipoPagoCargo(tipo);
+    setCargoId(cargos.length > 0 ? String(cargos[0].id) : '');
+    setPorcentaje('100');
+    setConcepto('');
+    setError(null);
+    setMensaje(null);
   };
 
-  const handleDebitoCargo = () => {
-    console.log("Débito por Cargo clickeado");
-    // navigate('/pagos/debito-cargo'); // Example navigation
+  const handleCreditoCargo = () => handleOpenPagoCargo('credito');
+
+  const handleDebitoCargo = () => handleOpenPagoCargo('debito');
+
+  // Aplicar el pago masivo a todos los empleados activos del cargo seleccionado
+  const handleSubmitPagoCargo = async (e: React.FormEvent) => {
+    e.preventDefault();
+    if (!tipoPagoCargo || !cargoId) return;
+    setLoading(true);
+    setError(null);
+    try {
+      const response = await fetch(`${API_BASE_URL}/add/pagos/cargo/${cargoId}`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ tipo: tipoPagoCargo, porcentaje: Number(porcentaje), concepto: concepto || undefined }),
+      });
+      const data = await response.json();
+      if (!response.ok) {
+        throw new Error(data.message || data.error || `HTTP error! status: ${response.status}`);
+      }
+      setMensaje(`${tipoPagoCargo === 'credito' ? 'Crédito' : 'Débito'} de ${data.monto} aplicado a ${data.empleados_afectados} empleados (total ${data.total}).`);
+      setTipoPagoCargo(null);
+    } catch (error: any) {
+      console.error("Error applying payment:", error);
+      setError(`Error al aplicar el pago: ${error.message}`);
+    } finally {
+      setLoading(false);
+    }
   };
 
   return (
@@ -65,6 +136,9 @@ const GestionPagos: React.FC<GestionPagosProps> = ({ onLogout }) => {
       {/* Title */}
       <h1 className="title is-1 has-text-centered mt-6 pt-4 mb-6">Gestión de Pagos</h1>
 
+      {mensaje && <div className="notification is-success is-light">{mensaje}</div>}
+      {error && !tipoPagoCargo && <div className="notification is-danger is-light">{error}</div>}
+
       {/* Container takes remaining space */}
       <div className="container is-fluid" style={{ flexGrow: 1, display: 'flex', paddingBottom: '2rem', width: '100%' }}> 
         {/* Columns container fills the container and stretches children */}
@@ -93,6 +167,53 @@ const GestionPagos: React.FC<GestionPagosProps> = ({ onLogout }) => {
         </div>
       </div>
 
+      {/* Modal de pago por cargo */}
+      <div className={`modal ${tipoPagoCargo ? 'is-active' : ''}`}>
+        <div className="modal-background" onClick={() => setTipoPagoCargo(null)}></div>
+        <div className="modal-card">
+          <header className="modal-card-head">
+            <p className="modal-card-title">{tipoPagoCargo === 'debito' ? 'Débito por Cargo' : 'Crédito por Cargo'}</p>
+            <button className="delete" aria-label="close" onClick={() => setTipoPagoCargo(null)}></button>
+          </header>
+          <section className="modal-card-body">
+            {error && <div className="notification is-danger is-light">{error}</div>}
+            <form id="pago-cargo-form" onSubmit={handleSubmitPagoCargo}>
+              <div className="field">
+                <label className="label">Cargo</label>
+                <div className="control">
+                  <div className="select is-fullwidth">
+                    <select value={cargoId} onChange={(e) => setCargoId(e.target.value)} required>
+                      <option value="" disabled>Seleccione un cargo</option>
+                      {cargos.map(cargo => (
+                        <option key={cargo.id} value={cargo.id}>
+                          {cargo.nombre} - Nivel {cargo.nivel} ({cargo.sueldo_base})
+                        </option>
+                      ))}
+                    </select>
+                  </div>
+                </div>
+              </div>
+              <div className="field">
+                <label className="label">Porcentaje del Sueldo Base</label>
+                <div className="control">
+                  <input className="input" type="number" min="0.01" step="0.01" value={porcentaje} onChange={(e) => setPorcentaje(e.target.value)} required />
+                </div>
+              </div>
+              <div className="field">
+                <label className="label">Concepto</label>
+                <div className="control">
+                  <input className="input" type="text" placeholder="Bono vacacional" value={concepto} onChange={(e) => setConcepto(e.target.value)} />
+                </div>
+              </div>
+            </form>
+          </section>
+          <footer className="modal-card-foot is-justify-content-flex-end">
+            <button className={`button is-success mr-2 ${loading ? 'is-loading' : ''}`} type="submit" form="pago-cargo-form" disabled={loading}>Aplicar</button>
+            <button className="button" onClick={() => setTipoPagoCargo(null)}>Cancelar</button>
+          </footer>
+        </div>
+      </div>
+
       {/* Sidebar */} 
       <Sidebar isOpen={isSidebarOpen} onClose={toggleSidebar} onLogout={onLogout} />
     </section>